@@ -0,0 +1,29 @@
+import logging
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.db.models import User
+from app.db.routing import read_replica
+from app.services.dashboard import dashboard_snapshot
+
+bp = Blueprint('dashboard', __name__)
+logger = logging.getLogger(__name__)
+
+
+@bp.route('/snapshot', methods=['GET'])
+@jwt_required()
+@read_replica
+def get_dashboard_snapshot():
+    """Occupancy by zone, session counts, today's revenue and recent payments in one response - Admin & Operator only"""
+    try:
+        current_user = User.query.get(get_jwt_identity())
+        if not current_user or current_user.role not in ['admin', 'operator']:
+            return jsonify({'error': 'Admin & Operator access required'}), 403
+
+        snapshot = dashboard_snapshot.get()
+        response = jsonify(snapshot)
+        response.headers['Cache-Control'] = f'private, max-age={dashboard_snapshot.interval}'
+        return response, 200
+
+    except Exception as e:
+        logger.exception('Unhandled error in %s', request.endpoint)
+        return jsonify({'error': str(e)}), 500
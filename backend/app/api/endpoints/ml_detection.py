@@ -0,0 +1,140 @@
+import logging
+from flask import Blueprint, current_app, request, jsonify, Response, stream_with_context
+from app.api.endpoints.slot import vehicle_type_to_zone_map
+from app.core.idempotency import idempotent
+from app.db.models import db
+from app.db.routing import statement_class
+from app.services.detection import detection_service, DetectionUnavailable
+from app.services.gate import gate_events, admit_vehicle, ZONES, NOT_DETECTED
+
+bp = Blueprint('ml_detection', __name__)
+logger = logging.getLogger(__name__)
+
+
+def _read_frame():
+    """Decode the uploaded image (multipart field 'frame' or raw image body) to a BGR array"""
+    import cv2
+    import numpy as np
+
+    upload = request.files.get('frame') or request.files.get('image')
+    data = upload.read() if upload else request.get_data()
+    if not data:
+        return None
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def _server_timing(timings):
+    return ', '.join(
+        f'{stage};dur={seconds * 1000:.1f}' for stage, seconds in timings.items()
+        if isinstance(seconds, float)
+    )
+
+
+def _unavailable(error):
+    """503 with Retry-After (same hint as admission control) for models not loaded or saturated"""
+    response = jsonify({'error': str(error)})
+    response.headers['Retry-After'] = str(current_app.config.get('ADMISSION_RETRY_AFTER', 2))
+    return response, 503
+
+
+@bp.route('/health', methods=['GET'])
+def detection_health():
+    """Model load state of this worker"""
+    status = detection_service.status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+
+@bp.route('/frames', methods=['POST'])
+def detect_frame():
+    """Detect vehicle type and license plate in one camera frame"""
+    try:
+        if not detection_service.ready:
+            raise DetectionUnavailable(detection_service.error or 'Detection models are not loaded yet')
+
+        frame = _read_frame()
+        if frame is None:
+            return jsonify({'error': 'A decodable image is required (multipart "frame" or raw body)'}), 400
+
+        results, timings = detection_service.detect(frame)
+
+        response = jsonify(results)
+        response.headers['Server-Timing'] = _server_timing(timings)
+        return response, 200
+
+    except DetectionUnavailable as e:
+        return _unavailable(e)
+    except Exception as e:
+        logger.exception('Unhandled error in %s', request.endpoint)
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/entry', methods=['POST'])
+@idempotent
+@statement_class('gate')
+def detect_and_admit():
+    """
+    Gate entry in one request: detect the vehicle, allocate a slot in its
+    zone and open the parking session; the result is also pushed to the
+    gate displays (GET /events).
+
+    Accepts a camera frame (like /frames) or an edge-device detection as
+    JSON ``{"vehicle_type": "B", "license_plate": "..."}``. ``lane`` may be
+    given as query parameter, form field or JSON field.
+    """
+    try:
+        timings = {}
+        data = request.get_json(silent=True) if request.is_json else None
+        lane = request.args.get('lane') or request.form.get('lane') or (data or {}).get('lane')
+
+        if data is not None:
+            detection = {'vehicle_type': data.get('vehicle_type'), 'license_plate': data.get('license_plate')}
+        else:
+            if not detection_service.ready:
+                raise DetectionUnavailable(detection_service.error or 'Detection models are not loaded yet')
+
+            frame = _read_frame()
+            if frame is None:
+                return jsonify({'error': 'A decodable image is required (multipart "frame" or raw body)'}), 400
+
+            results, timings = detection_service.detect(frame)
+            if not results:
+                gate_events.publish({'type': 'no_vehicle', 'lane': lane})
+                return jsonify({'status': 'no_vehicle', 'lane': lane}), 200
+            detection = results[0]
+
+        vehicle_type = detection.get('vehicle_type')
+        zone = vehicle_type if vehicle_type in ZONES else vehicle_type_to_zone_map.get(vehicle_type)
+        if not zone:
+            return jsonify({'error': f'No parking zone defined for vehicle type: {vehicle_type}'}), 400
+
+        plate = (detection.get('license_plate') or '').strip()
+        if not plate or plate == NOT_DETECTED:
+            event = {'type': 'unreadable_plate', 'lane': lane, 'zone': zone, 'detection': detection}
+            gate_events.publish(event)
+            return jsonify(event), 422
+
+        event = admit_vehicle(zone, plate, lane)
+        event['detection'] = detection
+
+        response = jsonify(event)
+        if timings:
+            response.headers['Server-Timing'] = _server_timing(timings)
+        status_code = {'admitted': 201, 'already_parked': 200}.get(event['status'], 409)
+        return response, status_code
+
+    except DetectionUnavailable as e:
+        return _unavailable(e)
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('Unhandled error in %s', request.endpoint)
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/events', methods=['GET'])
+def gate_event_stream():
+    """Server-Sent Events stream of gate events for the gate display (optional ?lane=)"""
+    return Response(
+        stream_with_context(gate_events.stream(lane=request.args.get('lane'))),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
@@ -1,20 +1,31 @@
-from flask import Blueprint, request, jsonify
+import logging
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.db.models import db, Payment, Slot, User
-from datetime import datetime, timedelta
+from app.db.models import db, normalize_plate, Payment, Slot, User
+from app.core.cache import cache
+from app.core.idempotency import idempotent
+from app.services.gate import open_session
+from app.db.routing import read_replica, statement_class
+from datetime import datetime, timedelta, timezone
 import qrcode
 import io
 import base64
+import json
 import requests
 import uuid
 import os
-from sqlalchemy import func
+from sqlalchemy import func, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 
 bp = Blueprint('payment', __name__)
+logger = logging.getLogger(__name__)
 
 MIDTRANS_SERVER_KEY = os.getenv("MIDTRANS_SERVER_KEY")
 
 @bp.route('/entry', methods=['POST'])
+@idempotent
+@statement_class('gate')
 def create_entry():
     """Create parking entry record"""
     try:
@@ -34,28 +45,23 @@ def create_entry():
         if not slot.status:
             return jsonify({'error': 'Slot not available'}), 400
         
-        # Create payment record
-        payment = Payment(
-            slot_id=slot.id,
-            vehicle_plate=vehicle_plate,
-            vehicle_type=vehicle_type,
-            entry_time=datetime.utcnow(),
-            status='unpaid'
-        )
-        
-        # Mark slot as occupied
-        slot.status = False
-        
-        db.session.add(payment)
+        # Create payment record and mark slot as occupied
+        payment = open_session(slot, vehicle_plate, vehicle_type)
         db.session.commit()
+        cache.invalidate('slots', 'payments')
         
         return jsonify({
             'message': 'Entry recorded successfully',
             'payment': payment.to_dict()
         }), 201
         
+    except IntegrityError:
+        # uq_payments_unpaid_vehicle_plate: the plate already has an open session
+        db.session.rollback()
+        return jsonify({'error': 'Vehicle already has an active parking session'}), 409
     except Exception as e:
         db.session.rollback()
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
 
 def create_qris_payment(amount, order_id):
@@ -79,12 +85,34 @@ def create_qris_payment(amount, order_id):
     return response.json()
 
 
+def _close_session(payment, exit_time):
+    """Set exit time, duration and fee of a parking session"""
+    payment.exit_time = exit_time
+    payment.duration = payment.exit_time - payment.entry_time
+    payment.amount = payment.calculate_amount()
+
+def _request_qris(payment):
+    """Create the Midtrans QRIS charge under a fresh order id; returns the QR url"""
+    order_id = str(uuid.uuid4())
+    midtrans_resp = create_qris_payment(payment.amount, order_id)
+    qr_url = ""
+    for action in midtrans_resp.get("actions", []):
+        if action.get("name") == "generate-qr-code":
+            qr_url = action.get("url")
+            break
+    # Only after the charge exists, so a failed request leaves the session untouched
+    payment.payment_id = order_id  # simpan order id agar bisa dilacak konfirmasi
+    payment.qr_code = qr_url
+    return qr_url
+
 @bp.route('/exit', methods=['POST'])
+@idempotent
+@statement_class('gate')
 def process_exit():
     """Process parking exit and generate QRIS payment (Midtrans)"""
     try:
         data = request.get_json()
-        vehicle_plate = data.get('vehicle_plate')
+        vehicle_plate = normalize_plate(data.get('vehicle_plate'))
         
         if not vehicle_plate:
             return jsonify({'error': 'Vehicle plate required'}), 400
@@ -99,22 +127,13 @@ def process_exit():
             return jsonify({'error': 'No active parking session found'}), 404
         
         # Calculate duration and amount
-        payment.exit_time = datetime.utcnow()
-        payment.duration = payment.exit_time - payment.entry_time
-        payment.amount = payment.calculate_amount()
+        _close_session(payment, datetime.utcnow())
         
         # ==== MIDTRANS QRIS ==== #
-        order_id = str(uuid.uuid4())
-        payment.payment_id = order_id  # simpan order id agar bisa dilacak konfirmasi
-        midtrans_resp = create_qris_payment(payment.amount, order_id)
-        qr_url = ""
-        for action in midtrans_resp.get("actions", []):
-            if action.get("name") == "generate-qr-code":
-                qr_url = action.get("url")
-                break
-        payment.qr_code = qr_url
+        qr_url = _request_qris(payment)
         
         db.session.commit()
+        cache.invalidate('payments')
         
         return jsonify({
             'message': 'Exit processed successfully',
@@ -129,9 +148,20 @@ def process_exit():
         
     except Exception as e:
         db.session.rollback()
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
 
+def _settle(payment):
+    """Mark a payment as paid and release its slot"""
+    payment.status = 'paid'
+    slot = payment.slot
+    if slot:
+        slot.status = True
+    return slot
+
 @bp.route('/confirm', methods=['POST'])
+@idempotent
+@statement_class('gate')
 def confirm_payment():
     """Confirm payment and release slot"""
     try:
@@ -149,15 +179,11 @@ def confirm_payment():
         if payment.status == 'paid':
             return jsonify({'error': 'Payment already confirmed'}), 400
         
-        # Mark payment as paid
-        payment.status = 'paid'
-        
-        # Release slot
-        slot = payment.slot
-        if slot:
-            slot.status = True
+        # Mark payment as paid and release slot
+        _settle(payment)
         
         db.session.commit()
+        cache.invalidate('slots', 'payments')
         
         return jsonify({
             'message': 'Payment confirmed successfully',
@@ -166,10 +192,249 @@ def confirm_payment():
         
     except Exception as e:
         db.session.rollback()
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
 
+MAX_BATCH_EVENTS = 500
+
+class _EventError(Exception):
+    pass
+
+def _parse_event_time(event):
+    """Event ``timestamp`` (ISO 8601) as naive UTC, like every stored time; now when absent"""
+    timestamp = event.get('timestamp')
+    if not timestamp:
+        return datetime.utcnow()
+    try:
+        parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        raise _EventError(f'Invalid timestamp: {timestamp}')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+@bp.route('/events', methods=['POST'])
+@idempotent
+@statement_class('gate')
+def process_gate_events():
+    """
+    Apply an ordered batch of gate events (entry / exit / confirm) in one transaction.
+    
+    Lane controllers replay events buffered during an outage with one request.
+    Slots and sessions for the whole batch are loaded with a few set-based
+    queries, events are applied in array order (so per-plate order is kept),
+    and each event gets its own result (with the session as of the end of
+    the batch); a rejected event does not stop the batch. ``timestamp``
+    (ISO) on an event is used as entry/exit time.
+    
+    QRIS charges for sessions still unpaid at the end are requested after
+    the transaction commits, so no slot locks are held across Midtrans
+    calls; a failed charge is reported as ``qris_error`` on its exit event.
+    
+    Events:
+        {"type": "entry", "vehicle_plate": ..., "slot_id": ... | "zone": "A"|"B"|"C", "vehicle_type": "car"}
+        {"type": "exit", "vehicle_plate": ...}
+        {"type": "confirm", "payment_id": ... | "vehicle_plate": ...}
+    """
+    try:
+        data = request.get_json() or {}
+        events = data.get('events')
+        
+        if not isinstance(events, list) or not events:
+            return jsonify({'error': 'A non-empty events array is required'}), 400
+        if len(events) > MAX_BATCH_EVENTS:
+            return jsonify({'error': f'At most {MAX_BATCH_EVENTS} events per batch'}), 400
+        
+        # Non-object elements are rejected one by one below
+        valid = [e for e in events if isinstance(e, dict)]
+        plates = {normalize_plate(e.get('vehicle_plate')) for e in valid if e.get('vehicle_plate')}
+        slot_ids = {e.get('slot_id') for e in valid if e.get('type') == 'entry' and e.get('slot_id')}
+        zones = {e.get('zone') for e in valid if e.get('type') == 'entry' and not e.get('slot_id') and e.get('zone')}
+        payment_ids = {e.get('payment_id') for e in valid if e.get('type') == 'confirm' and e.get('payment_id')}
+        
+        # Set-based lookups for the whole batch
+        slots = {}
+        if slot_ids:
+            slots.update((slot.slot_id, slot) for slot in Slot.query.filter(Slot.slot_id.in_(slot_ids)).with_for_update())
+        free_by_zone = {zone: [] for zone in zones}
+        if zones:
+            free_slots = (
+                Slot.query.filter(Slot.status.is_(True), Slot.zone.in_(zones))
+                .order_by(Slot.level.desc(), Slot.slot_id.desc())
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            for slot in free_slots:
+                slots.setdefault(slot.slot_id, slot)
+                free_by_zone[slot.zone].append(slots[slot.slot_id])
+        
+        active = {}
+        by_payment_id = {}
+        if plates:
+            for payment in (
+                Payment.query.options(joinedload(Payment.slot))
+                .filter(Payment.vehicle_plate.in_(plates), Payment.status == 'unpaid')
+                .order_by(Payment.id)
+            ):
+                active.setdefault(payment.vehicle_plate, payment)
+        if payment_ids:
+            for payment in Payment.query.options(joinedload(Payment.slot)).filter(Payment.payment_id.in_(payment_ids)):
+                by_payment_id[payment.payment_id] = payment
+        
+        outcomes = []
+        exited = []
+        for index, event in enumerate(events):
+            if not isinstance(event, dict):
+                outcomes.append((index, {}, None, 'Event must be an object'))
+                continue
+            event_type = event.get('type')
+            plate = normalize_plate(event.get('vehicle_plate'))
+            try:
+                if event_type == 'entry':
+                    if not plate:
+                        raise _EventError('Vehicle plate required')
+                    if plate in active:
+                        raise _EventError('Vehicle already has an active parking session')
+                    
+                    if event.get('slot_id'):
+                        slot = slots.get(event['slot_id'])
+                        if not slot:
+                            raise _EventError('Slot not found')
+                        if not slot.status:
+                            raise _EventError('Slot not available')
+                    else:
+                        pool = free_by_zone.get(event.get('zone'), [])
+                        while pool and not pool[-1].status:
+                            pool.pop()
+                        if not pool:
+                            raise _EventError('Slot ID or zone with a free slot required')
+                        slot = pool.pop()
+                    
+                    payment = open_session(slot, plate, event.get('vehicle_type', 'car'), _parse_event_time(event))
+                    active[plate] = payment
+                
+                elif event_type == 'exit':
+                    payment = active.get(plate) if plate else None
+                    if not payment:
+                        raise _EventError('No active parking session found')
+                    exit_time = _parse_event_time(event)
+                    if exit_time < payment.entry_time:
+                        raise _EventError('Exit time is before entry time')
+                    _close_session(payment, exit_time)
+                    exited.append(payment)
+                
+                elif event_type == 'confirm':
+                    if event.get('payment_id'):
+                        payment = by_payment_id.get(event['payment_id'])
+                    else:
+                        payment = active.get(plate) if plate else None
+                    if not payment:
+                        raise _EventError('Payment not found')
+                    if payment.status == 'paid':
+                        raise _EventError('Payment already confirmed')
+                    
+                    slot = _settle(payment)
+                    active.pop(payment.vehicle_plate, None)
+                    if slot and slot.zone in free_by_zone:
+                        free_by_zone[slot.zone].append(slot)
+                
+                else:
+                    raise _EventError(f'Unknown event type: {event_type}')
+                
+                outcomes.append((index, event, payment, None))
+            except _EventError as e:
+                outcomes.append((index, event, None, str(e)))
+        
+        db.session.flush()
+        results = []
+        exit_results = {}
+        for index, event, payment, error in outcomes:
+            result = {'index': index, 'id': event.get('id'), 'type': event.get('type'),
+                      'vehicle_plate': event.get('vehicle_plate')}
+            if error:
+                result.update(status='rejected', error=error)
+            else:
+                result.update(status='applied', payment=payment.to_dict())
+                if event.get('type') == 'exit':
+                    exit_results.setdefault(payment.id, []).append(result)
+            results.append(result)
+        
+        # QRIS only for sessions still unpaid at the end of the batch
+        charges = {payment.id: payment for payment in exited if payment.status == 'unpaid'}
+        
+        db.session.commit()
+        cache.invalidate('slots', 'payments')
+        
+        for payment_db_id, payment in charges.items():
+            try:
+                _request_qris(payment)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.warning('QRIS request failed for payment %s: %s', payment_db_id, e)
+                for result in exit_results[payment_db_id]:
+                    result['qris_error'] = str(e)
+                continue
+            for result in exit_results[payment_db_id]:
+                result['payment'].update(payment_id=payment.payment_id, qr_code=payment.qr_code)
+        if charges:
+            cache.invalidate('payments')
+        
+        applied = sum(1 for r in results if r['status'] == 'applied')
+        return jsonify({
+            'results': results,
+            'applied': applied,
+            'rejected': len(results) - applied
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('Unhandled error in %s', request.endpoint)
+        return jsonify({'error': str(e)}), 500
+
+def _build_history(page, per_page, status, start_date, end_date):
+    """Filtered, paginated payment history with revenue totals"""
+    query = Payment.query
+    
+    if status:
+        query = query.filter_by(status=status)
+    
+    if start_date:
+        start_date = datetime.fromisoformat(start_date)
+        query = query.filter(Payment.entry_time >= start_date)
+    
+    if end_date:
+        end_date = datetime.fromisoformat(end_date)
+        query = query.filter(Payment.entry_time <= end_date)
+    
+    # Order by newest first
+    query = query.order_by(Payment.created_at.desc())
+    
+    # Pagination
+    payments = query.paginate(
+        page=page, per_page=per_page, error_out=False
+    )
+    
+    # Calculate total revenue
+    total_revenue = db.session.query(func.sum(Payment.amount)).filter_by(status='paid').scalar() or 0
+    
+    return {
+        'payments': [payment.to_dict() for payment in payments.items],
+        'pagination': {
+            'page': payments.page,
+            'pages': payments.pages,
+            'per_page': payments.per_page,
+            'total': payments.total
+        },
+        'statistics': {
+            'total_revenue': float(total_revenue),
+            'total_transactions': payments.total
+        }
+    }
+
 @bp.route('/history', methods=['GET'])
 @jwt_required()
+@read_replica
 def get_payment_history():
     """Get payment history - Admin Operator only"""
     try:
@@ -186,49 +451,187 @@ def get_payment_history():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         
-        query = Payment.query
-        
-        if status:
-            query = query.filter_by(status=status)
-        
-        if start_date:
-            start_date = datetime.fromisoformat(start_date)
-            query = query.filter(Payment.entry_time >= start_date)
+        params = {
+            'page': page,
+            'per_page': per_page,
+            'status': status,
+            'start_date': start_date,
+            'end_date': end_date
+        }
         
-        if end_date:
-            end_date = datetime.fromisoformat(end_date)
-            query = query.filter(Payment.entry_time <= end_date)
+        # Page 1 is what every dashboard refresh asks for; share it across workers
+        if page == 1:
+            history = cache.remember(
+                'payments.history', params, tags=('payments', 'slots'),
+                compute=lambda: _build_history(**params)
+            )
+        else:
+            history = _build_history(**params)
         
-        # Order by newest first
-        query = query.order_by(Payment.created_at.desc())
+        return jsonify(history), 200
         
-        # Pagination
-        payments = query.paginate(
-            page=page, per_page=per_page, error_out=False
+    except Exception as e:
+        logger.exception('Unhandled error in %s', request.endpoint)
+        return jsonify({'error': str(e)}), 500
+
+SEARCH_MODES = ('exact', 'prefix', 'fuzzy')
+MAX_SEARCH_LIMIT = 100
+
+def _encode_cursor(payment):
+    raw = json.dumps([payment.entry_time.isoformat(), payment.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def _decode_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+    entry_time, payment_id = json.loads(raw)
+    return datetime.fromisoformat(entry_time), int(payment_id)
+
+def _search_plates(plate, mode, start_date, end_date, cursor, limit, similarity):
+    """
+    One keyset page of sessions for a plate, newest entry first.
+    
+    exact and prefix use ix_payments_vehicle_plate_entry_time; fuzzy uses
+    the pg_trgm GIN index (``%`` operator, threshold ``similarity``) and
+    falls back to a substring match on databases without pg_trgm.
+    """
+    query = Payment.query.options(joinedload(Payment.slot))
+    score = None
+    
+    if mode == 'exact':
+        query = query.filter(Payment.vehicle_plate == plate)
+    elif mode == 'prefix':
+        query = query.filter(Payment.vehicle_plate.startswith(plate, autoescape=True))
+    elif db.session.get_bind().dialect.name == 'postgresql':
+        db.session.execute(
+            db.text("SELECT set_config('pg_trgm.similarity_threshold', :threshold, true)"),
+            {'threshold': str(similarity)}
         )
+        score = func.similarity(Payment.vehicle_plate, plate)
+        query = query.add_columns(score).filter(Payment.vehicle_plate.op('%')(plate))
+    else:
+        query = query.filter(Payment.vehicle_plate.contains(plate, autoescape=True))
+    
+    if start_date:
+        query = query.filter(Payment.entry_time >= start_date)
+    if end_date:
+        query = query.filter(Payment.entry_time <= end_date)
+    if cursor:
+        query = query.filter(tuple_(Payment.entry_time, Payment.id) < cursor)
+    
+    rows = query.order_by(Payment.entry_time.desc(), Payment.id.desc()).limit(limit + 1).all()
+    matches = [tuple(row) for row in rows] if score is not None else [(payment, None) for payment in rows]
+    has_more = len(matches) > limit
+    matches = matches[:limit]
+    
+    results = []
+    for payment, match_score in matches:
+        data = payment.to_dict()
+        if match_score is not None:
+            data['similarity'] = round(float(match_score), 3)
+        results.append(data)
+    
+    return {
+        'payments': results,
+        'next_cursor': _encode_cursor(matches[-1][0]) if has_more else None,
+        'limit': limit,
+        'mode': mode
+    }
+
+@bp.route('/search', methods=['GET'])
+@jwt_required()
+@read_replica
+def search_payments():
+    """
+    Search parking sessions by plate - Admin Operator only
+    
+    Query: plate (required), mode (exact | prefix | fuzzy, default exact),
+    start_date / end_date (ISO, on entry time), limit (default 20, max 100),
+    cursor (``next_cursor`` of the previous page).
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        current_user = User.query.get(current_user_id)
         
-        # Calculate total revenue
-        total_revenue = db.session.query(func.sum(Payment.amount)).filter_by(status='paid').scalar() or 0
+        if current_user.role not in ['admin', 'operator']:
+            return jsonify({'error': 'Admin Operator access required'}), 403
         
-        return jsonify({
-            'payments': [payment.to_dict() for payment in payments.items],
-            'pagination': {
-                'page': payments.page,
-                'pages': payments.pages,
-                'per_page': payments.per_page,
-                'total': payments.total
-            },
-            'statistics': {
-                'total_revenue': float(total_revenue),
-                'total_transactions': payments.total
-            }
-        }), 200
+        plate = normalize_plate(request.args.get('plate') or '')
+        mode = request.args.get('mode', 'exact')
+        limit = request.args.get('limit', 20, type=int)
+        
+        if not plate:
+            return jsonify({'error': 'plate is required'}), 400
+        if mode not in SEARCH_MODES:
+            return jsonify({'error': f'mode must be one of {", ".join(SEARCH_MODES)}'}), 400
+        if not 1 <= limit <= MAX_SEARCH_LIMIT:
+            return jsonify({'error': f'limit must be between 1 and {MAX_SEARCH_LIMIT}'}), 400
+        
+        try:
+            start_date = datetime.fromisoformat(request.args['start_date']) if request.args.get('start_date') else None
+            end_date = datetime.fromisoformat(request.args['end_date']) if request.args.get('end_date') else None
+        except ValueError:
+            return jsonify({'error': 'start_date and end_date must be ISO 8601 timestamps'}), 400
+        
+        try:
+            cursor = _decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        results = _search_plates(
+            plate, mode, start_date, end_date, cursor, limit,
+            current_app.config.get('PLATE_SEARCH_SIMILARITY', 0.3)
+        )
+        return jsonify(results), 200
         
     except Exception as e:
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
 
+def _build_statistics(today):
+    """Today, month-to-date and all-time payment totals"""
+    # Today's statistics
+    today_start = datetime.combine(today, datetime.min.time())
+    today_end = datetime.combine(today, datetime.max.time())
+    
+    today_payments = Payment.query.filter(
+        Payment.entry_time >= today_start,
+        Payment.entry_time <= today_end
+    ).all()
+    
+    today_revenue = sum(p.amount for p in today_payments if p.status == 'paid')
+    
+    # Monthly statistics
+    month_start = datetime.now().replace(day=1)
+    month_payments = Payment.query.filter(
+        Payment.entry_time >= month_start
+    ).all()
+    
+    month_revenue = sum(p.amount for p in month_payments if p.status == 'paid')
+    
+    # Overall statistics
+    total_payments = Payment.query.count()
+    total_revenue = db.session.query(func.sum(Payment.amount)).filter_by(status='paid').scalar() or 0
+    
+    return {
+        'today': {
+            'transactions': len(today_payments),
+            'revenue': float(today_revenue),
+            'paid_transactions': len([p for p in today_payments if p.status == 'paid'])
+        },
+        'month': {
+            'transactions': len(month_payments),
+            'revenue': float(month_revenue),
+            'paid_transactions': len([p for p in month_payments if p.status == 'paid'])
+        },
+        'total': {
+            'transactions': total_payments,
+            'revenue': float(total_revenue)
+        }
+    }
+
 @bp.route('/statistics', methods=['GET'])
 @jwt_required()
+@read_replica
 def get_statistics():
     """Get payment statistics - Admin Operator only"""
     try:
@@ -238,52 +641,29 @@ def get_statistics():
         if current_user.role not in ['admin', 'operator']:
             return jsonify({'error': 'Admin Operator access required'}), 403
         
-        # Today's statistics
         today = datetime.now().date()
-        today_start = datetime.combine(today, datetime.min.time())
-        today_end = datetime.combine(today, datetime.max.time())
-        
-        today_payments = Payment.query.filter(
-            Payment.entry_time >= today_start,
-            Payment.entry_time <= today_end
-        ).all()
-        
-        today_revenue = sum(p.amount for p in today_payments if p.status == 'paid')
-        
-        # Monthly statistics
-        month_start = datetime.now().replace(day=1)
-        month_payments = Payment.query.filter(
-            Payment.entry_time >= month_start
-        ).all()
-        
-        month_revenue = sum(p.amount for p in month_payments if p.status == 'paid')
-        
-        # Overall statistics
-        total_payments = Payment.query.count()
-        total_revenue = db.session.query(func.sum(Payment.amount)).filter_by(status='paid').scalar() or 0
-        
-        return jsonify({
-            'today': {
-                'transactions': len(today_payments),
-                'revenue': float(today_revenue),
-                'paid_transactions': len([p for p in today_payments if p.status == 'paid'])
-            },
-            'month': {
-                'transactions': len(month_payments),
-                'revenue': float(month_revenue),
-                'paid_transactions': len([p for p in month_payments if p.status == 'paid'])
-            },
-            'total': {
-                'transactions': total_payments,
-                'revenue': float(total_revenue)
-            }
-        }), 200
+        statistics = cache.remember(
+            'payments.statistics', {'today': today.isoformat()}, tags=('payments',),
+            compute=lambda: _build_statistics(today)
+        )
+        return jsonify(statistics), 200
         
     except Exception as e:
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
 
+def _build_active_sessions():
+    """Unpaid (still parked or awaiting payment) sessions"""
+    active_payments = Payment.query.filter_by(status='unpaid').all()
+    
+    return {
+        'active_sessions': [payment.to_dict() for payment in active_payments],
+        'count': len(active_payments)
+    }
+
 @bp.route('/active', methods=['GET'])
 @jwt_required()
+@read_replica
 def get_active_sessions():
     """Get active parking sessions - Admin Operator only"""
     try:
@@ -293,12 +673,12 @@ def get_active_sessions():
         if current_user.role not in ['admin', 'operator']:
             return jsonify({'error': 'Admin Operator access required'}), 403
         
-        active_payments = Payment.query.filter_by(status='unpaid').all()
-        
-        return jsonify({
-            'active_sessions': [payment.to_dict() for payment in active_payments],
-            'count': len(active_payments)
-        }), 200
+        active = cache.remember(
+            'payments.active', {}, tags=('payments', 'slots'),
+            compute=_build_active_sessions
+        )
+        return jsonify(active), 200
         
     except Exception as e:
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -0,0 +1,100 @@
+import logging
+from flask import Blueprint, request, jsonify, Response
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.db.models import User
+from app.core.profiler import profiler
+
+bp = Blueprint('profiler', __name__)
+logger = logging.getLogger(__name__)
+
+
+def _require_admin():
+    current_user = User.query.get(get_jwt_identity())
+    if not current_user or current_user.role != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    return None
+
+
+@bp.route('/', methods=['GET'])
+@jwt_required()
+def get_profiler_status():
+    """Get profiler state and per-endpoint sample counts - Admin only"""
+    try:
+        denied = _require_admin()
+        if denied:
+            return denied
+
+        return jsonify(profiler.status()), 200
+
+    except Exception as e:
+        logger.exception('Unhandled error in %s', request.endpoint)
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/', methods=['POST'])
+@jwt_required()
+def enable_profiler():
+    """Enable sampled profiling on this worker - Admin only"""
+    try:
+        denied = _require_admin()
+        if denied:
+            return denied
+
+        data = request.get_json(silent=True) or {}
+        profiler.enable(
+            sample_every=data.get('sample_every'),
+            interval_ms=data.get('interval_ms'),
+            endpoint=data.get('endpoint')
+        )
+
+        return jsonify({
+            'message': 'Profiler enabled',
+            'profiler': profiler.status()
+        }), 200
+
+    except Exception as e:
+        logger.exception('Unhandled error in %s', request.endpoint)
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/', methods=['DELETE'])
+@jwt_required()
+def disable_profiler():
+    """Disable profiling, keeping collected stacks - Admin only"""
+    try:
+        denied = _require_admin()
+        if denied:
+            return denied
+
+        profiler.disable()
+        if request.args.get('reset', 'false').lower() == 'true':
+            profiler.reset()
+
+        return jsonify({'message': 'Profiler disabled'}), 200
+
+    except Exception as e:
+        logger.exception('Unhandled error in %s', request.endpoint)
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/stacks', methods=['GET'])
+@jwt_required()
+def download_stacks():
+    """Download folded stacks for flamegraph.pl / speedscope - Admin only"""
+    try:
+        denied = _require_admin()
+        if denied:
+            return denied
+
+        endpoint = request.args.get('endpoint')
+        filename = f"{endpoint or 'all'}.folded"
+
+        return Response(
+            profiler.folded(endpoint),
+            mimetype='text/plain',
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
+
+    except Exception as e:
+        logger.exception('Unhandled error in %s', request.endpoint)
+        return jsonify({'error': str(e)}), 500
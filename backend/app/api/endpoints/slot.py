@@ -1,9 +1,16 @@
+import logging
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.db.models import db, Slot, User
+from app.core.cache import cache
+from app.services.occupancy_history import occupancy_history, TIERS
+from app.core.idempotency import idempotent
+from app.db.routing import read_replica, statement_class
 from sqlalchemy import func
+from datetime import datetime, timedelta, timezone
 
 bp = Blueprint('slot', __name__)
+logger = logging.getLogger(__name__)
 
 # Define mapping for vehicle types to zones (Backend-side)
 vehicle_type_to_zone_map = {
@@ -47,9 +54,11 @@ def get_available_slots():
         }), 200
         
     except Exception as e:
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/recommend', methods=['POST']) # 🔥 Changed to POST method
+@statement_class('gate')
 def recommend_slot():
     """Recommend closest available slot based on vehicle type"""
     try:
@@ -57,31 +66,29 @@ def recommend_slot():
         vehicle_type = data.get('vehicleType') # Get vehicleType from request body
         vehicle_plate = data.get('vehiclePlate') # Get vehiclePlate from request body
 
-        print(f"Backend: /recommend (POST) received request. vehicleType={vehicle_type}, vehiclePlate={vehicle_plate}") # NEW LOG
+        logger.debug('recommend: vehicle_type=%s vehicle_plate=%s', vehicle_type, vehicle_plate)
 
         if not vehicle_type:
             return jsonify({'error': 'Vehicle type is required for recommendation'}), 400
 
         # Determine target zone based on vehicle type
         target_zone = vehicle_type_to_zone_map.get(vehicle_type)
-        print(f"Backend: Determined target_zone: {target_zone} for vehicleType: {vehicle_type}") # NEW LOG
 
         if not target_zone:
             return jsonify({'error': f'No parking zone defined for vehicle type: {vehicle_type}'}), 400
 
         # Query for an available slot in the target zone
         query = Slot.query.filter_by(status=True, zone=target_zone)
-        print(f"Backend: Querying for available slot in zone: {target_zone}") # NEW LOG
         
         # You can add more complex logic here (e.g., order by level, then slot_id)
         # For now, it gets the first available slot in that zone.
         slot = query.first() 
         
         if not slot:
-            print(f"Backend: No available slot found for zone: {target_zone}") # NEW LOG
+            logger.info('recommend: no available slot in zone %s', target_zone)
             return jsonify({'error': f'No available slots found for {vehicle_type} in Zone {target_zone}'}), 404
         
-        print(f"Backend: Recommended slot found: {slot.to_dict()}") # NEW LOG
+        logger.debug('recommend: zone %s -> slot %s', target_zone, slot.slot_id)
         return jsonify({
             'recommended_slot': slot.to_dict(),
             'navigation_info': {
@@ -92,10 +99,12 @@ def recommend_slot():
         }), 200
         
     except Exception as e:
-        print(f"Backend Error in /recommend: {str(e)}") # NEW LOG
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/occupy', methods=['POST'])
+@idempotent
+@statement_class('gate')
 def occupy_slot():
     """Mark slot as occupied when vehicle enters"""
     try:
@@ -119,6 +128,7 @@ def occupy_slot():
         slot.vehicle_plate = vehicle_plate # Store vehicle plate
         slot.entry_time = entry_time # Store entry time
         db.session.commit()
+        cache.invalidate('slots')
         
         return jsonify({
             'message': 'Slot marked as occupied',
@@ -127,9 +137,12 @@ def occupy_slot():
         
     except Exception as e:
         db.session.rollback()
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/release', methods=['POST'])
+@idempotent
+@statement_class('gate')
 def release_slot():
     """Mark slot as available when vehicle exits"""
     try:
@@ -148,6 +161,7 @@ def release_slot():
         slot.vehicle_plate = None # Clear vehicle plate on release
         slot.entry_time = None # Clear entry time on release
         db.session.commit()
+        cache.invalidate('slots')
         
         return jsonify({
             'message': 'Slot marked as available',
@@ -156,11 +170,60 @@ def release_slot():
         
     except Exception as e:
         db.session.rollback()
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
 
 # Admin endpoints for slot management
+def _build_slot_overview():
+    """Slot listing with occupancy grouped by zone (cached, tag: slots)"""
+    slots = Slot.query.all()
+    
+    total_slots = len(slots)
+    available_slots_count = len([s for s in slots if s.status is True])
+    occupied_slots_count = total_slots - available_slots_count
+  
+    occupied_slots = []
+    available_slots = []
+    
+    for slot in slots:
+        slot_data = slot.to_dict()
+        
+        if slot.status is False:  # Occupied
+            # Add zone and plate info for occupied slots
+            slot_data['zone'] = slot.zone
+            slot_data['vehicle_plate'] = slot.vehicle_plate
+            slot_data['entry_time'] = slot.entry_time.isoformat() if slot.entry_time else None
+            occupied_slots.append(slot_data)
+        else:  # Available
+            available_slots.append(slot_data)
+    
+    # Group occupied slots by zone for better visualization
+    occupied_by_zone = {}
+    for slot in occupied_slots:
+        zone = slot['zone']
+        if zone not in occupied_by_zone:
+            occupied_by_zone[zone] = []
+        occupied_by_zone[zone].append(slot)
+    
+    return {
+        'slots': [slot.to_dict() for slot in slots],
+        'occupied_slots': occupied_slots,
+        'available_slots': available_slots,
+        'occupied_by_zone': occupied_by_zone,
+        'statistics': {
+            'total': total_slots,
+            'available': available_slots_count,
+            'occupied': occupied_slots_count,
+            'occupied_by_zone': {
+                zone: len(slots_in_zone) 
+                for zone, slots_in_zone in occupied_by_zone.items()
+            }
+        }
+    }
+
 @bp.route('/', methods=['GET'])
 @jwt_required()
+@read_replica
 def get_all_slots():
     """Get all slots - Admin & Operator only"""
     try:
@@ -170,56 +233,62 @@ def get_all_slots():
         if current_user.role not in ['admin', 'operator']:
             return jsonify({'error': 'Admin & Operator access required'}), 403
         
-        slots = Slot.query.all()
+        overview = cache.remember('slots.overview', {}, tags=('slots',), compute=_build_slot_overview)
+        return jsonify(overview), 200
         
-        total_slots = len(slots)
-        available_slots_count = len([s for s in slots if s.status is True])
-        occupied_slots_count = total_slots - available_slots_count
-  
-        occupied_slots = []
-        available_slots = []
+    except Exception as e:
+        logger.exception('Unhandled error in %s', request.endpoint)
+        return jsonify({'error': str(e)}), 500
+
+def _parse_utc(value):
+    """ISO 8601 (``Z`` and offsets included, as sent by JS toISOString) to naive UTC"""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+@bp.route('/occupancy/history', methods=['GET'])
+@jwt_required()
+@read_replica
+def get_occupancy_history():
+    """
+    Occupancy time series per level/zone - Admin & Operator only
+    
+    Query: start, end (ISO, default the last 7 days), resolution
+    (auto | raw | minute | hour | day, default auto), level, zone.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        current_user = User.query.get(current_user_id)
         
-        for slot in slots:
-            slot_data = slot.to_dict()
-            
-            if slot.status is False:  # Occupied
-                # Add zone and plate info for occupied slots
-                slot_data['zone'] = slot.zone
-                slot_data['vehicle_plate'] = slot.vehicle_plate
-                slot_data['entry_time'] = slot.entry_time.isoformat() if slot.entry_time else None
-                occupied_slots.append(slot_data)
-            else:  # Available
-                available_slots.append(slot_data)
-        
-        # Group occupied slots by zone for better visualization
-        occupied_by_zone = {}
-        for slot in occupied_slots:
-            zone = slot['zone']
-            if zone not in occupied_by_zone:
-                occupied_by_zone[zone] = []
-            occupied_by_zone[zone].append(slot)
+        if current_user.role not in ['admin', 'operator']:
+            return jsonify({'error': 'Admin & Operator access required'}), 403
         
-        return jsonify({
-            'slots': [slot.to_dict() for slot in slots],
-            'occupied_slots': occupied_slots,
-            'available_slots': available_slots,
-            'occupied_by_zone': occupied_by_zone,
-            'statistics': {
-                'total': total_slots,
-                'available': available_slots_count,
-                'occupied': occupied_slots_count,
-                'occupied_by_zone': {
-                    zone: len(slots_in_zone) 
-                    for zone, slots_in_zone in occupied_by_zone.items()
-                }
-            }
-        }), 200
+        resolution = request.args.get('resolution', 'auto')
+        if resolution not in ('auto', 'raw', *TIERS):
+            return jsonify({'error': f'Invalid resolution: {resolution}'}), 400
+        
+        try:
+            end = _parse_utc(request.args['end']) if request.args.get('end') else datetime.utcnow()
+            start = _parse_utc(request.args['start']) if request.args.get('start') else end - timedelta(days=7)
+        except ValueError:
+            return jsonify({'error': 'start and end must be ISO 8601 timestamps'}), 400
+        if start >= end:
+            return jsonify({'error': 'start must be before end'}), 400
+        
+        history = occupancy_history.series(
+            start, end, resolution=resolution,
+            level=request.args.get('level'), zone=request.args.get('zone')
+        )
+        return jsonify(history), 200
         
     except Exception as e:
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_slot():
     """Create new slot - Admin & Operator only"""
     try:
@@ -249,6 +318,7 @@ def create_slot():
         
         db.session.add(slot)
         db.session.commit()
+        cache.invalidate('slots')
         
         return jsonify({
             'message': 'Slot created successfully',
@@ -257,10 +327,12 @@ def create_slot():
         
     except Exception as e:
         db.session.rollback()
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/<int:slot_id_db>', methods=['PUT'])
 @jwt_required()
+@idempotent
 def update_slot(slot_id_db):
     """Update slot - Admin Operator only"""
     try:
@@ -295,6 +367,7 @@ def update_slot(slot_id_db):
                 return jsonify({'error': 'Invalid status value provided'}), 400
         
         db.session.commit()
+        cache.invalidate('slots')
         
         return jsonify({
             'message': 'Slot updated successfully',
@@ -303,10 +376,12 @@ def update_slot(slot_id_db):
         
     except Exception as e:
         db.session.rollback()
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/<int:slot_id_db>', methods=['DELETE'])
 @jwt_required()
+@idempotent
 def delete_slot(slot_id_db):
     """Delete slot - Admin Operator only"""
     try:
@@ -322,10 +397,12 @@ def delete_slot(slot_id_db):
         
         db.session.delete(slot)
         db.session.commit()
+        cache.invalidate('slots')
         
         return jsonify({'message': 'Slot deleted successfully'}), 200
         
     except Exception as e:
         db.session.rollback()
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
 
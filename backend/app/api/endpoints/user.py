@@ -1,9 +1,13 @@
+import logging
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, create_access_token, get_jwt_identity
 from app.db.models import db, User
+from app.core.cache import cache
+from app.db.routing import read_replica
 from werkzeug.security import generate_password_hash
 
 bp = Blueprint('user', __name__)
+logger = logging.getLogger(__name__)
 
 @bp.route('/login', methods=['POST'])
 def login():
@@ -28,6 +32,7 @@ def login():
         }), 200
         
     except Exception as e:
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/create_users', methods=['POST'])
@@ -67,6 +72,7 @@ def create_users():
         
         db.session.add(user)
         db.session.commit()
+        cache.invalidate('users')
         
         return jsonify({
             'message': 'User created successfully',
@@ -75,6 +81,7 @@ def create_users():
         
     except Exception as e:
         db.session.rollback()
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/<int:id>', methods=['PUT'])
@@ -112,10 +119,12 @@ def update_users(id):
             user.set_password(password)
 
         db.session.commit()
+        cache.invalidate('users')
         return jsonify({'message': 'User updated', 'user': user.to_dict()}), 200
 
     except Exception as e:
         db.session.rollback()
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/<int:id>', methods=['DELETE'])
@@ -135,10 +144,12 @@ def delete_user(id):
 
         db.session.delete(user)
         db.session.commit()
+        cache.invalidate('users')
         return jsonify({'message': 'User deleted successfully'}), 200
 
     except Exception as e:
         db.session.rollback()
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
 
 
@@ -155,10 +166,12 @@ def get_profile():
         return jsonify({'user': user.to_dict()}), 200
         
     except Exception as e:
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/users', methods=['GET'])
 @jwt_required()
+@read_replica
 def get_users():
     try:
         current_user_id = get_jwt_identity()
@@ -174,4 +187,5 @@ def get_users():
         }), 200
         
     except Exception as e:
+        logger.exception('Unhandled error in %s', request.endpoint)
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
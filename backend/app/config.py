@@ -15,6 +15,32 @@ class Config:
         f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Engine pool (see app/db/routing.py); DB_PGBOUNCER=True leaves pooling to PgBouncer
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '5'))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'True').lower() == 'true'
+    DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', '5'))
+    DB_PGBOUNCER = os.getenv('DB_PGBOUNCER', 'False').lower() == 'true'
+
+    # Statement timeout per endpoint class (0 = no timeout)
+    DB_STATEMENT_TIMEOUTS_MS = {
+        'gate': int(os.getenv('DB_STATEMENT_TIMEOUT_GATE_MS', '2000')),
+        'default': int(os.getenv('DB_STATEMENT_TIMEOUT_DEFAULT_MS', '10000')),
+        'report': int(os.getenv('DB_STATEMENT_TIMEOUT_REPORT_MS', '30000')),
+    }
+
+    # Read replica for admin/report reads (disabled when DB_REPLICA_HOST is empty)
+    DB_REPLICA_HOST = os.getenv('DB_REPLICA_HOST', '')
+    DB_REPLICA_PORT = os.getenv('DB_REPLICA_PORT', DB_PORT)
+    SQLALCHEMY_REPLICA_URI = (
+        f"postgresql://{DB_USER}:{DB_PASS}@{DB_REPLICA_HOST}:{DB_REPLICA_PORT}/{DB_NAME}"
+        if DB_REPLICA_HOST else ''
+    )
+    DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv('DB_REPLICA_MAX_LAG_SECONDS', '5'))
+    DB_REPLICA_CHECK_INTERVAL = float(os.getenv('DB_REPLICA_CHECK_INTERVAL', '5'))
     
     # JWT configuration
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'f60d8a307e9c96abb314fc5eb67e0adcb7008590')
@@ -22,6 +48,83 @@ class Config:
     
     # App configuration
     DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
+
+    # Logging (see app/core/logs.py)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_LEVELS = os.getenv('LOG_LEVELS', '')  # e.g. app.api=DEBUG,sqlalchemy.engine=WARNING
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')  # json, text
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '1.0'))
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+
+    # JSON provider (orjson when installed, else Flask's stdlib provider) and response compression
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'orjson')
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'True').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', '6'))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', '4'))
+
+    # SQL instrumentation
+    SQL_SLOW_QUERY_MS = float(os.getenv('SQL_SLOW_QUERY_MS', '200'))
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv('SQL_N_PLUS_ONE_THRESHOLD', '10'))
+
+    # Business metrics (occupancy, sessions, revenue) maintained in-process
+    BUSINESS_METRICS_ENABLED = os.getenv('BUSINESS_METRICS_ENABLED', 'True').lower() == 'true'
+    BUSINESS_METRICS_RECONCILE_SECONDS = int(os.getenv('BUSINESS_METRICS_RECONCILE_SECONDS', '300'))
+
+    # Fuzzy plate search: minimum pg_trgm similarity (0-1)
+    PLATE_SEARCH_SIMILARITY = float(os.getenv('PLATE_SEARCH_SIMILARITY', '0.3'))
+
+    # Admin dashboard snapshot: rebuilt at most once per interval
+    DASHBOARD_SNAPSHOT_INTERVAL = int(os.getenv('DASHBOARD_SNAPSHOT_INTERVAL', '5'))
+    DASHBOARD_RECENT_PAYMENTS = int(os.getenv('DASHBOARD_RECENT_PAYMENTS', '10'))
+
+    # Occupancy history: sample flush / rollup cadence and retention per tier (0 = keep forever)
+    OCCUPANCY_HISTORY_ENABLED = os.getenv('OCCUPANCY_HISTORY_ENABLED', 'True').lower() == 'true'
+    OCCUPANCY_FLUSH_SECONDS = float(os.getenv('OCCUPANCY_FLUSH_SECONDS', '2'))
+    OCCUPANCY_ROLLUP_SECONDS = float(os.getenv('OCCUPANCY_ROLLUP_SECONDS', '60'))
+    OCCUPANCY_MAX_POINTS = int(os.getenv('OCCUPANCY_MAX_POINTS', '1000'))
+    OCCUPANCY_RETENTION_DAYS = {
+        'raw': int(os.getenv('OCCUPANCY_RAW_RETENTION_DAYS', '2')),
+        'minute': int(os.getenv('OCCUPANCY_MINUTE_RETENTION_DAYS', '14')),
+        'hour': int(os.getenv('OCCUPANCY_HOUR_RETENTION_DAYS', '400')),
+        'day': int(os.getenv('OCCUPANCY_DAY_RETENTION_DAYS', '0')),
+    }
+
+    # Admission control: (concurrency, queue length, max queue wait seconds) per priority
+    ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'True').lower() == 'true'
+    ADMISSION_LIMITS = {
+        'gate': (int(os.getenv('ADMISSION_GATE_CONCURRENCY', '32')), int(os.getenv('ADMISSION_GATE_QUEUE', '64')),
+                 float(os.getenv('ADMISSION_GATE_MAX_WAIT', '2.0'))),
+        'default': (int(os.getenv('ADMISSION_DEFAULT_CONCURRENCY', '16')), int(os.getenv('ADMISSION_DEFAULT_QUEUE', '32')),
+                    float(os.getenv('ADMISSION_DEFAULT_MAX_WAIT', '1.0'))),
+        'dashboard': (int(os.getenv('ADMISSION_DASHBOARD_CONCURRENCY', '4')), int(os.getenv('ADMISSION_DASHBOARD_QUEUE', '8')),
+                      float(os.getenv('ADMISSION_DASHBOARD_MAX_WAIT', '0.5'))),
+    }
+    ADMISSION_GATE_SLO_MS = float(os.getenv('ADMISSION_GATE_SLO_MS', '500'))
+    ADMISSION_RETRY_AFTER = int(os.getenv('ADMISSION_RETRY_AFTER', '2'))
+
+    # Shared dashboard cache (disabled when REDIS_URL is empty)
+    REDIS_URL = os.getenv('REDIS_URL', '')
+    CACHE_DEFAULT_TTL = int(os.getenv('CACHE_DEFAULT_TTL', '30'))
+
+    # Idempotency-Key response store (in-memory LRU, plus Redis when REDIS_URL is set)
+    IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL', '86400'))
+    IDEMPOTENCY_MAX_ENTRIES = int(os.getenv('IDEMPOTENCY_MAX_ENTRIES', '10000'))
+
+    # Detection service (needs requirements-ml.txt)
+    DETECTION_ENABLED = os.getenv('DETECTION_ENABLED', 'False').lower() == 'true'
+    DETECTION_GPU = os.getenv('DETECTION_GPU', 'False').lower() == 'true'
+    VEHICLE_MODEL_PATH = os.getenv('VEHICLE_MODEL_PATH', 'yolov8s.pt')
+    DETECTION_BACKEND = os.getenv('DETECTION_BACKEND', 'torch')  # torch, onnx, openvino
+    DETECTION_IMGSZ = int(os.getenv('DETECTION_IMGSZ', '640'))
+    DETECTION_INT8 = os.getenv('DETECTION_INT8', 'False').lower() == 'true'  # onnx and openvino only
+    DETECTION_THREADS = int(os.getenv('DETECTION_THREADS', '0'))
+    DETECTION_MAX_BATCH = int(os.getenv('DETECTION_MAX_BATCH', '8'))
+    DETECTION_MAX_WAIT_MS = float(os.getenv('DETECTION_MAX_WAIT_MS', '5'))
+    DETECTION_TIMEOUT = float(os.getenv('DETECTION_TIMEOUT', '10'))
+    DETECTION_OCR_WORKERS = int(os.getenv('DETECTION_OCR_WORKERS', '0'))  # 0 = OCR in-process
+    DETECTION_OCR_THREADS = int(os.getenv('DETECTION_OCR_THREADS', '1'))
+    DETECTION_OCR_MAX_PENDING = int(os.getenv('DETECTION_OCR_MAX_PENDING', '0'))
     
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -0,0 +1 @@
+# app/core/__init__.py
@@ -0,0 +1,184 @@
+import threading
+import time
+from collections import deque
+
+from flask import current_app, g, jsonify, request
+from prometheus_client import Counter, Gauge, Histogram
+
+ADMISSION_IN_FLIGHT = Gauge(
+    'admission_in_flight_requests', 'Requests holding an admission slot',
+    ['priority']
+)
+
+ADMISSION_QUEUED_TOTAL = Counter(
+    'admission_queued_requests_total', 'Requests that waited for an admission slot',
+    ['priority']
+)
+
+ADMISSION_SHED_TOTAL = Counter(
+    'admission_shed_requests_total', 'Requests rejected with 503 by admission control',
+    ['priority', 'reason']  # reason: queue_full, timeout, slo
+)
+
+ADMISSION_QUEUE_WAIT_SECONDS = Histogram(
+    'admission_queue_wait_seconds', 'Time a request waited for an admission slot',
+    ['priority'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+ADMISSION_GATE_SLO_BREACHED = Gauge(
+    'admission_gate_slo_breached', '1 while gate p95 latency is above ADMISSION_GATE_SLO_MS'
+)
+
+# View request_class (set by app.db.routing.statement_class / read_replica) -> priority
+PRIORITY_BY_REQUEST_CLASS = {
+    'gate': 'gate',
+    'report': 'dashboard',
+}
+
+EXEMPT_ENDPOINTS = {
+    'health', 'api_health', 'prometheus_metrics', 'static',
+    # Long-lived SSE stream: teardown only runs when the display disconnects,
+    # so counting it would hold a slot for as long as a gate display is open
+    'ml_detection.gate_event_stream',
+}
+
+
+class ClassLimiter:
+    """Concurrency limit with a bounded wait queue for one priority class"""
+
+    def __init__(self, priority, limit, max_queue, max_wait):
+        self.priority = priority
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, queue_allowed=True):
+        """None when admitted, otherwise the shed reason"""
+        with self._condition:
+            if self.active < self.limit:
+                self.active += 1
+                return None
+            if not queue_allowed or self.waiting >= self.max_queue:
+                return 'queue_full'
+
+            ADMISSION_QUEUED_TOTAL.labels(self.priority).inc()
+            self.waiting += 1
+            started = time.perf_counter()
+            try:
+                admitted = self._condition.wait_for(lambda: self.active < self.limit, timeout=self.max_wait)
+            finally:
+                self.waiting -= 1
+                ADMISSION_QUEUE_WAIT_SECONDS.labels(self.priority).observe(time.perf_counter() - started)
+            if not admitted:
+                return 'timeout'
+            self.active += 1
+            return None
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+
+class GateLatencyTracker:
+    """Sliding-window p95 of gate request latency, recomputed at most once per second"""
+
+    def __init__(self, slo_seconds, window=200, stale_after=10.0):
+        self.slo_seconds = slo_seconds
+        self.stale_after = stale_after
+        self._breached = False
+        self._samples = deque(maxlen=window)
+        self._evaluated_at = 0.0
+        self._observed_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def breached(self):
+        # Without recent gate traffic there is nothing to protect
+        return self._breached and time.monotonic() - self._observed_at < self.stale_after
+
+    def observe(self, seconds):
+        now = time.monotonic()
+        with self._lock:
+            self._observed_at = now
+            self._samples.append(seconds)
+            if now - self._evaluated_at < 1.0:
+                return
+            self._evaluated_at = now
+            samples = sorted(self._samples)
+        p95 = samples[int(len(samples) * 0.95) - 1] if len(samples) >= 20 else 0.0
+        self._breached = p95 > self.slo_seconds
+        ADMISSION_GATE_SLO_BREACHED.set(1 if self._breached else 0)
+
+
+def _priority():
+    view = current_app.view_functions.get(request.endpoint)
+    request_class = getattr(view, 'request_class', None)
+    return PRIORITY_BY_REQUEST_CLASS.get(request_class, 'default')
+
+
+def init_admission_control(app):
+    """
+    Priority admission control in front of every view.
+
+    Requests are classified from their view (``gate``: recommend / entry /
+    exit / confirm / detection entry, ``dashboard``: replica-routed admin
+    reads, ``default``: everything else). Each class has its own
+    concurrency limit and wait queue, so gate traffic always has reserved
+    capacity no matter how many dashboard refreshes are running. A request
+    that finds its queue full or waits too long gets a fast 503 with
+    Retry-After; while gate p95 latency is above ADMISSION_GATE_SLO_MS,
+    dashboard requests are shed without queueing.
+    """
+    if not app.config.get('ADMISSION_ENABLED', True):
+        return
+
+    limits = app.config.get('ADMISSION_LIMITS') or {}
+    limiters = {
+        priority: ClassLimiter(priority, *limits.get(priority, default))
+        for priority, default in (
+            ('gate', (32, 64, 2.0)),
+            ('default', (16, 32, 1.0)),
+            ('dashboard', (4, 8, 0.5)),
+        )
+    }
+    tracker = GateLatencyTracker(app.config.get('ADMISSION_GATE_SLO_MS', 500) / 1000.0)
+    retry_after = str(app.config.get('ADMISSION_RETRY_AFTER', 2))
+
+    @app.before_request
+    def _admit_request():
+        if request.method == 'OPTIONS' or request.endpoint in EXEMPT_ENDPOINTS or request.endpoint is None:
+            return None
+
+        priority = _priority()
+        limiter = limiters[priority]
+        if priority == 'dashboard' and tracker.breached:
+            reason = 'slo'
+        else:
+            reason = limiter.acquire(queue_allowed=True)
+
+        if reason:
+            ADMISSION_SHED_TOTAL.labels(priority, reason).inc()
+            response = jsonify({'error': 'Server is busy, please retry shortly'})
+            response.status_code = 503
+            response.headers['Retry-After'] = retry_after
+            return response
+
+        g.admission_limiter = limiter
+        g.admission_started_at = time.perf_counter()
+        ADMISSION_IN_FLIGHT.labels(priority).inc()
+        return None
+
+    @app.teardown_request
+    def _release_admission(exc):
+        limiter = g.pop('admission_limiter', None)
+        if limiter is None:
+            return
+        limiter.release()
+        ADMISSION_IN_FLIGHT.labels(limiter.priority).dec()
+        if limiter.priority == 'gate':
+            tracker.observe(time.perf_counter() - g.pop('admission_started_at'))
@@ -0,0 +1,280 @@
+import logging
+import threading
+import time
+from datetime import timezone
+from collections import Counter as TallyCounter
+
+from prometheus_client import REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event, inspect
+
+from app.db.models import Payment, Slot
+
+logger = logging.getLogger(__name__)
+
+_CHANGES_KEY = 'parking_state_changes'
+_SETTLED_KEY = 'parking_state_settled'
+
+SESSION_STATES = ('active', 'pending')
+VEHICLE_TYPES = ('car', 'motorcycle')
+
+
+def _slot_state(slot):
+    return (slot.level, slot.zone, slot.status is False)
+
+
+def _payment_state(payment):
+    """('active' | 'pending', vehicle_type, pending since) or None once paid"""
+    if payment.status == 'paid':
+        return None
+    if payment.exit_time is None:
+        return ('active', payment.vehicle_type, None)
+    return ('pending', payment.vehicle_type, payment.exit_time.replace(tzinfo=timezone.utc).timestamp())
+
+
+class ParkingState:
+    """
+    In-process view of occupancy, open sessions and revenue.
+
+    Slot and payment rows are tracked by primary key; the per-zone and
+    per-state tallies are adjusted as committed ORM changes arrive (see
+    ``init_app``), so a scrape only reads a handful of dictionaries. A
+    background reconcile reloads the index from the database every
+    BUSINESS_METRICS_RECONCILE_SECONDS to pick up writes made outside this
+    process. Revenue and settled sessions are process-lifetime counters.
+    """
+
+    def __init__(self):
+        self.reconcile_interval = 300
+        self.reconciled_at = None
+        self._slots = {}
+        self._payments = {}
+        self._occupancy = TallyCounter()
+        self._capacity = TallyCounter()
+        self._sessions = TallyCounter()
+        self._pending_since = {}
+        self._revenue = TallyCounter()
+        self._settled = TallyCounter()
+        self._journal = None
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._registered = False
+
+    def init_app(self, app, db):
+        self.reconcile_interval = app.config.get('BUSINESS_METRICS_RECONCILE_SECONDS', self.reconcile_interval)
+        if not app.config.get('BUSINESS_METRICS_ENABLED', True):
+            return
+
+        event.listen(db.session, 'after_flush', self._stage_changes)
+        event.listen(db.session, 'after_commit', self._apply_staged)
+        event.listen(db.session, 'after_rollback', self._discard_staged)
+
+        if not self._registered:
+            REGISTRY.register(ParkingCollector(self))
+            self._registered = True
+
+        thread = threading.Thread(target=self._reconcile_loop, args=(app, db), name='parking-state', daemon=True)
+        thread.start()
+        app.extensions['parking_state'] = self
+
+    def add_occupancy_listener(self, callback):
+        """Call ``callback([(level, zone, occupied, total), ...])`` after occupancy changes"""
+        self._listeners.append(callback)
+
+    def _notify(self, before):
+        """Tell listeners about zones whose (occupied, total) differs from ``before``; caller holds no lock"""
+        with self._lock:
+            changed = [
+                (level, zone, self._occupancy[(level, zone)], self._capacity[(level, zone)])
+                for (level, zone), counts in before.items()
+                if counts != (self._occupancy.get((level, zone), 0), self._capacity.get((level, zone), 0))
+            ]
+        if not changed:
+            return
+        for callback in self._listeners:
+            try:
+                callback(changed)
+            except Exception:
+                logger.exception('Occupancy listener failed')
+
+    def _zone_counts(self, zones):
+        return {zone: (self._occupancy.get(zone, 0), self._capacity.get(zone, 0)) for zone in zones}
+
+    # --- session hooks ---
+
+    def _stage_changes(self, session, flush_context):
+        changes = session.info.setdefault(_CHANGES_KEY, {})
+        settled = session.info.setdefault(_SETTLED_KEY, [])
+        for obj in session.new | session.dirty:
+            if isinstance(obj, Slot):
+                changes[('slot', obj.id)] = _slot_state(obj)
+            elif isinstance(obj, Payment):
+                changes[('payment', obj.id)] = _payment_state(obj)
+                history = inspect(obj).attrs.status.history
+                if obj.status == 'paid' and history.added and 'paid' not in history.deleted:
+                    settled.append((obj.vehicle_type, float(obj.amount or 0)))
+        for obj in session.deleted:
+            if isinstance(obj, (Slot, Payment)):
+                changes[('slot' if isinstance(obj, Slot) else 'payment', obj.id)] = None
+
+    def _apply_staged(self, session):
+        changes = session.info.pop(_CHANGES_KEY, None)
+        settled = session.info.pop(_SETTLED_KEY, None)
+        if not changes and not settled:
+            return
+        with self._lock:
+            zones = set()
+            for key, state in (changes or {}).items():
+                if key[0] == 'slot':
+                    previous = self._slots.get(key[1])
+                    zones.update(s[:2] for s in (previous, state) if s is not None)
+            before = self._zone_counts(zones)
+            for key, state in (changes or {}).items():
+                self._set(key, state)
+            if changes and self._journal is not None:
+                self._journal.append(changes)
+            for vehicle_type, amount in settled or ():
+                self._revenue[vehicle_type] += amount
+                self._settled[vehicle_type] += 1
+        if before and self._listeners:
+            self._notify(before)
+
+    def _discard_staged(self, session):
+        session.info.pop(_CHANGES_KEY, None)
+        session.info.pop(_SETTLED_KEY, None)
+
+    # --- index maintenance (caller holds the lock) ---
+
+    def _set(self, key, state):
+        kind, row_id = key
+        if kind == 'slot':
+            previous = self._slots.pop(row_id, None)
+            if previous is not None:
+                level, zone, occupied = previous
+                self._capacity[(level, zone)] -= 1
+                self._occupancy[(level, zone)] -= occupied
+            if state is not None:
+                level, zone, occupied = state
+                self._slots[row_id] = state
+                self._capacity[(level, zone)] += 1
+                self._occupancy[(level, zone)] += occupied
+        else:
+            previous = self._payments.pop(row_id, None)
+            if previous is not None:
+                self._sessions[previous[:2]] -= 1
+                self._pending_since.pop(row_id, None)
+            if state is not None:
+                self._payments[row_id] = state
+                self._sessions[state[:2]] += 1
+                if state[0] == 'pending':
+                    self._pending_since[row_id] = state[2]
+
+    # --- reconcile ---
+
+    def reconcile(self, db):
+        """Rebuild the slot/payment index from the database"""
+        with self._lock:
+            self._journal = []
+        try:
+            slots = db.session.query(Slot.id, Slot.level, Slot.zone, Slot.status).all()
+            payments = db.session.query(
+                Payment.id, Payment.status, Payment.vehicle_type, Payment.exit_time
+            ).filter(Payment.status != 'paid').all()
+            db.session.rollback()
+        except Exception:
+            with self._lock:
+                self._journal = None
+            raise
+
+        with self._lock:
+            journal, self._journal = self._journal, None
+            # Zones never seen count as (0, 0), so the first reconcile reports every zone
+            before = self._zone_counts(set(self._capacity) | {(row.level, row.zone) for row in slots})
+            self._slots, self._payments = {}, {}
+            self._occupancy, self._capacity = TallyCounter(), TallyCounter()
+            self._sessions, self._pending_since = TallyCounter(), {}
+            for row in slots:
+                self._set(('slot', row.id), _slot_state(row))
+            for row in payments:
+                self._set(('payment', row.id), _payment_state(row))
+            # Commits that landed while the snapshot was read; states are absolute, so replaying is safe
+            for changes in journal:
+                for key, state in changes.items():
+                    self._set(key, state)
+            self.reconciled_at = time.time()
+        if self._listeners:
+            self._notify(before)
+
+    def _reconcile_loop(self, app, db):
+        while True:
+            try:
+                with app.app_context():
+                    self.reconcile(db)
+            except Exception as e:
+                logger.warning('Parking state reconcile failed, retrying later: %s', e)
+                time.sleep(min(30, self.reconcile_interval))
+                continue
+            time.sleep(self.reconcile_interval)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'capacity': dict(self._capacity),
+                'occupancy': dict(self._occupancy),
+                'sessions': dict(self._sessions),
+                'oldest_pending': min(self._pending_since.values(), default=None),
+                'revenue': dict(self._revenue),
+                'settled': dict(self._settled),
+                'reconciled_at': self.reconciled_at,
+            }
+
+
+class ParkingCollector:
+    """Prometheus collector that exposes ParkingState without touching the database"""
+
+    def __init__(self, state):
+        self.state = state
+
+    def collect(self):
+        snapshot = self.state.snapshot()
+
+        capacity = GaugeMetricFamily('parking_slots', 'Slots per level and zone', labels=['level', 'zone'])
+        occupied = GaugeMetricFamily('parking_slots_occupied', 'Occupied slots per level and zone', labels=['level', 'zone'])
+        for (level, zone), total in sorted(snapshot['capacity'].items()):
+            capacity.add_metric([level, zone], total)
+            occupied.add_metric([level, zone], snapshot['occupancy'].get((level, zone), 0))
+        yield capacity
+        yield occupied
+
+        sessions = GaugeMetricFamily(
+            'parking_sessions', 'Unpaid sessions: active (parked) or pending (awaiting QRIS payment)',
+            labels=['state', 'vehicle_type']
+        )
+        # Always export both states for the known vehicle types so alerts see 0, not an absent series
+        keys = set(snapshot['sessions']) | {(state, vehicle_type) for state in SESSION_STATES for vehicle_type in VEHICLE_TYPES}
+        for state, vehicle_type in sorted(keys):
+            sessions.add_metric([state, vehicle_type], snapshot['sessions'].get((state, vehicle_type), 0))
+        yield sessions
+
+        oldest = GaugeMetricFamily(
+            'parking_pending_payment_oldest_seconds', 'Age of the oldest exit still waiting for payment'
+        )
+        oldest.add_metric([], time.time() - snapshot['oldest_pending'] if snapshot['oldest_pending'] else 0)
+        yield oldest
+
+        revenue = CounterMetricFamily('parking_revenue', 'Settled parking revenue (IDR)', labels=['vehicle_type'])
+        settled = CounterMetricFamily('parking_payments_settled', 'Settled parking sessions', labels=['vehicle_type'])
+        for vehicle_type in sorted(snapshot['settled']):
+            revenue.add_metric([vehicle_type], snapshot['revenue'][vehicle_type])
+            settled.add_metric([vehicle_type], snapshot['settled'][vehicle_type])
+        yield revenue
+        yield settled
+
+        reconciled = GaugeMetricFamily(
+            'parking_state_reconciled_timestamp_seconds', 'Last time the parking state was reloaded from the database'
+        )
+        reconciled.add_metric([], snapshot['reconciled_at'] or 0)
+        yield reconciled
+
+
+parking_state = ParkingState()
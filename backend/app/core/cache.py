@@ -0,0 +1,149 @@
+import hashlib
+import json
+import logging
+import time
+import uuid
+
+import redis
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS_TOTAL = Counter(
+    'dashboard_cache_requests_total', 'Dashboard cache lookups',
+    ['name', 'result']  # result: hit, miss, wait_hit, bypass
+)
+
+KEY_PREFIX = 'parking:cache:'
+
+# Only the owner of the recompute lock may release it
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class DashboardCache:
+    """
+    Shared Redis cache for the admin dashboard reads.
+
+    Entries are keyed by name and normalized parameters and tagged with
+    what they depend on (``slots``, ``payments``, ``users``). Every tag has a
+    version counter that is part of the key, so ``invalidate('payments')``
+    is a single INCR and stale entries simply age out with their TTL.
+
+    On a miss only the worker holding the recompute lock runs the query;
+    concurrent requests for the same key wait briefly for its result instead
+    of all hitting the database. Without REDIS_URL, or while Redis is
+    unreachable, every call falls through to ``compute()``.
+    """
+
+    def __init__(self):
+        self.client = None
+        self.default_ttl = 30
+        self.lock_ttl = 10
+        self.wait_timeout = 2.0
+        self.poll_interval = 0.02
+
+    def init_app(self, app):
+        self.default_ttl = app.config.get('CACHE_DEFAULT_TTL', self.default_ttl)
+        self.lock_ttl = app.config.get('CACHE_LOCK_TTL', self.lock_ttl)
+        self.wait_timeout = app.config.get('CACHE_WAIT_TIMEOUT', self.wait_timeout)
+
+        url = app.config.get('REDIS_URL')
+        if url:
+            self.client = redis.Redis.from_url(
+                url,
+                socket_timeout=app.config.get('REDIS_SOCKET_TIMEOUT', 0.25),
+                socket_connect_timeout=app.config.get('REDIS_SOCKET_TIMEOUT', 0.25),
+            )
+        app.extensions['dashboard_cache'] = self
+
+    def remember(self, name, params, tags, compute, ttl=None):
+        """Return the cached value for (name, params), computing it at most once per key"""
+        if self.client is None:
+            CACHE_REQUESTS_TOTAL.labels(name, 'bypass').inc()
+            return compute()
+
+        try:
+            key = self._key(name, params, tags)
+            cached = self.client.get(key)
+            if cached is not None:
+                CACHE_REQUESTS_TOTAL.labels(name, 'hit').inc()
+                return json.loads(cached)
+
+            token = uuid.uuid4().hex
+            owns_lock = self.client.set(f'{key}:lock', token, nx=True, ex=self.lock_ttl)
+        except redis.RedisError as e:
+            logger.warning('Dashboard cache unavailable, computing %s directly: %s', name, e)
+            CACHE_REQUESTS_TOTAL.labels(name, 'bypass').inc()
+            return compute()
+
+        if owns_lock:
+            CACHE_REQUESTS_TOTAL.labels(name, 'miss').inc()
+            try:
+                value = compute()
+                self._store(key, value, ttl or self.default_ttl)
+                return value
+            finally:
+                self._release(f'{key}:lock', token)
+
+        # Someone else is recomputing this key: wait for their result
+        value = self._wait_for(key)
+        if value is not None:
+            CACHE_REQUESTS_TOTAL.labels(name, 'wait_hit').inc()
+            return value
+
+        CACHE_REQUESTS_TOTAL.labels(name, 'miss').inc()
+        return compute()
+
+    def invalidate(self, *tags):
+        """Drop every entry that depends on any of ``tags``"""
+        if self.client is None or not tags:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for tag in tags:
+                pipe.incr(f'{KEY_PREFIX}tag:{tag}')
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning('Dashboard cache invalidation failed for %s: %s', tags, e)
+
+    def _key(self, name, params, tags):
+        tags = sorted(tags)
+        versions = self.client.mget([f'{KEY_PREFIX}tag:{tag}' for tag in tags])
+        version_part = ','.join(
+            f'{tag}={int(version or 0)}' for tag, version in zip(tags, versions)
+        )
+        normalized = json.dumps(params or {}, sort_keys=True, default=str)
+        digest = hashlib.sha1(f'{normalized}|{version_part}'.encode()).hexdigest()
+        return f'{KEY_PREFIX}{name}:{digest}'
+
+    def _store(self, key, value, ttl):
+        try:
+            self.client.set(key, json.dumps(value), ex=ttl)
+        except redis.RedisError as e:
+            logger.warning('Dashboard cache store failed for %s: %s', key, e)
+
+    def _release(self, lock_key, token):
+        try:
+            self.client.eval(_RELEASE_LOCK, 1, lock_key, token)
+        except redis.RedisError as e:
+            logger.warning('Dashboard cache lock release failed for %s: %s', lock_key, e)
+
+    def _wait_for(self, key):
+        deadline = time.monotonic() + self.wait_timeout
+        try:
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                cached = self.client.get(key)
+                if cached is not None:
+                    return json.loads(cached)
+        except redis.RedisError as e:
+            logger.warning('Dashboard cache wait failed for %s: %s', key, e)
+        return None
+
+
+cache = DashboardCache()
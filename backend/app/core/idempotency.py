@@ -0,0 +1,196 @@
+import functools
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+from flask import current_app, request
+from prometheus_client import Counter
+
+from app.core.metrics import endpoint_label
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_REQUESTS_TOTAL = Counter(
+    'idempotency_requests_total', 'Requests carrying an Idempotency-Key',
+    ['endpoint', 'result']  # result: stored, replayed, in_progress, mismatch, not_stored
+)
+
+HEADER = 'Idempotency-Key'
+KEY_PREFIX = 'parking:idempotency:'
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyStore:
+    """
+    Response store for retried mutating requests.
+
+    A gate device sends the same ``Idempotency-Key`` header when it retries
+    an entry/exit/confirm after a timeout. The first response (status < 500)
+    is stored per method, path and key; retries get that response back
+    without touching the database or Midtrans. Reusing a key with a
+    different body or credentials is rejected (422), and a retry that
+    arrives while the first request is still running gets 409 with
+    ``Retry-After``.
+
+    Responses live in a bounded in-process LRU and, with REDIS_URL, also in
+    Redis so every worker sees them; Redis errors fall back to the LRU.
+    """
+
+    def __init__(self):
+        self.client = None
+        self.ttl = 86400
+        self.max_entries = 10000
+        self.lock_ttl = 30
+        self._entries = OrderedDict()
+        self._in_progress = set()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('IDEMPOTENCY_TTL', self.ttl)
+        self.max_entries = app.config.get('IDEMPOTENCY_MAX_ENTRIES', self.max_entries)
+        self.lock_ttl = app.config.get('IDEMPOTENCY_LOCK_TTL', self.lock_ttl)
+
+        url = app.config.get('REDIS_URL')
+        if url:
+            self.client = redis.Redis.from_url(
+                url,
+                socket_timeout=app.config.get('REDIS_SOCKET_TIMEOUT', 0.25),
+                socket_connect_timeout=app.config.get('REDIS_SOCKET_TIMEOUT', 0.25),
+            )
+        app.extensions['idempotency'] = self
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry['expires_at'] > now:
+                    self._entries.move_to_end(key)
+                    return entry
+                del self._entries[key]
+
+        if self.client is None:
+            return None
+        try:
+            cached = self.client.get(KEY_PREFIX + key)
+        except redis.RedisError as e:
+            logger.warning('Idempotency store unavailable, reading %s from memory only: %s', key, e)
+            return None
+        if cached is None:
+            return None
+        entry = json.loads(cached)
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key, entry):
+        entry['expires_at'] = time.time() + self.ttl
+        self._remember(key, entry)
+        if self.client is None:
+            return
+        try:
+            self.client.set(KEY_PREFIX + key, json.dumps(entry), ex=self.ttl)
+        except redis.RedisError as e:
+            logger.warning('Idempotency store write failed for %s: %s', key, e)
+
+    def begin(self, key):
+        """Claim the key for the request that will produce its response; False if already claimed"""
+        with self._lock:
+            if key in self._in_progress:
+                return False
+            self._in_progress.add(key)
+
+        if self.client is not None:
+            try:
+                if not self.client.set(f'{KEY_PREFIX}{key}:lock', 1, nx=True, ex=self.lock_ttl):
+                    with self._lock:
+                        self._in_progress.discard(key)
+                    return False
+            except redis.RedisError as e:
+                logger.warning('Idempotency lock unavailable for %s: %s', key, e)
+        return True
+
+    def finish(self, key):
+        with self._lock:
+            self._in_progress.discard(key)
+        if self.client is not None:
+            try:
+                self.client.delete(f'{KEY_PREFIX}{key}:lock')
+            except redis.RedisError as e:
+                logger.warning('Idempotency lock release failed for %s: %s', key, e)
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def _fingerprint():
+    digest = hashlib.sha256(request.get_data())
+    digest.update(request.headers.get('Authorization', '').encode())
+    return digest.hexdigest()
+
+
+def _response_from(entry):
+    response = current_app.response_class(
+        entry['body'], status=entry['status'], content_type=entry['content_type']
+    )
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(view):
+    """Replay the stored response when a request repeats its Idempotency-Key"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        idempotency_key = request.headers.get(HEADER)
+        if not idempotency_key:
+            return view(*args, **kwargs)
+
+        endpoint = endpoint_label()
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            return {'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'}, 400
+
+        key = f'{request.method}:{request.path}:{idempotency_key}'
+        fingerprint = _fingerprint()
+
+        entry = store.get(key)
+        if entry is None:
+            if not store.begin(key):
+                IDEMPOTENCY_REQUESTS_TOTAL.labels(endpoint, 'in_progress').inc()
+                return {'error': f'A request with this {HEADER} is still being processed'}, 409, {'Retry-After': '1'}
+            try:
+                # Another worker may have finished between our lookup and the claim
+                entry = store.get(key)
+                if entry is None:
+                    response = current_app.make_response(view(*args, **kwargs))
+                    if response.status_code >= 500 or response.is_streamed:
+                        IDEMPOTENCY_REQUESTS_TOTAL.labels(endpoint, 'not_stored').inc()
+                        return response
+                    store.put(key, {
+                        'fingerprint': fingerprint,
+                        'status': response.status_code,
+                        'body': response.get_data(as_text=True),
+                        'content_type': response.content_type,
+                    })
+                    IDEMPOTENCY_REQUESTS_TOTAL.labels(endpoint, 'stored').inc()
+                    return response
+            finally:
+                store.finish(key)
+
+        if entry['fingerprint'] != fingerprint:
+            IDEMPOTENCY_REQUESTS_TOTAL.labels(endpoint, 'mismatch').inc()
+            return {'error': f'{HEADER} was already used for a different request'}, 422
+
+        IDEMPOTENCY_REQUESTS_TOTAL.labels(endpoint, 'replayed').inc()
+        return _response_from(entry)
+
+    return wrapper
+
+
+store = IdempotencyStore()
@@ -0,0 +1,131 @@
+import decimal
+import gzip
+from datetime import timedelta
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to Flask's stdlib provider
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/plain', 'text/csv', 'text/html'}
+
+
+def _default(value):
+    """Types orjson does not serialize natively"""
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, timedelta):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    ``app.json`` provider backed by orjson.
+
+    datetimes, dates, UUIDs and dataclasses are serialized natively (ISO
+    8601), Decimal amounts as numbers and intervals as ``str(timedelta)``.
+    ``response()`` hands orjson's bytes straight to the response without an
+    intermediate ``str``. Keys are sorted like Flask's default provider so
+    payloads and their cache keys stay stable.
+    """
+
+    def _options(self, pretty=False):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=self._options(kwargs.get('indent'))).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=_default, option=self._options(pretty))
+        if pretty:
+            body += b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Install the orjson provider when orjson is installed"""
+    if orjson is not None and app.config.get('JSON_PROVIDER', 'orjson') == 'orjson':
+        app.json = OrjsonProvider(app)
+
+
+def _negotiate(accept_encoding):
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+def init_compression(app):
+    """gzip/brotli-compress large responses when the client accepts it"""
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', 6)
+    brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', 4)
+
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if response.content_length is not None and response.content_length < min_size:
+            return response
+
+        encoding = _negotiate(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        if encoding == 'br':
+            compressed = brotli.compress(data, quality=brotli_quality)
+        else:
+            compressed = gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        return response
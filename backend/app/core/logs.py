@@ -0,0 +1,180 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+import uuid
+
+from flask import g, has_request_context, request
+from prometheus_client import Counter
+
+LOG_RECORDS_DROPPED_TOTAL = Counter(
+    'log_records_dropped_total', 'Log records dropped because the log queue was full'
+)
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+# LogRecord attributes that are not user-supplied ``extra`` fields
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+# Listener of the current init_logging call (one per process)
+_listener = None
+
+
+class RequestContextFilter(logging.Filter):
+    """Attach the request id and endpoint of the current request to every record"""
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = g.get('request_id', '-')
+            record.endpoint = request.endpoint or '-'
+        else:
+            record.request_id = '-'
+            record.endpoint = '-'
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Keep only ``rate`` of DEBUG records; INFO and above always pass"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or self.rate >= 1.0 or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request id, extra fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'request_id': getattr(record, 'request_id', '-'),
+            'endpoint': getattr(record, 'endpoint', '-'),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key not in entry:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hand records to the listener thread without blocking.
+
+    The message is interpolated and the traceback rendered here, like the
+    stdlib ``QueueHandler`` does, so arguments (mutable objects, ORM rows)
+    are read while they are still valid on the calling thread; JSON
+    encoding and the write happen on the listener thread. When the queue is
+    full the record is dropped and counted instead of blocking the request.
+    """
+
+    _exception_formatter = logging.Formatter()
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or self._exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED_TOTAL.inc()
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
+
+def _parse_levels(spec):
+    """'app.api=DEBUG,sqlalchemy.engine=WARNING' -> {'app.api': 'DEBUG', ...}"""
+    levels = {}
+    for part in (spec or '').split(','):
+        name, _, level = part.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def init_logging(app):
+    """
+    Structured, non-blocking logging for the app.
+
+    Every record goes through a bounded queue to a listener thread that
+    formats it (JSON or text, LOG_FORMAT) and writes to stdout, so request
+    threads never wait on the Docker log driver. LOG_LEVEL sets the root
+    level, LOG_LEVELS per-logger overrides, LOG_DEBUG_SAMPLE_RATE the share
+    of DEBUG records kept. Each request gets an id (from X-Request-ID or a
+    new one) that is added to its log records and echoed in the response.
+    """
+    global _listener
+    if app.extensions.get('structured_logging'):
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    if app.config.get('LOG_FORMAT', 'json') == 'json':
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter(
+            '%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s'
+        ))
+
+    log_queue = queue.Queue(maxsize=app.config.get('LOG_QUEUE_SIZE', 10000))
+    handler = NonBlockingQueueHandler(log_queue)
+    sample_rate = app.config.get('LOG_DEBUG_SAMPLE_RATE', 1.0)
+    if sample_rate < 1.0:
+        handler.addFilter(DebugSamplingFilter(sample_rate))
+    handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    # An earlier create_app() in this process: drain and stop its listener thread
+    _stop_listener()
+    root.setLevel(app.config.get('LOG_LEVEL', 'INFO').upper())
+    for name, level in _parse_levels(app.config.get('LOG_LEVELS')).items():
+        logging.getLogger(name).setLevel(level)
+
+    # Flask's own logger writes through the root handler as well
+    app.logger.handlers.clear()
+    app.logger.propagate = True
+
+    listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    listener.start()
+    _listener = listener
+    app.extensions['structured_logging'] = listener
+
+    @app.before_request
+    def assign_request_id():
+        g.request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+
+    @app.after_request
+    def echo_request_id(response):
+        if 'request_id' in g:
+            response.headers[REQUEST_ID_HEADER] = g.request_id
+        return response
@@ -0,0 +1,156 @@
+import logging
+import re
+import time
+from collections import Counter as StatementCounter
+
+from flask import g, request, has_request_context
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# --- ================= REQUEST METRICS ================= ---
+# Defined at module level so the series are registered once per process,
+# not once per create_app() call.
+REQUESTS_TOTAL = Counter(
+    'http_requests_total', 'Total HTTP Requests',
+    ['method', 'endpoint']
+)
+
+IN_PROGRESS_REQUESTS = Gauge(
+    'http_requests_in_progress', 'Number of in progress HTTP requests'
+)
+
+REQUEST_LATENCY_SECONDS = Histogram(
+    'http_request_duration_seconds', 'HTTP Request Latency',
+    ['method', 'endpoint']
+)
+
+# --- ================= SQL METRICS ================= ---
+SQL_QUERIES_PER_REQUEST = Histogram(
+    'http_request_sql_queries', 'SQL statements executed per request',
+    ['endpoint'],
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233, 377)
+)
+
+SQL_DURATION_PER_REQUEST = Histogram(
+    'http_request_sql_duration_seconds', 'Time spent in SQL per request',
+    ['endpoint']
+)
+
+SQL_SLOW_QUERIES_TOTAL = Counter(
+    'sql_slow_queries_total', 'SQL statements slower than SQL_SLOW_QUERY_MS',
+    ['endpoint']
+)
+
+SQL_N_PLUS_ONE_TOTAL = Counter(
+    'sql_n_plus_one_requests_total', 'Requests flagged by the N+1 detector',
+    ['endpoint']
+)
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def endpoint_label():
+    """Low-cardinality label for the current request (blueprint.view)"""
+    if not has_request_context():
+        return 'none'
+    return request.endpoint or 'unmatched'
+
+
+def init_request_metrics(app):
+    """Update the HTTP request counters, gauge and histogram on every request"""
+
+    @app.before_request
+    def _start_request_metrics():
+        g.request_started_at = time.perf_counter()
+        g.sql_count = 0
+        g.sql_time = 0.0
+        g.sql_statements = StatementCounter()
+        IN_PROGRESS_REQUESTS.inc()
+
+    @app.after_request
+    def _record_request_metrics(response):
+        started_at = g.get('request_started_at')
+        if started_at is None:
+            return response
+
+        endpoint = endpoint_label()
+        REQUESTS_TOTAL.labels(request.method, endpoint).inc()
+        REQUEST_LATENCY_SECONDS.labels(request.method, endpoint).observe(
+            time.perf_counter() - started_at
+        )
+        SQL_QUERIES_PER_REQUEST.labels(endpoint).observe(g.sql_count)
+        SQL_DURATION_PER_REQUEST.labels(endpoint).observe(g.sql_time)
+        _detect_n_plus_one(app, endpoint)
+        return response
+
+    @app.teardown_request
+    def _finish_request_metrics(exc):
+        # teardown runs even when the view raised, so the gauge never leaks
+        if g.pop('request_started_at', None) is not None:
+            IN_PROGRESS_REQUESTS.dec()
+
+
+def init_sql_instrumentation(app, db):
+    """Count and time every statement issued on the app's engines (primary and read replica)"""
+    slow_query_seconds = app.config.get('SQL_SLOW_QUERY_MS', 200) / 1000.0
+
+    with app.app_context():
+        engines = set(db.engines.values())
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+
+        if has_request_context() and 'sql_count' in g:
+            g.sql_count += 1
+            g.sql_time += elapsed
+            g.sql_statements[statement] += 1
+
+        if elapsed >= slow_query_seconds:
+            endpoint = endpoint_label()
+            SQL_SLOW_QUERIES_TOTAL.labels(endpoint).inc()
+            logger.warning(
+                'Slow query (%.1f ms) on %s: %s',
+                elapsed * 1000, endpoint, _WHITESPACE.sub(' ', statement)[:500]
+            )
+
+    def _handle_error(context):
+        # A failed statement never reaches after_cursor_execute; drop its start time
+        # so later statements on this pooled connection are timed from their own start
+        if context.connection is not None and context.execution_context is not None:
+            started = context.connection.info.get('query_start_time')
+            if started:
+                started.pop()
+
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _handle_error)
+
+
+def _detect_n_plus_one(app, endpoint):
+    """
+    Flag a request when one parametrized statement ran many times.
+
+    A statement repeated once per loaded row (e.g. the lazy ``payment.slot``
+    lookup in ``Payment.to_dict``) is the signature of a statement count that
+    grows with the result size.
+    """
+    threshold = app.config.get('SQL_N_PLUS_ONE_THRESHOLD', 10)
+    statements = g.get('sql_statements')
+    if not statements:
+        return
+
+    statement, count = statements.most_common(1)[0]
+    if count < threshold:
+        return
+
+    SQL_N_PLUS_ONE_TOTAL.labels(endpoint).inc()
+    logger.warning(
+        'Possible N+1 on %s: statement ran %d times (%d statements total): %s',
+        endpoint, count, g.sql_count, _WHITESPACE.sub(' ', statement)[:300]
+    )
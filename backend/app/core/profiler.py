@@ -0,0 +1,156 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from itertools import count
+
+from flask import g, request
+
+# --- ================= CONFIGURATION ================= ---
+DEFAULT_SAMPLE_EVERY = 10        # profile 1 in N requests
+DEFAULT_INTERVAL_MS = 5          # stack sampling interval
+MAX_STACKS_PER_ENDPOINT = 5000   # distinct folded stacks kept per endpoint
+# --- =============================================== ---
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for live workers.
+
+    While enabled, one daemon thread samples the stacks of the request
+    threads that were picked for profiling and aggregates them per endpoint
+    as folded stacks (``frame;frame;frame count``), the input format of
+    flamegraph.pl and speedscope. When disabled, the only per-request cost is
+    a single attribute check.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.sample_every = DEFAULT_SAMPLE_EVERY
+        self.interval = DEFAULT_INTERVAL_MS / 1000.0
+        self.endpoint_filter = None
+        self._requests_seen = count()
+        self._active = {}  # thread ident -> endpoint
+        self._stacks = defaultdict(Counter)
+        self._profiled_requests = Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def enable(self, sample_every=None, interval_ms=None, endpoint=None):
+        self.sample_every = max(1, int(sample_every or DEFAULT_SAMPLE_EVERY))
+        self.interval = max(1, int(interval_ms or DEFAULT_INTERVAL_MS)) / 1000.0
+        self.endpoint_filter = endpoint or None
+        self.enabled = True
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name='sampling-profiler', daemon=True
+            )
+            self._thread.start()
+
+    def disable(self):
+        self.enabled = False
+        with self._lock:
+            self._active.clear()
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self._profiled_requests.clear()
+
+    def status(self):
+        with self._lock:
+            endpoints = {
+                endpoint: {
+                    'profiled_requests': self._profiled_requests[endpoint],
+                    'samples': sum(stacks.values()),
+                    'distinct_stacks': len(stacks),
+                }
+                for endpoint, stacks in self._stacks.items()
+            }
+        return {
+            'enabled': self.enabled,
+            'sample_every': self.sample_every,
+            'interval_ms': int(self.interval * 1000),
+            'endpoint': self.endpoint_filter,
+            'endpoints': endpoints,
+        }
+
+    def folded(self, endpoint=None):
+        """Folded stacks as text; each line is prefixed with its endpoint when mixing endpoints"""
+        with self._lock:
+            if endpoint:
+                items = [(None, self._stacks.get(endpoint, Counter()))]
+            else:
+                items = list(self._stacks.items())
+            lines = []
+            for name, stacks in items:
+                prefix = f'{name};' if name else ''
+                for stack, samples in stacks.most_common():
+                    lines.append(f'{prefix}{stack} {samples}')
+        return '\n'.join(lines) + ('\n' if lines else '')
+
+    # --- request hooks ---
+    def should_profile(self, endpoint, path):
+        if self.endpoint_filter:
+            if endpoint != self.endpoint_filter and not path.startswith(self.endpoint_filter):
+                return False
+        return next(self._requests_seen) % self.sample_every == 0
+
+    def start(self, endpoint):
+        with self._lock:
+            self._active[threading.get_ident()] = endpoint
+            self._profiled_requests[endpoint] += 1
+
+    def stop(self):
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+
+    # --- sampler thread ---
+    def _run(self):
+        own_ident = threading.get_ident()
+        while self.enabled:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                frames = sys._current_frames()
+                for ident, endpoint in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is None or ident == own_ident:
+                        continue
+                    stacks = self._stacks[endpoint]
+                    stack = _fold(frame)
+                    if stack in stacks or len(stacks) < MAX_STACKS_PER_ENDPOINT:
+                        stacks[stack] += 1
+
+
+def _fold(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+        frame = frame.f_back
+    names.reverse()
+    return ';'.join(names)
+
+
+profiler = SamplingProfiler()
+
+
+def init_profiler(app):
+    """Hook the shared profiler into every request of the app"""
+
+    @app.before_request
+    def _start_profiling():
+        if not profiler.enabled:
+            return
+        endpoint = request.endpoint or 'unmatched'
+        if profiler.should_profile(endpoint, request.path):
+            profiler.start(endpoint)
+            g.profiling = True
+
+    @app.teardown_request
+    def _stop_profiling(exc):
+        if g.pop('profiling', False):
+            profiler.stop()
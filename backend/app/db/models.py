@@ -2,8 +2,21 @@ from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 import uuid
+from sqlalchemy import event
+from sqlalchemy.orm import validates
+from app.db.routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+def normalize_plate(plate):
+    """
+    Canonical plate form for storage and lookups: upper case without whitespace,
+    dots or hyphens ('b 1234-xy' -> 'B1234XY'), the same form the detector
+    reads (ml_models/pipeline.py normalize_plate)
+    """
+    if not plate:
+        return plate
+    return ''.join(plate.split()).upper().replace('.', '').replace('-', '')
 
 class User(db.Model):
     __tablename__ = "users"
@@ -51,6 +64,10 @@ class Slot(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     payments = db.relationship("Payment", backref="slot", lazy=True)
+
+    @validates('vehicle_plate')
+    def _normalize_vehicle_plate(self, key, value):
+        return normalize_plate(value)
     
     def to_dict(self):
         return {
@@ -66,6 +83,23 @@ class Slot(db.Model):
 
 class Payment(db.Model):
     __tablename__ = "payments"
+    __table_args__ = (
+        # Exact and prefix plate lookups, newest first (pattern ops so LIKE 'B12%' can use it)
+        db.Index(
+            'ix_payments_vehicle_plate_entry_time', 'vehicle_plate', 'entry_time', 'id',
+            postgresql_ops={'vehicle_plate': 'varchar_pattern_ops'}
+        ),
+        # Fuzzy plate search (pg_trgm similarity); created only on PostgreSQL
+        db.Index(
+            'ix_payments_vehicle_plate_trgm', 'vehicle_plate',
+            postgresql_using='gin', postgresql_ops={'vehicle_plate': 'gin_trgm_ops'}
+        ).ddl_if(dialect='postgresql'),
+        # At most one open session per plate; concurrent gate entries for the same car fail on commit
+        db.Index(
+            'uq_payments_unpaid_vehicle_plate', 'vehicle_plate', unique=True,
+            postgresql_where=db.text("status = 'unpaid'"), sqlite_where=db.text("status = 'unpaid'")
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     payment_id = db.Column(db.String(100), nullable=False, unique=True)
@@ -86,6 +120,10 @@ class Payment(db.Model):
         super().__init__(**kwargs)
         if not self.payment_id:
             self.payment_id = str(uuid.uuid4())
+
+    @validates('vehicle_plate')
+    def _normalize_vehicle_plate(self, key, value):
+        return normalize_plate(value)
     
     def calculate_amount(self):
         """Calculate parking fee based on duration"""
@@ -124,4 +162,54 @@ class Payment(db.Model):
             'qr_code': self.qr_code,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+@event.listens_for(Payment.__table__, 'before_create')
+def _create_pg_trgm(target, connection, **kw):
+    if connection.dialect.name == 'postgresql':
+        connection.exec_driver_sql('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+
+class OccupancySample(db.Model):
+    """Occupancy of one level/zone, appended whenever it changes"""
+    __tablename__ = "occupancy_samples"
+    __table_args__ = (
+        db.Index('ix_occupancy_samples_recorded_at', 'recorded_at'),
+    )
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    level = db.Column(db.String(10), nullable=False)
+    zone = db.Column(db.String(10), nullable=False)
+    occupied = db.Column(db.Integer, nullable=False)
+    total = db.Column(db.Integer, nullable=False)
+    recorded_at = db.Column(db.DateTime, nullable=False)
+
+
+class OccupancyRollup(db.Model):
+    """Downsampled occupancy per level/zone: one row per minute, hour or day bucket"""
+    __tablename__ = "occupancy_rollups"
+    __table_args__ = (
+        db.UniqueConstraint('resolution', 'level', 'zone', 'bucket_start', name='uq_occupancy_rollups_bucket'),
+        db.Index('ix_occupancy_rollups_range', 'resolution', 'bucket_start'),
+    )
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    resolution = db.Column(db.String(10), nullable=False)  # minute, hour, day
+    level = db.Column(db.String(10), nullable=False)
+    zone = db.Column(db.String(10), nullable=False)
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    avg_occupied = db.Column(db.Float, nullable=False)  # time-weighted over the bucket
+    min_occupied = db.Column(db.Integer, nullable=False)
+    max_occupied = db.Column(db.Integer, nullable=False)
+    last_occupied = db.Column(db.Integer, nullable=False)
+    total = db.Column(db.Integer, nullable=False)
+
+    def to_dict(self):
+        return {
+            't': self.bucket_start.isoformat(),
+            'avg': round(self.avg_occupied, 2),
+            'min': self.min_occupied,
+            'max': self.max_occupied,
+            'last': self.last_occupied,
+            'total': self.total,
+        }
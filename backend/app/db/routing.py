@@ -0,0 +1,177 @@
+import functools
+import logging
+import threading
+import time
+
+from flask import g, has_request_context
+from flask_sqlalchemy.session import Session
+from prometheus_client import Counter, Gauge
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool
+
+logger = logging.getLogger(__name__)
+
+DB_READ_ROUTE_TOTAL = Counter(
+    'db_read_route_total', 'Read-only requests by the database they were routed to',
+    ['target', 'reason']  # target: replica, primary; reason: ok, lagging, unavailable, not_configured
+)
+
+DB_REPLICA_LAG_SECONDS = Gauge(
+    'db_replica_lag_seconds', 'Replication lag of the read replica at the last check'
+)
+
+REPLICA_BIND = 'replica'
+
+# Seconds the replica is behind the primary; 0 when it has replayed everything it received
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+def engine_options(app, uri):
+    """Pool/connect options for one engine from the DB_* settings"""
+    config = app.config
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if not uri.startswith('postgresql'):
+        return options
+
+    options.setdefault('pool_pre_ping', config.get('DB_POOL_PRE_PING', True))
+    if config.get('DB_PGBOUNCER'):
+        # PgBouncer (transaction pooling) owns the pool; keep no idle connections here
+        options.setdefault('poolclass', NullPool)
+    else:
+        options.setdefault('pool_size', config.get('DB_POOL_SIZE', 10))
+        options.setdefault('max_overflow', config.get('DB_MAX_OVERFLOW', 20))
+        options.setdefault('pool_timeout', config.get('DB_POOL_TIMEOUT', 5))
+        options.setdefault('pool_recycle', config.get('DB_POOL_RECYCLE', 1800))
+        options.setdefault('pool_use_lifo', True)
+
+    connect_args = dict(options.get('connect_args') or {})
+    connect_args.setdefault('connect_timeout', config.get('DB_CONNECT_TIMEOUT', 5))
+    connect_args.setdefault('application_name', 'parking-api')
+    options['connect_args'] = connect_args
+    return options
+
+
+def configure_engines(app):
+    """Set SQLALCHEMY_ENGINE_OPTIONS and the replica bind; call before db.init_app"""
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app, uri)
+
+    replica_uri = app.config.get('SQLALCHEMY_REPLICA_URI')
+    if replica_uri:
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        binds[REPLICA_BIND] = {'url': replica_uri, **engine_options(app, replica_uri)}
+        app.config['SQLALCHEMY_BINDS'] = binds
+
+
+class ReplicaMonitor:
+    """Cached replica lag check; read-only requests fall back to the primary when it lags"""
+
+    def __init__(self):
+        self.max_lag = 5.0
+        self.check_interval = 5.0
+        self.lag = None
+        self.error = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_lag = app.config.get('DB_REPLICA_MAX_LAG_SECONDS', self.max_lag)
+        self.check_interval = app.config.get('DB_REPLICA_CHECK_INTERVAL', self.check_interval)
+
+    def route(self, engines):
+        """'ok' when the replica may serve reads, otherwise the reason it may not"""
+        engine = engines.get(REPLICA_BIND)
+        if engine is None:
+            return 'not_configured'
+
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval and self._lock.acquire(blocking=False):
+            # One request refreshes the lag; the others use the last reading
+            try:
+                self._checked_at = now
+                with engine.connect() as connection:
+                    self.lag = float(connection.exec_driver_sql(REPLICA_LAG_SQL).scalar() or 0)
+                self.error = None
+                DB_REPLICA_LAG_SECONDS.set(self.lag)
+            except Exception as e:
+                self.error = str(e)
+                logger.warning('Read replica check failed, using the primary: %s', e)
+            finally:
+                self._lock.release()
+
+        if self.error:
+            return 'unavailable'
+        if self.lag is None or self.lag > self.max_lag:
+            return 'lagging'
+        return 'ok'
+
+
+class RoutingSession(Session):
+    """
+    Session that sends read-only requests to the replica.
+
+    Views decorated with ``read_replica`` read from the replica bind while
+    it is reachable and within DB_REPLICA_MAX_LAG_SECONDS; flushes and any
+    request without the flag always use the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context() and g.get('db_read_replica'):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _set_statement_timeout(session, transaction, connection):
+    if connection.dialect.name != 'postgresql':
+        return
+    timeout_ms = statement_timeouts.get(g.get('db_statement_class', 'default') if has_request_context() else 'default')
+    if timeout_ms:
+        # SET LOCAL lasts for this transaction only, so it is safe behind PgBouncer
+        connection.exec_driver_sql(f'SET LOCAL statement_timeout = {int(timeout_ms)}')
+
+
+def init_routing(app, db):
+    """Statement timeouts per endpoint class and lag-aware replica routing"""
+    statement_timeouts.update(app.config.get('DB_STATEMENT_TIMEOUTS_MS') or {})
+    replica_monitor.init_app(app)
+    event.listen(db.session, 'after_begin', _set_statement_timeout)
+
+
+def statement_class(name):
+    """Run a view's queries under the statement timeout of class ``name`` (gate, default, report)"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            g.db_statement_class = name
+            return view(*args, **kwargs)
+        # Also read by admission control (app/core/admission.py) before the view runs
+        wrapper.request_class = name
+        return wrapper
+    return decorator
+
+
+def read_replica(view):
+    """Serve a read-only admin/report view from the replica when it is healthy"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        from app.db.models import db
+
+        g.db_statement_class = 'report'
+        reason = replica_monitor.route(db.engines)
+        g.db_read_replica = reason == 'ok'
+        DB_READ_ROUTE_TOTAL.labels('replica' if g.db_read_replica else 'primary', reason).inc()
+        return view(*args, **kwargs)
+    wrapper.request_class = 'report'
+    return wrapper
+
+
+statement_timeouts = {'gate': 2000, 'default': 10000, 'report': 30000}
+replica_monitor = ReplicaMonitor()
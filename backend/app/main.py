@@ -5,6 +5,18 @@ from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from app.config import Config
 from app.db.models import db
+from app.db.routing import configure_engines, init_routing
+from app.core.metrics import init_request_metrics, init_sql_instrumentation
+from app.core.profiler import init_profiler
+from app.core.admission import init_admission_control
+from app.core.cache import cache
+from app.core.business_metrics import parking_state
+from app.core.logs import init_logging
+from app.core.json_provider import init_json, init_compression
+from app.core.idempotency import store as idempotency_store
+from app.services.detection import detection_service
+from app.services.occupancy_history import occupancy_history
+from app.services.dashboard import dashboard_snapshot
 
 # --- CRITICAL FIX: Correct Blueprint Imports for Nested Structure ---
 # Import the 'bp' object directly from each blueprint's specific file.
@@ -15,44 +27,63 @@ from app.db.models import db
 from app.api.endpoints.payment import bp as payment_bp
 from app.api.endpoints.slot import bp as slot_bp
 from app.api.endpoints.user import bp as user_bp
+from app.api.endpoints.profiler import bp as profiler_bp
+from app.api.endpoints.ml_detection import bp as ml_detection_bp
+from app.api.endpoints.dashboard import bp as dashboard_bp
 # -----------------------------------------------
 
 from prometheus_flask_exporter import PrometheusMetrics
-from prometheus_client import make_wsgi_app, Counter, Gauge, Histogram
 
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
+    # Structured logging off the request thread, with request ids
+    init_logging(app)
+
+    # orjson-backed jsonify and gzip/brotli for large responses
+    init_json(app)
+    init_compression(app)
+
     # Initialize extensions
     CORS(app, supports_credentials=True)
 
+    configure_engines(app)
     db.init_app(app)
+    init_routing(app, db)
+    cache.init_app(app)
+    idempotency_store.init_app(app)
+    detection_service.init_app(app)
+    dashboard_snapshot.init_app(app)
     migrate = Migrate(app, db)
     jwt = JWTManager(app)
 
     metrics = PrometheusMetrics(app)
     metrics.info('parking_app_info', 'Parking Application Info', version='1.0.0')
 
-    REQUESTS_TOTAL = Counter(
-        'http_requests_total', 'Total HTTP Requests',
-        ['method', 'endpoint']
-    )
+    # Request lifecycle metrics and per-request SQL counting/timing
+    init_request_metrics(app)
+    init_sql_instrumentation(app, db)
+
+    # Occupancy/session/revenue metrics kept up to date from committed changes,
+    # and the occupancy time series fed by them (listener first, so it sees the initial load)
+    occupancy_history.init_app(app, db, parking_state)
+    parking_state.init_app(app, db)
 
-    IN_PROGRESS_REQUESTS = Gauge(
-        'http_requests_in_progress', 'Number of in progress HTTP requests'
-    )
+    # Sampled per-request profiling, toggled at runtime via /api/profiler
+    init_profiler(app)
 
-    REQUEST_LATENCY_SECONDS = Histogram(
-        'http_request_duration_seconds', 'HTTP Request Latency',
-        ['method', 'endpoint']
-    )
+    # Per-class concurrency limits and load shedding that keep gate capacity reserved
+    init_admission_control(app)
 
     # Register blueprints (using the correctly imported 'bp' objects)
     app.register_blueprint(payment_bp, url_prefix='/api/payments')
     app.register_blueprint(slot_bp, url_prefix='/api/slots')
     app.register_blueprint(user_bp, url_prefix='/api/users')
+    app.register_blueprint(profiler_bp, url_prefix='/api/profiler')
+    app.register_blueprint(ml_detection_bp, url_prefix='/api/detection')
+    app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
 
     @app.route("/health")
     def health():
@@ -0,0 +1,92 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from prometheus_client import Histogram
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = Histogram(
+    'detection_batch_size', 'Frames per vehicle detector batch',
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16, 24, 32)
+)
+
+BATCH_QUEUE_WAIT_SECONDS = Histogram(
+    'detection_batch_queue_wait_seconds', 'Time a frame waited for its batch to start',
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+BATCH_INFERENCE_SECONDS = Histogram(
+    'detection_batch_inference_seconds', 'Vehicle detector time per batch'
+)
+
+
+class MicroBatcher:
+    """
+    Collect items from many callers into small batches for one worker.
+
+    The worker thread takes the first queued item, then keeps collecting
+    for up to ``max_wait_ms`` or until ``max_batch_size`` items, and calls
+    ``batch_fn(items)`` once; the i-th result resolves the i-th caller's
+    future. Under light load a frame waits at most ``max_wait_ms``; under
+    heavy load batches fill up and the detector runs at its batched
+    throughput instead of one frame at a time.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=8, max_wait_ms=5, name='micro-batcher'):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            for _, _, queued_at in batch:
+                BATCH_QUEUE_WAIT_SECONDS.observe(started - queued_at)
+            BATCH_SIZE.observe(len(batch))
+
+            try:
+                results = self.batch_fn([item for item, _, _ in batch])
+            except Exception as e:
+                logger.exception('Batch of %d failed', len(batch))
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            finally:
+                BATCH_INFERENCE_SECONDS.observe(time.perf_counter() - started)
+
+            results = list(results)
+            if len(results) != len(batch):
+                logger.error('Batch of %d returned %d results', len(batch), len(results))
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+            # Never leave a caller waiting for a result that will not come
+            for _, future, _ in batch[len(results):]:
+                future.set_exception(RuntimeError(f'No result for this item ({len(results)} results for {len(batch)} items)'))
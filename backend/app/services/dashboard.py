@@ -0,0 +1,122 @@
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import joinedload
+
+from app.core.business_metrics import parking_state
+from app.core.cache import cache
+from app.db.models import db, Payment, Slot
+
+
+class DashboardSnapshot:
+    """
+    One payload for the admin dashboard pages, rebuilt at most once per interval.
+
+    Occupancy by level/zone and the active/pending session counts come from
+    ``ParkingState`` (no SQL once it has been reconciled); the slot grid,
+    today's revenue and the most recent payments are read once per rebuild.
+    The built snapshot is kept in-process and shared across workers through
+    the dashboard cache (TTL = DASHBOARD_SNAPSHOT_INTERVAL), so concurrent
+    operators cost one rebuild per interval. While one request rebuilds,
+    the others get the previous snapshot instead of waiting.
+    """
+
+    def __init__(self):
+        self.interval = 5
+        self.recent_payments = 10
+        self._value = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.interval = app.config.get('DASHBOARD_SNAPSHOT_INTERVAL', self.interval)
+        self.recent_payments = app.config.get('DASHBOARD_RECENT_PAYMENTS', self.recent_payments)
+        app.extensions['dashboard_snapshot'] = self
+
+    def get(self):
+        if self._value is not None and time.monotonic() - self._built_at < self.interval:
+            return self._value
+        if not self._lock.acquire(blocking=self._value is None):
+            return self._value
+        try:
+            if self._value is None or time.monotonic() - self._built_at >= self.interval:
+                self._value = cache.remember('dashboard.snapshot', {}, tags=(), compute=self.build, ttl=self.interval)
+                self._built_at = time.monotonic()
+            return self._value
+        finally:
+            self._lock.release()
+
+    def build(self):
+        slots = Slot.query.order_by(Slot.level, Slot.slot_id).all()
+        state = parking_state.snapshot()
+        if state['reconciled_at'] is not None:
+            capacity, occupancy = state['capacity'], state['occupancy']
+            sessions = {'active': 0, 'pending': 0}
+            for (session_state, _), count in state['sessions'].items():
+                sessions[session_state] += count
+        else:
+            # Parking state not loaded yet (or disabled): count from the rows at hand
+            capacity, occupancy = {}, {}
+            for slot in slots:
+                key = (slot.level, slot.zone)
+                capacity[key] = capacity.get(key, 0) + 1
+                occupancy[key] = occupancy.get(key, 0) + (slot.status is False)
+            sessions = dict(db.session.query(
+                case((Payment.exit_time.is_(None), 'active'), else_='pending'), func.count(Payment.id)
+            ).filter(Payment.status == 'unpaid').group_by(Payment.exit_time.is_(None)).all())
+            sessions.setdefault('active', 0)
+            sessions.setdefault('pending', 0)
+
+        zones = [
+            {
+                'level': level, 'zone': zone, 'total': total,
+                'occupied': occupancy.get((level, zone), 0),
+                'available': total - occupancy.get((level, zone), 0),
+            }
+            for (level, zone), total in sorted(capacity.items()) if total
+        ]
+        total_slots = sum(zone['total'] for zone in zones)
+        occupied_slots = sum(zone['occupied'] for zone in zones)
+
+        # Same definition as /api/payments/statistics: sessions that entered today
+        today_start = datetime.combine(datetime.now().date(), datetime.min.time())
+        transactions, paid_transactions, revenue = db.session.query(
+            func.count(Payment.id),
+            func.count(case((Payment.status == 'paid', Payment.id))),
+            func.sum(case((Payment.status == 'paid', Payment.amount), else_=0)),
+        ).filter(Payment.entry_time >= today_start).one()
+
+        recent = (
+            Payment.query.options(joinedload(Payment.slot))
+            .order_by(Payment.created_at.desc())
+            .limit(self.recent_payments)
+            .all()
+        )
+
+        return {
+            'generated_at': datetime.utcnow().isoformat(),
+            'refresh_interval': self.interval,
+            'statistics': {
+                'total': total_slots,
+                'occupied': occupied_slots,
+                'available': total_slots - occupied_slots,
+            },
+            'occupancy_by_zone': zones,
+            'active_sessions': {
+                'active': sessions['active'],
+                'pending_payment': sessions['pending'],
+                'total': sessions['active'] + sessions['pending'],
+            },
+            'today': {
+                'transactions': transactions,
+                'paid_transactions': paid_transactions,
+                'revenue': float(revenue or 0),
+            },
+            'recent_payments': [payment.to_dict() for payment in recent],
+            'slots': [slot.to_dict() for slot in slots],
+        }
+
+
+dashboard_snapshot = DashboardSnapshot()
@@ -0,0 +1,168 @@
+import logging
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from prometheus_client import Gauge, Histogram
+
+from app.services.batching import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+OCR_QUEUE_DEPTH = Gauge(
+    'detection_ocr_queue_depth', 'Plate OCR jobs queued or in service in the OCR worker pool'
+)
+
+OCR_SERVICE_SECONDS = Histogram(
+    'detection_ocr_service_seconds', 'Plate OCR time inside an OCR worker'
+)
+
+OCR_QUEUE_WAIT_SECONDS = Histogram(
+    'detection_ocr_queue_wait_seconds', 'Time a plate OCR job waited for a free OCR worker',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+
+class DetectionService:
+    """
+    Long-lived vehicle/plate detection service.
+
+    The YOLO detector and EasyOCR reader are loaded once per worker on a
+    background thread at startup and warmed up with a dummy frame, so the
+    gate gets answers in the inference time of one frame instead of paying
+    model load on every capture. Until the models are ready ``detect``
+    raises ``DetectionUnavailable``.
+
+    Frames from all gate lanes go through one ``MicroBatcher`` so the
+    vehicle detector runs on small batches; OCR then runs per caller, either
+    in-process behind a lock or, with ``DETECTION_OCR_WORKERS`` > 0, on a
+    pool of OCR processes so several lanes are read in parallel.
+    """
+
+    def __init__(self):
+        self.vehicle_model = None
+        self.ocr_reader = None
+        self.ready = False
+        self.error = None
+        self.load_seconds = None
+        self.batcher = None
+        self.max_batch_size = 8
+        self.max_wait_ms = 5
+        self.timeout = 10.0
+        self.ocr_pool = None
+        self._ocr_lock = threading.Lock()
+
+    def init_app(self, app):
+        app.extensions['detection_service'] = self
+        self.max_batch_size = app.config.get('DETECTION_MAX_BATCH', self.max_batch_size)
+        self.max_wait_ms = app.config.get('DETECTION_MAX_WAIT_MS', self.max_wait_ms)
+        self.timeout = app.config.get('DETECTION_TIMEOUT', self.timeout)
+        if not app.config.get('DETECTION_ENABLED'):
+            return
+
+        threading.Thread(
+            target=self._load,
+            kwargs={
+                'vehicle_model_path': app.config.get('VEHICLE_MODEL_PATH'),
+                'gpu': app.config.get('DETECTION_GPU', False),
+                'backend': app.config.get('DETECTION_BACKEND', 'torch'),
+                'imgsz': app.config.get('DETECTION_IMGSZ', 640),
+                'int8': app.config.get('DETECTION_INT8', False),
+                'threads': app.config.get('DETECTION_THREADS') or None,
+                'ocr_workers': app.config.get('DETECTION_OCR_WORKERS', 0),
+                'ocr_threads': app.config.get('DETECTION_OCR_THREADS', 1),
+                'ocr_max_pending': app.config.get('DETECTION_OCR_MAX_PENDING') or None,
+            },
+            name='detection-loader',
+            daemon=True
+        ).start()
+
+    def _load(self, vehicle_model_path, gpu, backend, imgsz, int8, threads,
+              ocr_workers=0, ocr_threads=1, ocr_max_pending=None):
+        try:
+            from ml_models import pipeline
+
+            started = time.perf_counter()
+            if ocr_workers:
+                from ml_models.ocr_pool import OcrPool
+
+                self.ocr_pool = OcrPool(ocr_workers, ocr_threads, max_pending=ocr_max_pending, gpu=gpu)
+                OCR_QUEUE_DEPTH.set_function(self.ocr_pool.depth)
+
+            vehicle_model, ocr_reader = pipeline.load_models(
+                vehicle_model_path or pipeline.VEHICLE_MODEL_PATH, gpu=gpu,
+                backend=backend, imgsz=imgsz, int8=int8, threads=threads, ocr=not ocr_workers
+            )
+            pipeline.warm_up(vehicle_model, ocr_reader)
+            if self.ocr_pool:
+                self.ocr_pool.wait_ready()
+
+            self.vehicle_model = vehicle_model
+            self.ocr_reader = ocr_reader
+            self.batcher = MicroBatcher(
+                lambda frames: pipeline.detect_vehicles(vehicle_model, frames),
+                max_batch_size=self.max_batch_size,
+                max_wait_ms=self.max_wait_ms,
+                name='vehicle-detector-batcher'
+            )
+            self.load_seconds = time.perf_counter() - started
+            self.ready = True
+            logger.info('Detection models (%s) loaded and warmed up in %.1fs', backend, self.load_seconds)
+        except Exception as e:
+            self.error = str(e)
+            logger.exception('Detection models failed to load')
+
+    def status(self):
+        return {
+            'ready': self.ready,
+            'error': self.error,
+            'load_seconds': round(self.load_seconds, 2) if self.load_seconds else None,
+            'queue_depth': self.batcher.depth() if self.batcher else 0,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms,
+            'ocr_pool': self.ocr_pool.stats() if self.ocr_pool else None
+        }
+
+    def detect(self, frame):
+        """Run the full pipeline on one BGR frame; returns the detection_results.json schema"""
+        if not self.ready:
+            raise DetectionUnavailable(self.error or 'Detection models are not loaded yet')
+
+        from ml_models import pipeline
+
+        timings = {}
+        started = time.perf_counter()
+        try:
+            vehicle_detections = self.batcher.submit(frame).result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise DetectionUnavailable(f'Vehicle detector busy (no result within {self.timeout:g}s)')
+        timings['detect'] = time.perf_counter() - started
+
+        if self.ocr_pool:
+            results = pipeline.describe_vehicle(
+                None, frame, vehicle_detections, timings, plate_reader=self._pool_read_plate
+            )
+        else:
+            with self._ocr_lock:
+                results = pipeline.describe_vehicle(self.ocr_reader, frame, vehicle_detections, timings)
+        return results, timings
+
+    def _pool_read_plate(self, vehicle_crop, timings):
+        from ml_models.ocr_pool import OcrPoolFull
+
+        try:
+            plate = self.ocr_pool.read_plate(vehicle_crop, timings, timeout=self.timeout)
+        except OcrPoolFull as e:
+            raise DetectionUnavailable(str(e))
+        except FutureTimeoutError:
+            raise DetectionUnavailable(f'Plate OCR busy (no result within {self.timeout:g}s)')
+        OCR_SERVICE_SECONDS.observe(timings['ocr_service'])
+        OCR_QUEUE_WAIT_SECONDS.observe(timings['ocr_queue'])
+        return plate
+
+
+class DetectionUnavailable(Exception):
+    pass
+
+
+detection_service = DetectionService()
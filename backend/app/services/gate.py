@@ -0,0 +1,160 @@
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy.exc import IntegrityError
+
+from app.core.cache import cache
+from app.db.models import db, normalize_plate, Payment, Slot
+
+logger = logging.getLogger(__name__)
+
+# Detector classes (pipeline.CUSTOM_CLASSIFICATION) are already parking zones
+ZONES = ('A', 'B', 'C')
+
+# pipeline.NOT_DETECTED (not imported so JSON detections work without the ML stack)
+NOT_DETECTED = "Not Detected"
+
+# Zone -> Payment.vehicle_type (tariff)
+ZONE_VEHICLE_TYPE = {
+    'A': 'motorcycle',
+    'B': 'car',
+    'C': 'car',
+}
+
+
+class GateEvents:
+    """
+    In-process fan-out of gate events to connected gate displays.
+
+    Every subscriber (one Server-Sent Events stream per display) gets its own
+    bounded queue; a display that stops reading loses its oldest events
+    instead of blocking the entry path.
+    """
+
+    def __init__(self, max_queued=100):
+        self.max_queued = max_queued
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        subscriber = queue.Queue(maxsize=self.max_queued)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event):
+        event.setdefault('timestamp', time.time())
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            while True:
+                try:
+                    subscriber.put_nowait(event)
+                    break
+                except queue.Full:
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def stream(self, lane=None, heartbeat=15.0):
+        """Server-Sent Events for one display, optionally filtered to one lane"""
+        subscriber = self.subscribe()
+        try:
+            yield ': connected\n\n'
+            while True:
+                try:
+                    event = subscriber.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                if lane and event.get('lane') not in (None, lane):
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+
+def open_session(slot, vehicle_plate, vehicle_type, entry_time=None):
+    """Add an unpaid Payment for a vehicle entering ``slot`` and mark it occupied (caller commits)"""
+    payment = Payment(
+        slot=slot,
+        vehicle_plate=vehicle_plate,
+        vehicle_type=vehicle_type,
+        entry_time=entry_time or datetime.utcnow(),
+        status='unpaid'
+    )
+    slot.status = False
+    db.session.add(payment)
+    return payment
+
+
+def _already_parked(event, existing):
+    event.update(status='already_parked', slot=existing.slot.to_dict() if existing.slot else None,
+                 payment=existing.to_dict())
+    gate_events.publish(event)
+    return event
+
+
+def admit_vehicle(zone, vehicle_plate, lane=None):
+    """
+    Allocate a slot in ``zone`` for a detected vehicle and open its session.
+
+    Replaces the browser round trips (recommend -> occupy -> entry) with one
+    transaction. A plate that already has an unpaid session is not admitted
+    twice (the camera usually sees the same car on several frames). Returns
+    the gate event, which is also published to the gate displays.
+    """
+    vehicle_plate = normalize_plate(vehicle_plate)
+    event = {'type': 'entry', 'lane': lane, 'zone': zone, 'vehicle_plate': vehicle_plate}
+
+    existing = Payment.query.filter_by(vehicle_plate=vehicle_plate, status='unpaid').first()
+    if existing:
+        return _already_parked(event, existing)
+
+    slot = (
+        Slot.query.filter_by(status=True, zone=zone)
+        .order_by(Slot.level, Slot.slot_id)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if not slot:
+        event.update(status='full', slot=None, payment=None)
+        gate_events.publish(event)
+        return event
+
+    entry_time = datetime.utcnow()
+    payment = open_session(slot, vehicle_plate, ZONE_VEHICLE_TYPE.get(zone, 'car'), entry_time)
+    slot.vehicle_plate = vehicle_plate
+    slot.entry_time = entry_time
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another lane admitted the same plate between the check and the commit
+        # (uq_payments_unpaid_vehicle_plate); report that session instead
+        db.session.rollback()
+        existing = Payment.query.filter_by(vehicle_plate=vehicle_plate, status='unpaid').first()
+        if not existing:
+            raise
+        return _already_parked(event, existing)
+    cache.invalidate('slots', 'payments')
+
+    event.update(status='admitted', slot=slot.to_dict(), payment=payment.to_dict(), navigation_info={
+        'level': slot.level,
+        'zone': slot.zone,
+        'slot_id': slot.slot_id
+    })
+    gate_events.publish(event)
+    logger.info('Admitted %s to slot %s (lane %s)', vehicle_plate, slot.slot_id, lane)
+    return event
+
+
+gate_events = GateEvents()
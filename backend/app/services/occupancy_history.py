@@ -0,0 +1,389 @@
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+
+from prometheus_client import Counter
+from sqlalchemy import func, insert, text
+from sqlalchemy.orm import aliased
+
+from app.db.models import OccupancyRollup, OccupancySample
+
+logger = logging.getLogger(__name__)
+
+OCCUPANCY_SAMPLES_DROPPED_TOTAL = Counter(
+    'occupancy_samples_dropped_total', 'Occupancy samples dropped because the write buffer was full'
+)
+
+EPOCH = datetime(1970, 1, 1)
+
+# resolution -> (bucket width, source it is rolled up from)
+TIERS = {
+    'minute': (timedelta(minutes=1), 'raw'),
+    'hour': (timedelta(hours=1), 'minute'),
+    'day': (timedelta(days=1), 'hour'),
+}
+
+# Buckets rolled up per tier and pass, so a long outage is caught up in steps
+MAX_BUCKETS_PER_PASS = 1440
+
+# Rows returned per zone by an explicit-resolution range query
+POINTS_PER_ZONE_FACTOR = 10
+
+# pg_try_advisory_lock key held by the one process that writes the history
+LEADER_LOCK_KEY = 0x6F636375
+
+
+def floor_time(ts, width):
+    return EPOCH + (ts - EPOCH) // width * width
+
+
+class OccupancyHistory:
+    """
+    Append-only occupancy time series per level/zone with downsampled tiers.
+
+    ``ParkingState`` reports every change of a zone's (occupied, total);
+    samples are buffered and written in batches by a background thread,
+    so gate requests never wait on the insert. The same thread rolls closed
+    buckets up into dense minute rows (time-weighted average, min, max,
+    last), minutes into hours and hours into days, and deletes data past
+    each tier's retention. Range queries read the coarsest tier that still
+    gives OCCUPANCY_MAX_POINTS resolution, so a month-long chart is a few
+    thousand indexed rows.
+
+    With several worker processes only one writes: the first to take a
+    PostgreSQL advisory lock records, flushes and rolls up, the others keep
+    retrying the lock and take over when the leader's connection closes.
+    Other databases have no such lock and are assumed to run one process.
+    """
+
+    def __init__(self):
+        self.flush_interval = 2.0
+        self.rollup_interval = 60.0
+        self.max_points = 1000
+        self.retention_days = {'raw': 2, 'minute': 14, 'hour': 400, 'day': 0}
+        self._buffer = deque()
+        self._buffer_size = 100000
+        self._lock = threading.Lock()
+        self._parking_state = None
+        self._leader_connection = None
+        self.leader = False
+
+    def init_app(self, app, db, parking_state):
+        self.flush_interval = app.config.get('OCCUPANCY_FLUSH_SECONDS', self.flush_interval)
+        self.rollup_interval = app.config.get('OCCUPANCY_ROLLUP_SECONDS', self.rollup_interval)
+        self.max_points = app.config.get('OCCUPANCY_MAX_POINTS', self.max_points)
+        self.retention_days.update(app.config.get('OCCUPANCY_RETENTION_DAYS') or {})
+        if not app.config.get('OCCUPANCY_HISTORY_ENABLED', True) or not app.config.get('BUSINESS_METRICS_ENABLED', True):
+            return
+
+        with app.app_context():
+            # Without advisory locks there is nothing to wait for
+            self.leader = db.engine.dialect.name != 'postgresql'
+        self._parking_state = parking_state
+        parking_state.add_occupancy_listener(self.record)
+        thread = threading.Thread(target=self._run, args=(app, db), name='occupancy-history', daemon=True)
+        thread.start()
+        app.extensions['occupancy_history'] = self
+
+    def record(self, changes):
+        """Buffer one sample per changed zone: [(level, zone, occupied, total), ...]"""
+        if not self.leader:
+            return
+        recorded_at = datetime.utcnow()
+        with self._lock:
+            for level, zone, occupied, total in changes:
+                if len(self._buffer) >= self._buffer_size:
+                    OCCUPANCY_SAMPLES_DROPPED_TOTAL.inc()
+                    continue
+                self._buffer.append({
+                    'level': level, 'zone': zone, 'occupied': occupied,
+                    'total': total, 'recorded_at': recorded_at,
+                })
+
+    # --- background work ---
+
+    def _run(self, app, db):
+        next_rollup = time.monotonic() + self.rollup_interval
+        while True:
+            time.sleep(self.flush_interval)
+            with app.app_context():
+                try:
+                    if not self._hold_leadership(db):
+                        continue
+                    self.flush(db)
+                    if time.monotonic() >= next_rollup:
+                        next_rollup = time.monotonic() + self.rollup_interval
+                        self.rollup(db)
+                        self.apply_retention(db)
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning('Occupancy history maintenance failed, retrying later: %s', e)
+
+    def _hold_leadership(self, db):
+        """True while this process is the one writing history; tries to take over otherwise"""
+        if db.engine.dialect.name != 'postgresql':
+            return True
+
+        if self._leader_connection is not None:
+            try:
+                self._leader_connection.execute(text('SELECT 1'))
+                self._leader_connection.rollback()
+                return True
+            except Exception as e:
+                # The lock went with the connection; another process may hold it by now
+                logger.warning('Occupancy history lost its leader connection: %s', e)
+                self._release_leadership()
+
+        connection = db.engine.connect()
+        try:
+            acquired = connection.execute(
+                text('SELECT pg_try_advisory_lock(:key)'), {'key': LEADER_LOCK_KEY}
+            ).scalar()
+            # Session-level lock: it outlives the transaction, which must not stay open
+            connection.rollback()
+        except Exception:
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+            return False
+
+        self._leader_connection = connection
+        self.leader = True
+        logger.info('Occupancy history writer elected in this process')
+        # Start from a full snapshot, as changes seen before the takeover were not recorded
+        snapshot = self._parking_state.snapshot()
+        self.record([
+            (level, zone, snapshot['occupancy'].get((level, zone), 0), total)
+            for (level, zone), total in snapshot['capacity'].items()
+        ])
+        return True
+
+    def _release_leadership(self):
+        self.leader = False
+        connection, self._leader_connection = self._leader_connection, None
+        if connection is not None:
+            try:
+                connection.invalidate()
+            except Exception:
+                pass
+
+    def flush(self, db):
+        with self._lock:
+            rows, self._buffer = list(self._buffer), deque()
+        if not rows:
+            return 0
+        try:
+            db.session.execute(insert(OccupancySample), rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            with self._lock:
+                # Keep the samples for the next attempt; the oldest go first if the buffer overflows
+                kept = rows + list(self._buffer)
+                OCCUPANCY_SAMPLES_DROPPED_TOTAL.inc(max(0, len(kept) - self._buffer_size))
+                self._buffer = deque(kept[-self._buffer_size:])
+            raise
+        return len(rows)
+
+    def rollup(self, db, now=None):
+        """Roll closed buckets of every tier up from the next finer one; returns rows written"""
+        now = now or datetime.utcnow()
+        # Samples reach the table up to one flush interval late
+        settled = now - timedelta(seconds=self.flush_interval * 2)
+        return sum(self._rollup_tier(db, resolution, settled) for resolution in TIERS)
+
+    def _rollup_tier(self, db, resolution, settled):
+        width, source = TIERS[resolution]
+        closed_end = floor_time(settled, width)
+
+        watermark = db.session.query(func.max(OccupancyRollup.bucket_start)).filter_by(resolution=resolution).scalar()
+        carry = {}
+        if watermark is not None:
+            start = watermark + width
+            # Last value of each zone, carried into buckets without samples
+            for row in OccupancyRollup.query.filter_by(resolution=resolution, bucket_start=watermark):
+                carry[(row.level, row.zone)] = (row.last_occupied, row.total)
+        else:
+            first = self._first_source_time(db, source)
+            if first is None:
+                return 0
+            start = floor_time(first, width)
+
+        end = min(closed_end, start + width * MAX_BUCKETS_PER_PASS)
+        if source != 'raw':
+            # Only buckets whose finer rows are all written
+            source_watermark = db.session.query(func.max(OccupancyRollup.bucket_start)).filter_by(resolution=source).scalar()
+            if source_watermark is None:
+                return 0
+            end = min(end, floor_time(source_watermark + TIERS[source][0], width))
+        if start >= end:
+            return 0
+
+        if source == 'raw':
+            rows = self._rollup_samples(db, resolution, width, start, end, carry)
+        else:
+            rows = self._rollup_buckets(db, resolution, width, source, start, end)
+        if rows:
+            OccupancyRollup.query.filter(
+                OccupancyRollup.resolution == resolution,
+                OccupancyRollup.bucket_start >= start,
+                OccupancyRollup.bucket_start < end,
+            ).delete(synchronize_session=False)
+            db.session.execute(insert(OccupancyRollup), rows)
+        db.session.commit()
+        return len(rows)
+
+    def _first_source_time(self, db, source):
+        if source == 'raw':
+            return db.session.query(func.min(OccupancySample.recorded_at)).scalar()
+        return db.session.query(func.min(OccupancyRollup.bucket_start)).filter_by(resolution=source).scalar()
+
+    def _rollup_samples(self, db, resolution, width, start, end, carry):
+        """Dense buckets from raw samples; occupancy holds its value until the next sample"""
+        samples = defaultdict(list)
+        query = OccupancySample.query.filter(
+            OccupancySample.recorded_at >= start, OccupancySample.recorded_at < end
+        ).order_by(OccupancySample.recorded_at, OccupancySample.id)
+        for sample in query:
+            samples[(sample.level, sample.zone)].append((sample.recorded_at, sample.occupied, sample.total))
+
+        rows = []
+        for key in set(carry) | set(samples):
+            points = deque(samples.get(key, ()))
+            current = carry.get(key)
+            bucket = start if current is not None else floor_time(points[0][0], width)
+            while bucket < end:
+                bucket_end = bucket + width
+                weighted, covered = 0.0, 0.0
+                low = high = current[0] if current else None
+                cursor = bucket
+                while points and points[0][0] < bucket_end:
+                    at, occupied, total = points.popleft()
+                    if current is not None:
+                        span = (at - cursor).total_seconds()
+                        weighted += current[0] * span
+                        covered += span
+                    current, cursor = (occupied, total), at
+                    low = occupied if low is None else min(low, occupied)
+                    high = occupied if high is None else max(high, occupied)
+                span = (bucket_end - cursor).total_seconds()
+                weighted += current[0] * span
+                covered += span
+                rows.append({
+                    'resolution': resolution, 'level': key[0], 'zone': key[1], 'bucket_start': bucket,
+                    'avg_occupied': weighted / covered if covered else float(current[0]),
+                    'min_occupied': low, 'max_occupied': high,
+                    'last_occupied': current[0], 'total': current[1],
+                })
+                bucket = bucket_end
+        return rows
+
+    def _rollup_buckets(self, db, resolution, width, source, start, end):
+        """Coarser buckets from the (dense) finer tier"""
+        groups = defaultdict(list)
+        query = OccupancyRollup.query.filter(
+            OccupancyRollup.resolution == source,
+            OccupancyRollup.bucket_start >= start,
+            OccupancyRollup.bucket_start < end,
+        ).order_by(OccupancyRollup.bucket_start)
+        for row in query:
+            groups[(row.level, row.zone, floor_time(row.bucket_start, width))].append(row)
+
+        return [
+            {
+                'resolution': resolution, 'level': level, 'zone': zone, 'bucket_start': bucket,
+                'avg_occupied': sum(row.avg_occupied for row in rows) / len(rows),
+                'min_occupied': min(row.min_occupied for row in rows),
+                'max_occupied': max(row.max_occupied for row in rows),
+                'last_occupied': rows[-1].last_occupied,
+                'total': rows[-1].total,
+            }
+            for (level, zone, bucket), rows in groups.items()
+        ]
+
+    def apply_retention(self, db, now=None):
+        now = now or datetime.utcnow()
+        days = self.retention_days.get('raw')
+        if days:
+            OccupancySample.query.filter(
+                OccupancySample.recorded_at < now - timedelta(days=days)
+            ).delete(synchronize_session=False)
+        for resolution in TIERS:
+            days = self.retention_days.get(resolution)
+            if days:
+                OccupancyRollup.query.filter(
+                    OccupancyRollup.resolution == resolution,
+                    OccupancyRollup.bucket_start < now - timedelta(days=days),
+                ).delete(synchronize_session=False)
+        db.session.commit()
+
+    # --- queries ---
+
+    def pick_resolution(self, start, end, now=None):
+        """Finest tier that covers ``start`` and returns at most max_points buckets per zone"""
+        now = now or datetime.utcnow()
+        for resolution, (width, _) in TIERS.items():
+            days = self.retention_days.get(resolution)
+            if (end - start) / width <= self.max_points and (not days or start >= now - timedelta(days=days)):
+                return resolution
+        return 'day'
+
+    def series(self, start, end, resolution='auto', level=None, zone=None):
+        """Occupancy per level/zone between ``start`` and ``end``"""
+        if resolution == 'auto':
+            resolution = self.pick_resolution(start, end)
+
+        if resolution == 'raw':
+            query = OccupancySample.query.filter(
+                OccupancySample.recorded_at >= start, OccupancySample.recorded_at < end
+            )
+            model, time_column = OccupancySample, OccupancySample.recorded_at
+        else:
+            query = OccupancyRollup.query.filter(
+                OccupancyRollup.resolution == resolution,
+                OccupancyRollup.bucket_start >= floor_time(start, TIERS[resolution][0]),
+                OccupancyRollup.bucket_start < end,
+            )
+            model, time_column = OccupancyRollup, OccupancyRollup.bucket_start
+        if level:
+            query = query.filter(model.level == level)
+        if zone:
+            query = query.filter(model.zone == zone)
+
+        # Cap each zone separately, so one busy zone cannot push the others out of the result
+        limit = self.max_points * POINTS_PER_ZONE_FACTOR
+        rank = func.row_number().over(partition_by=(model.level, model.zone), order_by=time_column)
+        ranked = query.add_columns(rank.label('rank')).subquery()
+        row_model = aliased(model, ranked)
+        query = query.session.query(row_model).filter(ranked.c.rank <= limit + 1).order_by(
+            row_model.level, row_model.zone, getattr(row_model, time_column.key)
+        )
+
+        series = defaultdict(list)
+        truncated = set()
+        for row in query:
+            key = (row.level, row.zone)
+            if len(series[key]) >= limit:
+                truncated.add(key)
+                continue
+            if resolution == 'raw':
+                point = {'t': row.recorded_at.isoformat(), 'occupied': row.occupied, 'total': row.total}
+            else:
+                point = row.to_dict()
+            series[key].append(point)
+
+        return {
+            'resolution': resolution,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'series': [
+                {'level': level, 'zone': zone, 'points': points, 'truncated': (level, zone) in truncated}
+                for (level, zone), points in sorted(series.items())
+            ],
+        }
+
+
+occupancy_history = OccupancyHistory()
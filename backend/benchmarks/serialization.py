@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Serialization and wire-size benchmark for the large list responses.
+
+Builds the payloads of ``/api/slots/`` (10k slots) and
+``/api/payments/history`` / ``/active`` (100k payments) from transient
+model objects, then compares Flask's stdlib JSON provider with the orjson
+provider (``app.core.json_provider``) and measures gzip/brotli size and
+time at the levels the app uses. No database is needed.
+
+Usage:
+    python benchmarks/serialization.py
+    python benchmarks/serialization.py --slots 10000 --payments 100000 --repeat 5 --output serialization.json
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.config import Config
+from app.core import json_provider
+from app.db.models import Payment, Slot
+
+# --- ================= CONFIGURATION ================= ---
+SLOT_COUNT = 10000
+PAYMENT_COUNT = 100000
+REPEAT = 3
+# --- =============================================== ---
+
+
+def build_slots(count):
+    now = datetime.utcnow()
+    slots = []
+    for i in range(count):
+        level = f'L{i % 3 + 1}'
+        occupied = i % 4 == 0
+        slots.append(Slot(
+            id=i + 1, slot_id=f'{level}{"ABC"[i % 3]}{i:05d}', level=level, zone='ABC'[i % 3],
+            status=not occupied, vehicle_plate=f'B{i % 9999}XY' if occupied else None,
+            entry_time=now if occupied else None, created_at=now, updated_at=now
+        ))
+    return slots
+
+
+def build_payments(count):
+    rng = random.Random(42)
+    started = datetime(2025, 1, 1)
+    payments = []
+    for i in range(count):
+        entry_time = started + timedelta(minutes=7 * i)
+        duration = timedelta(minutes=rng.randint(10, 600))
+        payments.append(Payment(
+            id=i + 1, payment_id=f'{i:08d}-0000-4000-8000-000000000000', slot_id=i % 60 + 1,
+            vehicle_plate=f'B{i % 9999}XY', vehicle_type='car', entry_time=entry_time,
+            exit_time=entry_time + duration, duration=duration,
+            amount=Decimal(10000 * max(1, duration.total_seconds() // 3600)),
+            status='paid', qr_code=None, created_at=entry_time, updated_at=entry_time
+        ))
+    return payments
+
+
+def timed(fn, repeat):
+    """Best-of-``repeat`` seconds and the last result"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def measure(name, payload_fn, providers, repeat, gzip_level, brotli_quality):
+    build_seconds, payload = timed(payload_fn, 1)
+    report = {'payload': name, 'to_dict_ms': round(build_seconds * 1000, 1), 'providers': {}}
+
+    for provider_name, provider in providers.items():
+        dump_seconds, body = timed(lambda: provider.response(payload).get_data(), repeat)
+        entry = {
+            'serialize_ms': round(dump_seconds * 1000, 1),
+            'bytes': len(body),
+        }
+        gzip_seconds, compressed = timed(lambda: gzip.compress(body, compresslevel=gzip_level, mtime=0), repeat)
+        entry['gzip_bytes'] = len(compressed)
+        entry['gzip_ms'] = round(gzip_seconds * 1000, 1)
+        if json_provider.brotli is not None:
+            br_seconds, compressed = timed(lambda: json_provider.brotli.compress(body, quality=brotli_quality), repeat)
+            entry['br_bytes'] = len(compressed)
+            entry['br_ms'] = round(br_seconds * 1000, 1)
+        report['providers'][provider_name] = entry
+    return report
+
+
+def print_report(results):
+    header = f"{'payload':<22}{'provider':<10}{'serialize ms':>14}{'bytes':>12}{'gzip bytes':>12}{'gzip ms':>10}{'br bytes':>12}{'br ms':>8}"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        for provider_name, entry in result['providers'].items():
+            print(f"{result['payload']:<22}{provider_name:<10}{entry['serialize_ms']:>14}{entry['bytes']:>12}"
+                  f"{entry['gzip_bytes']:>12}{entry['gzip_ms']:>10}"
+                  f"{entry.get('br_bytes', '-'):>12}{entry.get('br_ms', '-'):>8}")
+        print(f"{'':<22}(to_dict: {result['to_dict_ms']} ms)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='JSON provider / compression benchmark')
+    parser.add_argument('--slots', type=int, default=SLOT_COUNT, help='Slots in the /api/slots/ payload')
+    parser.add_argument('--payments', type=int, default=PAYMENT_COUNT, help='Payments in the history payload')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help='Runs per measurement (best is reported)')
+    parser.add_argument('--output', help='Write the JSON result to this file')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    providers = {'stdlib': DefaultJSONProvider(app)}
+    if json_provider.orjson is not None:
+        providers['orjson'] = json_provider.OrjsonProvider(app)
+    else:
+        print('orjson is not installed; only the stdlib provider is measured')
+
+    slots = build_slots(args.slots)
+    payments = build_payments(args.payments)
+
+    def slot_overview():
+        return {
+            'slots': [slot.to_dict() for slot in slots],
+            'total_slots': len(slots),
+        }
+
+    def payment_history():
+        return {
+            'payments': [payment.to_dict() for payment in payments],
+            'pagination': {'page': 1, 'pages': 1, 'per_page': len(payments), 'total': len(payments)},
+        }
+
+    with app.app_context():
+        results = [
+            measure(f'slots ({args.slots})', slot_overview, providers, args.repeat,
+                    Config.COMPRESS_GZIP_LEVEL, Config.COMPRESS_BROTLI_QUALITY),
+            measure(f'payments ({args.payments})', payment_history, providers, args.repeat,
+                    Config.COMPRESS_GZIP_LEVEL, Config.COMPRESS_BROTLI_QUALITY),
+        ]
+    print_report(results)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"Result saved to '{args.output}'")
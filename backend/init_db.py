@@ -9,7 +9,28 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app.main import create_app
-from app.db.models import db, User, Slot, Payment
+from app.db.models import db, normalize_plate, User, Slot, Payment
+
+def ensure_indexes():
+    """Create payments indexes (plate search with pg_trgm, one unpaid session per plate) on an existing table"""
+    with db.engine.begin() as connection:
+        if connection.dialect.name == 'postgresql':
+            connection.exec_driver_sql('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for index in Payment.__table__.indexes:
+            index.create(connection, checkfirst=True)
+
+def normalize_plates():
+    """Rewrite plates stored in any other than the canonical form (normalize_plate); returns rows changed"""
+    changed = 0
+    with db.engine.begin() as connection:
+        for model in (Payment, Slot):
+            column = model.__table__.c.vehicle_plate
+            plates = connection.execute(db.select(column).where(column.isnot(None)).distinct()).scalars()
+            for plate in [plate for plate in plates if plate != normalize_plate(plate)]:
+                changed += connection.execute(
+                    db.update(model.__table__).where(column == plate).values(vehicle_plate=normalize_plate(plate))
+                ).rowcount
+    return changed
 
 def init_database(drop_existing=False):
     """Initialize database with tables and default data"""
@@ -23,6 +44,14 @@ def init_database(drop_existing=False):
         print("Creating tables...")
         db.create_all()
         
+        # Backfill before the unique index on unpaid plates is built
+        changed = normalize_plates()
+        if changed:
+            print(f"Normalized {changed} vehicle plates")
+        
+        # create_all skips indexes of tables that already exist
+        ensure_indexes()
+        
         # Create default admin user
         admin_user = User.query.filter_by(username='admin').first()
         if not admin_user:
@@ -0,0 +1 @@
+# ml_models/__init__.py
@@ -0,0 +1,259 @@
+"""
+Selectable inference backends for the YOLO vehicle detector.
+
+``torch``     the default ultralytics PyTorch model (``yolov8s.pt``)
+``onnx``      exported ONNX model run by ONNX Runtime (optionally static int8)
+``openvino``  exported OpenVINO IR (optionally NNCF int8)
+
+Exported models are run directly by ONNX Runtime / OpenVINO so input size
+and thread count are under our control, and they return objects with the
+same ``results[i].boxes`` / ``box.xyxy[0].cpu().numpy()`` interface as
+ultralytics, so ``pipeline``, ``CUSTOM_CLASSIFICATION`` and
+``TARGET_CLASSES`` work unchanged. Class ids stay COCO ids.
+"""
+
+import os
+
+import cv2
+import numpy as np
+
+# --- ================= CONFIGURATION ================= ---
+BACKENDS = ('torch', 'onnx', 'openvino')
+DEFAULT_IMGSZ = 640
+CONF_THRESHOLD = 0.25
+NMS_IOU_THRESHOLD = 0.45
+
+# Images used to calibrate int8 quantization
+CALIBRATION_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_picture')
+# Dataset yaml ultralytics uses to calibrate OpenVINO int8 (NNCF)
+OPENVINO_CALIBRATION_DATA = 'coco8.yaml'
+# --- =============================================== ---
+
+
+class _Value:
+    """Minimal stand-in for a torch tensor: supports [i], .cpu() and .numpy()"""
+
+    def __init__(self, array):
+        self._array = np.asarray(array)
+
+    def __getitem__(self, index):
+        return _Value(self._array[index])
+
+    def __len__(self):
+        return len(self._array)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self._array
+
+
+class _Box:
+    def __init__(self, xyxy, class_id, confidence):
+        self.xyxy = _Value([xyxy])
+        self.cls = _Value([class_id])
+        self.conf = _Value([confidence])
+
+
+class _Result:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+
+def letterbox(frame, imgsz):
+    """Resize keeping aspect ratio and pad to imgsz x imgsz; returns (image, scale, (pad_x, pad_y))"""
+    height, width = frame.shape[:2]
+    scale = min(imgsz / float(height), imgsz / float(width))
+    new_w, new_h = int(round(width * scale)), int(round(height * scale))
+    resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = (imgsz - new_w) // 2, (imgsz - new_h) // 2
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = resized
+    return canvas, scale, (pad_x, pad_y)
+
+
+def to_input(letterboxed_frames):
+    """BGR uint8 HWC frames -> RGB float32 NCHW in [0, 1]"""
+    batch = np.stack(letterboxed_frames)[..., ::-1].transpose(0, 3, 1, 2)
+    return np.ascontiguousarray(batch, dtype=np.float32) / 255.0
+
+
+class TorchDetector:
+    """The ultralytics model with a fixed inference size"""
+
+    def __init__(self, model, imgsz=DEFAULT_IMGSZ):
+        self.model = model
+        self.imgsz = imgsz
+
+    def __call__(self, frames, **kwargs):
+        kwargs.setdefault('imgsz', self.imgsz)
+        return self.model(frames, **kwargs)
+
+
+class ExportedDetector:
+    """Common pre/post-processing for exported YOLOv8 detectors"""
+
+    def __init__(self, imgsz=DEFAULT_IMGSZ):
+        self.imgsz = imgsz
+
+    def _infer(self, batch):
+        raise NotImplementedError
+
+    def __call__(self, frames, classes=None, conf=CONF_THRESHOLD, verbose=False, **kwargs):
+        frames = frames if isinstance(frames, (list, tuple)) else [frames]
+        prepared = [letterbox(frame, self.imgsz) for frame in frames]
+        outputs = self._infer(to_input([image for image, _, _ in prepared]))
+        return [
+            self._postprocess(output, scale, pad, frame.shape, classes, conf)
+            for output, (_, scale, pad), frame in zip(outputs, prepared, frames)
+        ]
+
+    def _postprocess(self, output, scale, pad, frame_shape, classes, conf):
+        # YOLOv8 head: (4 + num_classes, anchors) -> rows of [cx, cy, w, h, scores...]
+        predictions = output.T
+        scores = predictions[:, 4:]
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(scores)), class_ids]
+
+        keep = confidences >= conf
+        if classes is not None:
+            keep &= np.isin(class_ids, classes)
+        predictions, class_ids, confidences = predictions[keep], class_ids[keep], confidences[keep]
+        if len(predictions) == 0:
+            return _Result([])
+
+        cx, cy, w, h = predictions[:, 0], predictions[:, 1], predictions[:, 2], predictions[:, 3]
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad[0]) / scale
+        boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad[1]) / scale
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, frame_shape[1])
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, frame_shape[0])
+
+        # Class-aware NMS: offset boxes per class so different classes never suppress each other
+        offset = class_ids[:, None].astype(np.float32) * 4096.0
+        shifted = boxes + offset
+        rects = [[float(x1), float(y1), float(x2 - x1), float(y2 - y1)] for x1, y1, x2, y2 in shifted]
+        kept = cv2.dnn.NMSBoxes(rects, confidences.astype(float).tolist(), conf, NMS_IOU_THRESHOLD)
+
+        return _Result([
+            _Box(boxes[i], int(class_ids[i]), float(confidences[i]))
+            for i in np.array(kept).flatten()
+        ])
+
+
+class OnnxRuntimeDetector(ExportedDetector):
+    def __init__(self, model_path, imgsz=DEFAULT_IMGSZ, threads=None):
+        super().__init__(imgsz)
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def _infer(self, batch):
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class OpenVinoDetector(ExportedDetector):
+    def __init__(self, model_dir, imgsz=DEFAULT_IMGSZ, threads=None):
+        super().__init__(imgsz)
+        import openvino as ov
+
+        core = ov.Core()
+        xml_path = next(
+            os.path.join(model_dir, name) for name in os.listdir(model_dir) if name.endswith('.xml')
+        )
+        config = {'PERFORMANCE_HINT': 'LATENCY'}
+        if threads:
+            config['INFERENCE_NUM_THREADS'] = threads
+        self.model = core.compile_model(core.read_model(xml_path), 'CPU', config)
+
+    def _infer(self, batch):
+        return self.model(batch)[self.model.output(0)]
+
+
+def _calibration_batches(imgsz, folder=CALIBRATION_FOLDER):
+    for name in sorted(os.listdir(folder)):
+        frame = cv2.imread(os.path.join(folder, name))
+        if frame is not None:
+            yield to_input([letterbox(frame, imgsz)[0]])
+
+
+def quantize_onnx(model_path, imgsz, calibration_folder=CALIBRATION_FOLDER):
+    """Static int8 (QDQ) quantization of an exported ONNX model, calibrated on sample frames"""
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    int8_path = model_path.replace('.onnx', '_int8.onnx')
+    if os.path.exists(int8_path):
+        return int8_path
+
+    import onnxruntime as ort
+    input_name = ort.InferenceSession(model_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+
+    class FrameReader(CalibrationDataReader):
+        def __init__(self):
+            self._batches = _calibration_batches(imgsz, calibration_folder)
+
+        def get_next(self):
+            batch = next(self._batches, None)
+            return None if batch is None else {input_name: batch}
+
+    quantize_static(
+        model_path, int8_path, FrameReader(),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True
+    )
+    return int8_path
+
+
+def export_model(model_path, backend, imgsz=DEFAULT_IMGSZ, int8=False):
+    """Export the PyTorch model once (reused when the file already exists); returns the exported path"""
+    from ultralytics import YOLO
+
+    stem = os.path.splitext(model_path)[0]
+    if backend == 'onnx':
+        exported = f'{stem}_{imgsz}.onnx'
+        if not os.path.exists(exported):
+            path = YOLO(model_path).export(format='onnx', imgsz=imgsz, dynamic=True, simplify=True)
+            os.replace(path, exported)
+        return quantize_onnx(exported, imgsz) if int8 else exported
+
+    if backend == 'openvino':
+        exported = f"{stem}_{imgsz}{'_int8' if int8 else ''}_openvino_model"
+        if not os.path.exists(exported):
+            path = YOLO(model_path).export(
+                format='openvino', imgsz=imgsz, dynamic=True, int8=int8,
+                data=OPENVINO_CALIBRATION_DATA if int8 else None
+            )
+            os.replace(path, exported)
+        return exported
+
+    raise ValueError(f"Nothing to export for backend {backend!r}")
+
+
+def load_vehicle_model(model_path, backend='torch', imgsz=DEFAULT_IMGSZ, int8=False, threads=None):
+    """Load the vehicle detector for the selected backend"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+    if int8 and backend == 'torch':
+        raise ValueError("int8 needs the onnx or openvino backend (the torch detector runs fp32 only)")
+
+    if backend == 'torch':
+        import torch
+        from ultralytics import YOLO
+
+        if threads:
+            torch.set_num_threads(threads)
+        return TorchDetector(YOLO(model_path), imgsz)
+
+    exported = export_model(model_path, backend, imgsz, int8)
+    if backend == 'onnx':
+        return OnnxRuntimeDetector(exported, imgsz, threads)
+    return OpenVinoDetector(exported, imgsz, threads)
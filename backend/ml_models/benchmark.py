@@ -0,0 +1,264 @@
+"""
+Offline benchmark harness for the detection pipeline over an image folder.
+
+Runs the full pipeline (load -> detect -> crop -> localize + OCR) on every
+image in a folder and reports per-stage latency percentiles, images/sec,
+peak memory and, given ground-truth labels, vehicle-type and plate
+accuracy. Python allocations are traced in a separate pass after the timed
+one (tracemalloc slows every allocation, so it never runs while timing). Results are written as JSON so model/backend choices can be
+compared run against run.
+
+Labels file (optional), keyed by file name:
+    {"car_image1.png": {"vehicle_type": "B", "license_plate": "B1234XY"}, ...}
+
+Usage (from ml_models/):
+    python benchmark.py --folder test_picture
+    python benchmark.py --folder lane_images --labels lane_labels.json --backend onnx --int8 --output onnx_int8.json
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+import cv2
+
+import backends
+import pipeline
+
+# --- ================= CONFIGURATION ================= ---
+IMAGE_FOLDER = 'test_picture'
+IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.bmp', '.webp']
+STAGES = ['load', 'detect', 'crop', 'localize', 'ocr', 'total']
+# --- =============================================== ---
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def edit_distance(a, b):
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    return peak / (1024.0 * 1024.0) if sys.platform == 'darwin' else peak / 1024.0
+
+
+def process_image(path, vehicle_model, ocr_reader, all_vehicles):
+    timings = {}
+    started_total = time.perf_counter()
+
+    started = time.perf_counter()
+    frame = cv2.imread(path)
+    timings['load'] = time.perf_counter() - started
+    if frame is None:
+        return None, timings
+
+    started = time.perf_counter()
+    vehicle_detections = pipeline.detect_vehicles(vehicle_model, [frame])[0]
+    timings['detect'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    boxes = pipeline.vehicle_boxes(vehicle_detections)
+    boxes.sort(key=lambda b: (b[0][2] - b[0][0]) * (b[0][3] - b[0][1]), reverse=True)
+    if not all_vehicles:
+        boxes = boxes[:1]
+    crops = [(frame[y1:y2, x1:x2], class_id) for (x1, y1, x2, y2), class_id, _ in boxes]
+    timings['crop'] = time.perf_counter() - started
+
+    predictions = []
+    timings['localize'] = 0.0
+    timings['ocr'] = 0.0
+    for crop, class_id in crops:
+        stage_timings = {}
+        plate, confidence = pipeline.read_plate(ocr_reader, crop, stage_timings)
+        timings['localize'] += stage_timings.get('localize', 0.0)
+        timings['ocr'] += stage_timings.get('ocr', 0.0)
+        predictions.append({
+            "vehicle_type": pipeline.CUSTOM_CLASSIFICATION.get(class_id, "Unknown"),
+            "license_plate": plate,
+            "plate_confidence": round(confidence, 3),
+            "ocr_fallback": bool(stage_timings.get('fallback'))
+        })
+
+    timings['total'] = time.perf_counter() - started_total
+    return predictions, timings
+
+
+def python_alloc_peak_mb(paths, vehicle_model, ocr_reader, all_vehicles):
+    """Peak Python allocations while processing ``paths`` once (untimed; tracemalloc slows allocation)"""
+    tracemalloc.start()
+    try:
+        for path in paths:
+            process_image(path, vehicle_model, ocr_reader, all_vehicles)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / (1024.0 * 1024.0)
+
+
+def score(predictions, label):
+    """Compare the prediction that best matches the label's plate"""
+    if not predictions:
+        return {'vehicle_type_correct': False, 'plate_correct': False, 'plate_char_accuracy': 0.0}
+
+    expected_plate = pipeline.normalize_plate(label.get('license_plate', ''))
+    best = min(predictions, key=lambda p: edit_distance(p['license_plate'], expected_plate))
+    plate = best['license_plate'] if best['license_plate'] != pipeline.NOT_DETECTED else ''
+    distance = edit_distance(plate, expected_plate)
+    return {
+        'vehicle_type_correct': best['vehicle_type'] == label.get('vehicle_type'),
+        'plate_correct': plate == expected_plate,
+        'plate_char_accuracy': max(0.0, 1.0 - distance / float(max(len(expected_plate), 1))),
+    }
+
+
+def main(args):
+    labels = {}
+    if args.labels:
+        with open(args.labels) as f:
+            labels = json.load(f)
+
+    names = sorted(
+        f for f in os.listdir(args.folder) if os.path.splitext(f)[1].lower() in IMAGE_EXTENSIONS
+    )
+    if args.limit:
+        names = names[:args.limit]
+
+    if args.full_crop_ocr:
+        pipeline.PLATE_FALLBACK_FULL_CROP = True
+        pipeline.localize_plate = lambda vehicle_crop: None
+
+    started = time.perf_counter()
+    vehicle_model, ocr_reader = pipeline.load_models(
+        backend=args.backend, imgsz=args.imgsz, int8=args.int8, threads=args.threads
+    )
+    pipeline.warm_up(vehicle_model, ocr_reader)
+    model_load_seconds = time.perf_counter() - started
+
+    stage_samples = {stage: [] for stage in STAGES}
+    images = []
+    started = time.perf_counter()
+    for name in names:
+        for _ in range(args.repeat):
+            predictions, timings = process_image(
+                os.path.join(args.folder, name), vehicle_model, ocr_reader, args.all_vehicles
+            )
+        if predictions is None:
+            print(f"Skipping unreadable image '{name}'")
+            continue
+        for stage in STAGES:
+            stage_samples[stage].append(timings.get(stage, 0.0))
+
+        entry = {'image': name, 'predictions': predictions,
+                 'timings_ms': {k: round(v * 1000, 2) for k, v in timings.items()}}
+        if name in labels:
+            entry['label'] = labels[name]
+            entry.update(score(predictions, labels[name]))
+        images.append(entry)
+    wall_seconds = time.perf_counter() - started
+    # Before the tracemalloc pass, whose bookkeeping would add to the process peak
+    peak_rss = peak_rss_mb()
+
+    python_peak = None
+    if not args.skip_alloc_pass:
+        python_peak = python_alloc_peak_mb(
+            [os.path.join(args.folder, entry['image']) for entry in images],
+            vehicle_model, ocr_reader, args.all_vehicles
+        )
+
+    stages = {}
+    for stage, samples in stage_samples.items():
+        samples.sort()
+        stages[stage] = {
+            'p50_ms': round(percentile(samples, 50) * 1000, 2),
+            'p95_ms': round(percentile(samples, 95) * 1000, 2),
+            'p99_ms': round(percentile(samples, 99) * 1000, 2),
+            'mean_ms': round(sum(samples) / len(samples) * 1000, 2) if samples else 0.0,
+        }
+
+    labelled = [entry for entry in images if 'label' in entry]
+    summary = {
+        'images': len(images),
+        'images_per_second': round(len(images) * args.repeat / wall_seconds, 2) if wall_seconds else 0.0,
+        'model_load_seconds': round(model_load_seconds, 2),
+        'peak_rss_mb': round(peak_rss, 1),
+        'peak_python_alloc_mb': round(python_peak, 1) if python_peak is not None else None,
+        'ocr_fallback_rate': round(
+            sum(p['ocr_fallback'] for e in images for p in e['predictions'])
+            / max(sum(len(e['predictions']) for e in images), 1), 3
+        ),
+    }
+    if labelled:
+        summary['vehicle_type_accuracy'] = round(sum(e['vehicle_type_correct'] for e in labelled) / len(labelled), 3)
+        summary['plate_accuracy'] = round(sum(e['plate_correct'] for e in labelled) / len(labelled), 3)
+        summary['plate_char_accuracy'] = round(sum(e['plate_char_accuracy'] for e in labelled) / len(labelled), 3)
+
+    result = {
+        'config': {
+            'folder': args.folder,
+            'backend': args.backend,
+            'imgsz': args.imgsz,
+            'int8': args.int8,
+            'threads': args.threads,
+            'repeat': args.repeat,
+            'all_vehicles': args.all_vehicles,
+            'plate_localization': not args.full_crop_ocr,
+        },
+        'summary': summary,
+        'stages': stages,
+        'images': images,
+    }
+
+    print(f"\n{summary['images']} images, {summary['images_per_second']} images/sec, "
+          f"peak RSS {summary['peak_rss_mb']} MB, model load {summary['model_load_seconds']}s")
+    header = f"{'stage':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}"
+    print(header)
+    print('-' * len(header))
+    for stage, stats in stages.items():
+        print(f"{stage:<10}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['mean_ms']:>10}")
+    for key in ('vehicle_type_accuracy', 'plate_accuracy', 'plate_char_accuracy'):
+        if key in summary:
+            print(f"{key}: {summary[key]}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=4)
+        print(f"Results saved to '{args.output}'")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the detection pipeline over an image folder')
+    parser.add_argument('--folder', default=IMAGE_FOLDER, help='Folder with images')
+    parser.add_argument('--labels', help='JSON ground truth keyed by file name')
+    parser.add_argument('--backend', choices=backends.BACKENDS, default='torch', help='Detector backend')
+    parser.add_argument('--imgsz', type=int, default=backends.DEFAULT_IMGSZ, help='Detector input size')
+    parser.add_argument('--int8', action='store_true', help='Use the int8 quantized detector')
+    parser.add_argument('--threads', type=int, default=None, help='Detector inference threads')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per image (last run is reported)')
+    parser.add_argument('--limit', type=int, default=0, help='Only the first N images')
+    parser.add_argument('--all-vehicles', action='store_true', help='OCR every detected vehicle, not only the largest')
+    parser.add_argument('--full-crop-ocr', action='store_true', help='Skip plate localization (OCR the whole vehicle)')
+    parser.add_argument('--skip-alloc-pass', action='store_true', help='Skip the untimed tracemalloc pass (peak RSS only)')
+    parser.add_argument('--output', help='Write machine-readable results as JSON')
+    args = parser.parse_args()
+    if args.int8 and args.backend == 'torch':
+        parser.error('--int8 needs --backend onnx or openvino (the torch detector runs fp32 only)')
+
+    main(args)
@@ -0,0 +1,154 @@
+"""
+Accuracy-vs-latency comparison of vehicle detector backends on an image folder.
+
+Every backend variant is run over the same images; the PyTorch model at
+the same input size is the reference. Reported per variant: load/export
+time, median and p95 latency per image, and agreement with the reference
+on the largest vehicle (same CUSTOM_CLASSIFICATION zone, box IoU).
+
+Usage (from ml_models/):
+    python compare_backends.py
+    python compare_backends.py --variants torch,onnx,onnx-int8,openvino,openvino-int8 --imgsz 480 --threads 4
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+import cv2
+
+import backends
+import pipeline
+from tracking import iou
+
+# --- ================= CONFIGURATION ================= ---
+IMAGE_FOLDER = 'test_picture'
+IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.bmp', '.webp']
+DEFAULT_VARIANTS = 'torch,onnx,onnx-int8,openvino,openvino-int8'
+# --- =============================================== ---
+
+
+def parse_variant(variant):
+    backend, _, precision = variant.partition('-')
+    if precision not in ('', 'int8'):
+        raise ValueError(f"Unknown precision {precision!r} in variant {variant!r}")
+    return backend, precision == 'int8'
+
+
+def largest(vehicle_model, frame):
+    detections = pipeline.detect_vehicles(vehicle_model, [frame])[0]
+    box, xyxy = pipeline.largest_vehicle(detections)
+    if box is None:
+        return None, None
+    return xyxy, pipeline.CUSTOM_CLASSIFICATION.get(int(box.cls[0].cpu().numpy()), "Unknown")
+
+
+def run_variant(variant, frames, imgsz, threads, repeat):
+    backend, int8 = parse_variant(variant)
+
+    started = time.perf_counter()
+    vehicle_model = backends.load_vehicle_model(
+        pipeline.VEHICLE_MODEL_PATH, backend=backend, imgsz=imgsz, int8=int8, threads=threads
+    )
+    largest(vehicle_model, frames[0][1])  # warm-up
+    load_seconds = time.perf_counter() - started
+
+    latencies = []
+    outputs = {}
+    for name, frame in frames:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            outputs[name] = largest(vehicle_model, frame)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    latencies.sort()
+    return {
+        'variant': variant,
+        'load_seconds': round(load_seconds, 2),
+        'median_ms': round(statistics.median(latencies), 2),
+        'p95_ms': round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 2),
+    }, outputs
+
+
+def agreement(outputs, reference):
+    same_zone = 0
+    ious = []
+    for name, (box, zone) in reference.items():
+        other_box, other_zone = outputs.get(name, (None, None))
+        if box is None or other_box is None:
+            same_zone += int(box is None and other_box is None)
+            continue
+        same_zone += int(zone == other_zone)
+        ious.append(iou(box, other_box))
+    return (
+        round(same_zone / max(len(reference), 1), 3),
+        round(statistics.mean(ious), 3) if ious else None
+    )
+
+
+def _cell(value):
+    return '-' if value is None else str(value)
+
+
+def main(args):
+    names = sorted(
+        f for f in os.listdir(args.folder) if os.path.splitext(f)[1].lower() in IMAGE_EXTENSIONS
+    )
+    frames = [(name, cv2.imread(os.path.join(args.folder, name))) for name in names]
+    frames = [(name, frame) for name, frame in frames if frame is not None]
+    if not frames:
+        print(f"No images found in '{args.folder}'")
+        return
+
+    variants = [v.strip() for v in args.variants.split(',') if v.strip()]
+    if 'torch' not in variants:
+        variants.insert(0, 'torch')
+
+    rows = []
+    reference = None
+    for variant in variants:
+        try:
+            row, outputs = run_variant(variant, frames, args.imgsz, args.threads, args.repeat)
+        except Exception as e:
+            print(f"Skipping {variant}: {e}")
+            if variant == 'torch':
+                print("No torch reference: speed is compared, zone agreement and IoU are left empty")
+            continue
+        if variant == 'torch':
+            reference = outputs
+        if reference is None:
+            row['zone_agreement'], row['mean_iou'] = None, None
+        else:
+            row['zone_agreement'], row['mean_iou'] = agreement(outputs, reference)
+        rows.append(row)
+
+    header = f"{'variant':<16}{'load s':>8}{'median ms':>11}{'p95 ms':>9}{'zone agree':>12}{'mean IoU':>10}"
+    print(f"\n{len(frames)} images, imgsz={args.imgsz}, threads={args.threads or 'default'}")
+    print(header)
+    print('-' * len(header))
+    for row in rows:
+        print(
+            f"{row['variant']:<16}{row['load_seconds']:>8}{row['median_ms']:>11}{row['p95_ms']:>9}"
+            f"{_cell(row['zone_agreement']):>12}{_cell(row['mean_iou']):>10}"
+        )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'imgsz': args.imgsz, 'threads': args.threads, 'results': rows}, f, indent=4)
+        print(f"Results saved to '{args.output}'")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare vehicle detector backends')
+    parser.add_argument('--folder', default=IMAGE_FOLDER, help='Folder with test images')
+    parser.add_argument('--variants', default=DEFAULT_VARIANTS,
+                        help='Comma separated: torch, onnx, onnx-int8, openvino, openvino-int8')
+    parser.add_argument('--imgsz', type=int, default=backends.DEFAULT_IMGSZ, help='Detector input size')
+    parser.add_argument('--threads', type=int, default=None, help='Inference threads')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per image')
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    main(args)
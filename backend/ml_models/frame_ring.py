@@ -0,0 +1,235 @@
+"""
+Zero-copy frame transport from a capture process to inference workers.
+
+The capture process decodes camera frames straight into a ring of
+fixed-size slots in ``multiprocessing.shared_memory``. Only the slot index
+travels over a queue; inference workers wrap the same memory in a NumPy
+view, so a 1280x720 frame is never pickled or copied between processes.
+Slots come from a free pool and go back to it once a worker is done, so
+the capture side can never overwrite a frame that is still being read.
+When every slot is busy the frame is dropped (the lane is saturated and
+the next trigger is more useful than a stale one).
+
+Detections are published on an in-memory queue instead of being written
+to ``detection_results.json``.
+
+Usage (from ml_models/):
+    python frame_ring.py
+    python frame_ring.py --source rtsp://camera/stream --workers 2 --slots 8
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import pipeline
+from video_stream import MotionGate, StreamStats, triggered_frames, positive_int, CAMERA_SOURCE, FRAME_SKIP, COOLDOWN_SECONDS
+
+# --- ================= CONFIGURATION ================= ---
+FRAME_WIDTH = 1280
+FRAME_HEIGHT = 720
+RING_SLOTS = 8
+INFERENCE_WORKERS = 2
+# --- =============================================== ---
+
+_STOP = None
+
+
+class FrameRing:
+    """Fixed-size frame slots in one shared memory block"""
+
+    def __init__(self, slots=RING_SLOTS, shape=(FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8, name=None):
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.slot_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self._owner = name is None
+        if self._owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * slots)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self.name = self._shm.name
+        self._frames = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=self._shm.buf)
+        self.free = None
+
+    def __getstate__(self):
+        # Only the name crosses the process boundary; the child re-attaches
+        return {'slots': self.slots, 'shape': self.shape, 'dtype': self.dtype.str,
+                'name': self.name, 'free': self.free}
+
+    def __setstate__(self, state):
+        self.__init__(state['slots'], state['shape'], state['dtype'], name=state['name'])
+        self.free = state['free']
+
+    def view(self, slot):
+        """NumPy view of a slot; valid until the slot is released"""
+        return self._frames[slot]
+
+    def attach_pool(self, ctx=mp):
+        """Create the free-slot pool shared by the capture process and workers"""
+        self.free = ctx.Queue()
+        for slot in range(self.slots):
+            self.free.put(slot)
+        return self.free
+
+    def acquire(self):
+        """Take a free slot, or None when every slot is in use"""
+        try:
+            return self.free.get_nowait()
+        except queue.Empty:
+            return None
+
+    def release(self, slot):
+        self.free.put(slot)
+
+    def write(self, slot, frame):
+        """Place a frame in a slot unless it was already decoded into it"""
+        target = self._frames[slot]
+        if frame.ctypes.data == target.ctypes.data:
+            return target
+        if frame.shape != self.shape:
+            import cv2
+            cv2.resize(frame, (self.shape[1], self.shape[0]), dst=target)
+        else:
+            np.copyto(target, frame)
+        return target
+
+    def close(self):
+        del self._frames
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def capture_process(ring, jobs, source=CAMERA_SOURCE, frame_skip=FRAME_SKIP, cooldown=COOLDOWN_SECONDS,
+                    method='mog2', workers=INFERENCE_WORKERS, stop=None):
+    """Decode motion-triggered frames into ring slots and queue their indices"""
+    import cv2
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        print(f"Error: Could not open video source {source!r}.")
+        for _ in range(workers):
+            jobs.put(_STOP)
+        return
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, ring.shape[1])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, ring.shape[0])
+
+    gate = MotionGate(method=method)
+    stats = StreamStats()
+    dropped = 0
+    current = [ring.acquire()]
+
+    def next_buffer():
+        if current[0] is None:
+            current[0] = ring.acquire()
+        return ring.view(current[0]) if current[0] is not None else None
+
+    try:
+        for frame in triggered_frames(cap, gate, frame_skip, cooldown, stats=stats, next_buffer=next_buffer):
+            if stop is not None and stop.is_set():
+                break
+            slot = current[0]
+            if slot is None:
+                dropped += 1
+                continue
+            ring.write(slot, frame)
+            jobs.put((slot, time.time()))
+            current[0] = ring.acquire()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cap.release()
+        if current[0] is not None:
+            ring.release(current[0])
+        for _ in range(workers):
+            jobs.put(_STOP)
+        print(f"Capture stopped: {stats.summary()}, {dropped} frames dropped (ring full)")
+
+
+def inference_worker(worker_id, ring, jobs, detections):
+    """Run the pipeline on ring slots and publish results on the detections queue"""
+    vehicle_model, ocr_reader = pipeline.load_models()
+    pipeline.warm_up(vehicle_model, ocr_reader)
+
+    while True:
+        job = jobs.get()
+        if job is _STOP:
+            break
+        slot, captured_at = job
+        timings = {}
+        try:
+            results = pipeline.process_frame(vehicle_model, ocr_reader, ring.view(slot), timings)
+        finally:
+            ring.release(slot)
+
+        for result in results:
+            result["timestamp"] = captured_at
+        detections.put({
+            'worker': worker_id,
+            'results': results,
+            'latency_ms': round((time.time() - captured_at) * 1000, 1),
+            'timings_ms': {stage: round(v * 1000, 1) for stage, v in timings.items() if isinstance(v, float)},
+        })
+    detections.put(_STOP)
+
+
+def run(source=CAMERA_SOURCE, workers=INFERENCE_WORKERS, slots=RING_SLOTS, width=FRAME_WIDTH,
+        height=FRAME_HEIGHT, frame_skip=FRAME_SKIP, cooldown=COOLDOWN_SECONDS, method='mog2', on_detection=None):
+    """Start capture + inference processes and consume detections until capture ends"""
+    ctx = mp.get_context('spawn')
+    ring = FrameRing(slots=slots, shape=(height, width, 3))
+    ring.attach_pool(ctx)
+    jobs = ctx.Queue(maxsize=slots)
+    detections = ctx.Queue()
+    stop = ctx.Event()
+
+    processes = [ctx.Process(target=inference_worker, args=(i, ring, jobs, detections), daemon=True)
+                 for i in range(workers)]
+    processes.append(ctx.Process(target=capture_process,
+                                 args=(ring, jobs, source, frame_skip, cooldown, method, workers, stop),
+                                 daemon=True))
+    for process in processes:
+        process.start()
+
+    finished = 0
+    try:
+        while finished < workers:
+            message = detections.get()
+            if message is _STOP:
+                finished += 1
+                continue
+            if not message['results']:
+                continue
+            if on_detection:
+                on_detection(message['results'])
+            else:
+                print(json.dumps(message))
+    except KeyboardInterrupt:
+        stop.set()
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+        ring.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Shared-memory capture -> inference workers')
+    parser.add_argument('--source', default=str(CAMERA_SOURCE), help='Webcam index or video/RTSP URL')
+    parser.add_argument('--workers', type=int, default=INFERENCE_WORKERS, help='Inference worker processes')
+    parser.add_argument('--slots', type=int, default=RING_SLOTS, help='Frames in the shared-memory ring')
+    parser.add_argument('--width', type=int, default=FRAME_WIDTH, help='Ring frame width')
+    parser.add_argument('--height', type=int, default=FRAME_HEIGHT, help='Ring frame height')
+    parser.add_argument('--frame-skip', type=positive_int, default=FRAME_SKIP, help='Check every N-th frame for motion')
+    parser.add_argument('--cooldown', type=float, default=COOLDOWN_SECONDS,
+                        help='Seconds without detections after a trigger')
+    parser.add_argument('--motion', choices=['mog2', 'diff'], default='mog2', help='Motion gate method')
+    args = parser.parse_args()
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    run(source, args.workers, args.slots, args.width, args.height, args.frame_skip, args.cooldown, args.motion)
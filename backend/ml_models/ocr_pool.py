@@ -0,0 +1,307 @@
+"""
+Multi-core plate OCR with a pool of worker processes.
+
+A single ``easyocr.Reader`` serializes every lane's OCR, and torch's
+intra-op threads compete with the detector and the web workers for the
+same cores. ``OcrPool`` starts N processes, each with its own preloaded
+and warmed-up reader, a fixed torch/OpenCV thread count and (optionally)
+its own CPU set, fed from one job queue. ``max_pending`` bounds the jobs
+in flight: when the pool is saturated ``submit`` waits up to its timeout
+and then raises ``OcrPoolFull`` instead of letting the queue grow.
+
+Crops are sent to the workers by value (a vehicle crop is a few hundred
+KB); results come back as ``(plate_text, confidence)`` plus the worker's
+stage timings. Workers report which job they picked up, so when one dies
+(OOM kill, segfault in native code) the collector fails that job's
+future, frees its pending slot and starts a replacement worker.
+
+Usage (from ml_models/):
+    python ocr_pool.py --folder test_picture --workers 4 --threads 1
+"""
+
+import argparse
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+# --- ================= CONFIGURATION ================= ---
+OCR_WORKERS = 4
+OCR_THREADS_PER_WORKER = 1
+OCR_PENDING_PER_WORKER = 4
+OCR_READY_TIMEOUT = 300.0
+SERVICE_TIME_WINDOW = 512
+WORKER_CHECK_INTERVAL = 1.0
+# --- =============================================== ---
+
+_STOP = None
+
+logger = logging.getLogger(__name__)
+
+
+class OcrPoolFull(Exception):
+    pass
+
+
+def _worker_cpus(worker_id, threads, pin):
+    if not pin or not hasattr(os, 'sched_getaffinity'):
+        return None
+    available = sorted(os.sched_getaffinity(0))
+    if len(available) < 2:
+        return None
+    start = worker_id * threads
+    return {available[(start + i) % len(available)] for i in range(threads)}
+
+
+def _ocr_worker(worker_id, jobs, results, threads, cpus, gpu):
+    # Limit BLAS/OpenMP pools before torch is imported by easyocr
+    for name in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[name] = str(threads)
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+
+    try:
+        from . import pipeline
+    except ImportError:
+        import pipeline
+
+    try:
+        import cv2
+        import torch
+
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+        cv2.setNumThreads(1)
+    except (ImportError, RuntimeError):
+        pass
+
+    try:
+        ocr_reader = pipeline.load_ocr_reader(gpu)
+        pipeline.warm_up(None, ocr_reader)
+    except Exception as e:
+        results.put(('failed', worker_id, str(e)))
+        return
+    results.put(('ready', worker_id, None))
+
+    while True:
+        job = jobs.get()
+        if job is _STOP:
+            break
+        job_id, vehicle_crop = job
+        results.put(('start', worker_id, job_id))
+        started = time.perf_counter()
+        timings = {}
+        try:
+            plate = pipeline.read_plate(ocr_reader, vehicle_crop, timings)
+            error = None
+        except Exception as e:
+            plate, error = None, str(e)
+        results.put(('done', worker_id, job_id, plate, timings, time.perf_counter() - started, error))
+
+
+class OcrPool:
+    """Process pool of EasyOCR readers behind a bounded job queue"""
+
+    def __init__(self, workers=OCR_WORKERS, threads_per_worker=OCR_THREADS_PER_WORKER,
+                 max_pending=None, gpu=False, pin_cpus=True):
+        self.workers = max(1, workers)
+        self.threads_per_worker = max(1, threads_per_worker)
+        self.max_pending = max_pending or self.workers * OCR_PENDING_PER_WORKER
+        self.ready_workers = 0
+        self.errors = []
+        self.completed = 0
+        self.restarts = 0
+
+        self._ctx = mp.get_context('spawn')
+        self._gpu = gpu
+        self._pin_cpus = pin_cpus
+        self._jobs = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._futures = {}
+        self._in_service = {}
+        self._ready_ids = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._service_times = deque(maxlen=SERVICE_TIME_WINDOW)
+        self._ready = threading.Event()
+        self._closing = False
+
+        self._processes = [None] * self.workers
+        for worker_id in range(self.workers):
+            self._start_worker(worker_id)
+
+        self._collector = threading.Thread(target=self._collect, name='ocr-pool-collector', daemon=True)
+        self._collector.start()
+
+    def _start_worker(self, worker_id):
+        process = self._ctx.Process(
+            target=_ocr_worker,
+            args=(worker_id, self._jobs, self._results, self.threads_per_worker,
+                  _worker_cpus(worker_id, self.threads_per_worker, self._pin_cpus), self._gpu),
+            name=f'ocr-worker-{worker_id}',
+            daemon=True
+        )
+        process.start()
+        self._processes[worker_id] = process
+
+    def wait_ready(self, timeout=OCR_READY_TIMEOUT):
+        """Block until every worker has loaded its reader; raises if one failed"""
+        if not self._ready.wait(timeout):
+            raise TimeoutError(f'{self.ready_workers}/{self.workers} OCR workers ready after {timeout}s')
+        if self.errors:
+            raise RuntimeError(f'OCR worker failed to start: {self.errors[0]}')
+
+    def submit(self, vehicle_crop, timeout=None):
+        """Queue one vehicle crop; the future resolves to ((plate_text, confidence), timings)"""
+        if not self._slots.acquire(timeout=timeout):
+            raise OcrPoolFull(f'{self.max_pending} OCR jobs already pending')
+
+        future = Future()
+        job_id = next(self._ids)
+        with self._lock:
+            self._futures[job_id] = (future, time.perf_counter())
+        self._jobs.put((job_id, vehicle_crop))
+        return future
+
+    def read_plate(self, vehicle_crop, timings=None, timeout=None):
+        """Drop-in for ``pipeline.read_plate`` (use as ``describe_vehicle(plate_reader=...)``)"""
+        plate, worker_timings = self.submit(vehicle_crop, timeout=timeout).result(timeout=timeout)
+        if timings is not None:
+            timings.update(worker_timings)
+        return plate
+
+    def depth(self):
+        """Jobs submitted but not finished (queued + in service)"""
+        with self._lock:
+            return len(self._futures)
+
+    def stats(self):
+        with self._lock:
+            samples = sorted(self._service_times)
+            pending = len(self._futures)
+        return {
+            'workers': self.workers,
+            'ready_workers': self.ready_workers,
+            'threads_per_worker': self.threads_per_worker,
+            'queue_depth': pending,
+            'max_pending': self.max_pending,
+            'completed': self.completed,
+            'restarts': self.restarts,
+            'service_ms_p50': round(samples[len(samples) // 2] * 1000, 1) if samples else None,
+            'service_ms_p95': round(samples[int(len(samples) * 0.95)] * 1000, 1) if samples else None,
+        }
+
+    def _collect(self):
+        checked_at = time.monotonic()
+        while True:
+            if time.monotonic() - checked_at >= WORKER_CHECK_INTERVAL:
+                self._check_workers()
+                checked_at = time.monotonic()
+            try:
+                message = self._results.get(timeout=WORKER_CHECK_INTERVAL)
+            except queue.Empty:
+                continue
+            if message is _STOP:
+                break
+
+            if message[0] in ('ready', 'failed'):
+                status, worker_id, error = message
+                if status == 'ready':
+                    with self._lock:
+                        self._ready_ids.add(worker_id)
+                        self.ready_workers = len(self._ready_ids)
+                else:
+                    self.errors.append(error)
+                if self.ready_workers + len(self.errors) >= self.workers:
+                    self._ready.set()
+                continue
+
+            if message[0] == 'start':
+                _, worker_id, job_id = message
+                with self._lock:
+                    self._in_service[worker_id] = job_id
+                continue
+
+            _, worker_id, job_id, plate, timings, service_seconds, error = message
+            with self._lock:
+                if self._in_service.get(worker_id) == job_id:
+                    del self._in_service[worker_id]
+                entry = self._futures.pop(job_id, None)
+                self._service_times.append(service_seconds)
+                self.completed += 1
+            if entry is None:
+                # Already failed when its worker was declared dead
+                continue
+            future, submitted_at = entry
+            self._slots.release()
+
+            timings['ocr_queue'] = max(0.0, time.perf_counter() - submitted_at - service_seconds)
+            timings['ocr_service'] = service_seconds
+            if error:
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result((tuple(plate), timings))
+
+    def _check_workers(self):
+        """Fail the job of every worker that died, release its slot and start a replacement"""
+        for worker_id, process in enumerate(self._processes):
+            # exit code 0: stopped by close() or gave up after a failed start (reported as 'failed')
+            if self._closing or process.is_alive() or process.exitcode == 0:
+                continue
+            with self._lock:
+                job_id = self._in_service.pop(worker_id, None)
+                entry = self._futures.pop(job_id, None) if job_id is not None else None
+                self._ready_ids.discard(worker_id)
+                self.ready_workers = len(self._ready_ids)
+            if entry is not None:
+                self._slots.release()
+                entry[0].set_exception(RuntimeError(f'OCR worker {worker_id} died (exit code {process.exitcode})'))
+            logger.warning('OCR worker %s died (exit code %s), restarting', worker_id, process.exitcode)
+            self.restarts += 1
+            self._start_worker(worker_id)
+
+    def close(self):
+        self._closing = True
+        for _ in self._processes:
+            self._jobs.put(_STOP)
+        for process in self._processes:
+            process.join(timeout=5)
+        self._results.put(_STOP)
+        self._collector.join(timeout=5)
+
+
+if __name__ == "__main__":
+    import cv2
+
+    parser = argparse.ArgumentParser(description='OCR pool throughput over an image folder')
+    parser.add_argument('--folder', default='test_picture', help='Folder with vehicle images')
+    parser.add_argument('--workers', type=int, default=OCR_WORKERS, help='OCR worker processes')
+    parser.add_argument('--threads', type=int, default=OCR_THREADS_PER_WORKER, help='Torch threads per worker')
+    parser.add_argument('--repeat', type=int, default=5, help='Times each image is submitted')
+    parser.add_argument('--no-pin', action='store_true', help='Do not pin workers to CPUs')
+    args = parser.parse_args()
+
+    crops = [cv2.imread(os.path.join(args.folder, name)) for name in sorted(os.listdir(args.folder))]
+    crops = [crop for crop in crops if crop is not None]
+
+    pool = OcrPool(args.workers, args.threads, pin_cpus=not args.no_pin)
+    print(f"Starting {args.workers} OCR workers...")
+    pool.wait_ready()
+
+    started = time.perf_counter()
+    futures = [pool.submit(crop) for _ in range(args.repeat) for crop in crops]
+    max_depth = pool.depth()
+    for future in futures:
+        future.result()
+    elapsed = time.perf_counter() - started
+
+    print(f"{len(futures)} crops in {elapsed:.2f}s ({len(futures) / elapsed:.1f} crops/sec), "
+          f"max queue depth {max_depth}")
+    print(pool.stats())
+    pool.close()
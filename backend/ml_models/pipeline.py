@@ -0,0 +1,269 @@
+"""
+Reusable detection pipeline shared by the scripts and the detection service.
+
+Stages: vehicle detection (YOLO) -> largest vehicle crop -> plate
+localization (edge/contour heuristics) -> plate OCR (EasyOCR) on a small,
+fixed-size plate crop. Callers own the models, so a long-lived process loads them once
+and calls ``process_frame`` per image.
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+# --- ================= CONFIGURATION ================= ---
+# YOLO Model Path
+VEHICLE_MODEL_PATH = 'yolov8s.pt'
+
+# EasyOCR languages
+OCR_LANGUAGES = ['id', 'en']
+
+# Filter and Classification (COCO class id -> parking zone)
+CUSTOM_CLASSIFICATION = {3: "A", 2: "B", 5: "C", 7: "C"}
+TARGET_CLASSES = list(CUSTOM_CLASSIFICATION.keys())
+
+NOT_DETECTED = "Not Detected"
+
+# Plate localization (width / height of a plate candidate, share of the vehicle crop area)
+PLATE_ASPECT_RANGE = (1.8, 6.0)
+PLATE_AREA_RANGE = (0.004, 0.25)
+PLATE_PADDING = 4
+
+# OCR input for the plate crop
+OCR_PLATE_SIZE = (256, 64)  # width, height
+PLATE_ALLOWLIST = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 '
+
+# Fall back to OCR on the whole vehicle crop when the plate region yields nothing
+PLATE_FALLBACK_FULL_CROP = True
+# --- =============================================== ---
+
+
+def load_models(vehicle_model_path=VEHICLE_MODEL_PATH, gpu=False, backend='torch',
+                imgsz=640, int8=False, threads=None, ocr=True):
+    """
+    Load the vehicle detector and the EasyOCR reader.
+
+    ``backend`` selects PyTorch, ONNX Runtime or OpenVINO for the detector
+    (see ``backends.py``); ``imgsz``, ``int8`` and ``threads`` tune it for CPU.
+    With ``ocr=False`` no reader is loaded (OCR runs elsewhere, e.g. in an
+    ``ocr_pool.OcrPool``) and None is returned in its place.
+    """
+    try:
+        from . import backends
+    except ImportError:
+        import backends
+
+    vehicle_model = backends.load_vehicle_model(
+        vehicle_model_path, backend=backend, imgsz=imgsz, int8=int8, threads=threads
+    )
+    ocr_reader = load_ocr_reader(gpu) if ocr else None
+    return vehicle_model, ocr_reader
+
+
+def load_ocr_reader(gpu=False):
+    import easyocr
+
+    return easyocr.Reader(OCR_LANGUAGES, gpu=gpu)
+
+
+def warm_up(vehicle_model, ocr_reader, size=640):
+    """Run one dummy pass so the first real frame does not pay lazy init costs"""
+    blank = np.zeros((size, size, 3), dtype=np.uint8)
+    if vehicle_model is not None:
+        vehicle_model(blank, classes=TARGET_CLASSES, verbose=False)
+    if ocr_reader is not None:
+        ocr_reader.readtext(cv2.cvtColor(blank[:160, :320], cv2.COLOR_BGR2GRAY))
+
+
+def is_plausible_plate(text):
+    text = text.replace(" ", "").upper()
+    # Looks for a pattern containing letters and numbers
+    if any(char.isdigit() for char in text) and any(char.isalpha() for char in text) and 4 < len(text) < 10:
+        return True
+    return False
+
+
+def normalize_plate(text):
+    return text.upper().replace(" ", "").replace(".", "").replace("-", "")
+
+
+def vehicle_boxes(vehicle_detections):
+    """All detected vehicles as [((x1, y1, x2, y2), coco_class_id, confidence), ...]"""
+    boxes = []
+    for box in vehicle_detections.boxes:
+        xyxy = tuple(map(int, box.xyxy[0].cpu().numpy()))
+        boxes.append((xyxy, int(box.cls[0].cpu().numpy()), float(box.conf[0].cpu().numpy())))
+    return boxes
+
+
+def largest_vehicle(vehicle_detections):
+    """Return (box, (x1, y1, x2, y2)) of the largest detected vehicle, or (None, None)"""
+    largest_box = None
+    largest_xyxy = None
+    max_area = 0
+    for box in vehicle_detections.boxes:
+        x1, y1, x2, y2 = map(int, box.xyxy[0].cpu().numpy())
+        area = (x2 - x1) * (y2 - y1)
+        if area > max_area:
+            max_area = area
+            largest_box = box
+            largest_xyxy = (x1, y1, x2, y2)
+    return largest_box, largest_xyxy
+
+
+def localize_plate(vehicle_crop):
+    """
+    Return the (x1, y1, x2, y2) of the most plate-like region in a vehicle crop, or None.
+
+    Plates are dense clusters of vertical character edges: horizontal Sobel
+    gradient -> closing with a wide kernel -> Otsu threshold -> contours,
+    filtered by aspect ratio and relative area. Works for both black and
+    white Indonesian plates since the gradient ignores polarity. Among the
+    candidates, larger regions lower on the vehicle win.
+    """
+    height, width = vehicle_crop.shape[:2]
+    if height < 20 or width < 20:
+        return None
+
+    gray = cv2.cvtColor(vehicle_crop, cv2.COLOR_BGR2GRAY)
+    gray = cv2.bilateralFilter(gray, 7, 50, 50)
+
+    gradient = np.absolute(cv2.Sobel(gray, cv2.CV_32F, 1, 0, ksize=3))
+    gradient = cv2.normalize(gradient, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+    gradient = cv2.GaussianBlur(gradient, (5, 5), 0)
+
+    kernel_width = max(9, width // 25)
+    closed = cv2.morphologyEx(
+        gradient, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_width, 3))
+    )
+    _, mask = cv2.threshold(closed, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    mask = cv2.erode(mask, None, iterations=2)
+    mask = cv2.dilate(mask, None, iterations=2)
+
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    best_region = None
+    best_score = 0.0
+    crop_area = float(height * width)
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if h == 0:
+            continue
+        aspect = w / float(h)
+        area_ratio = (w * h) / crop_area
+        if not (PLATE_ASPECT_RANGE[0] <= aspect <= PLATE_ASPECT_RANGE[1]):
+            continue
+        if not (PLATE_AREA_RANGE[0] <= area_ratio <= PLATE_AREA_RANGE[1]):
+            continue
+
+        score = area_ratio * (1.0 + (y + h / 2.0) / height)
+        if score > best_score:
+            best_score = score
+            best_region = (
+                max(0, x - PLATE_PADDING), max(0, y - PLATE_PADDING),
+                min(width, x + w + PLATE_PADDING), min(height, y + h + PLATE_PADDING)
+            )
+    return best_region
+
+
+def prepare_plate(plate_crop):
+    """Grayscale plate crop resized to the fixed OCR input size"""
+    gray = cv2.cvtColor(plate_crop, cv2.COLOR_BGR2GRAY)
+    interpolation = cv2.INTER_AREA if gray.shape[1] > OCR_PLATE_SIZE[0] else cv2.INTER_CUBIC
+    return cv2.resize(gray, OCR_PLATE_SIZE, interpolation=interpolation)
+
+
+def ocr_plate(ocr_reader, vehicle_crop, timings=None):
+    """
+    OCR results ``[(bbox, text, prob), ...]`` for the plate of a vehicle crop.
+
+    OCR runs on the localized plate region only, restricted to plate
+    characters. Only when no plate region was found and
+    PLATE_FALLBACK_FULL_CROP is set is the whole vehicle crop read as
+    before; an implausible read of a found region is not retried on the
+    full crop (that doubles OCR time for exactly the hard frames).
+    """
+    timings = timings if timings is not None else {}
+
+    started = time.perf_counter()
+    region = localize_plate(vehicle_crop)
+    timings['localize'] = time.perf_counter() - started
+
+    ocr_results = []
+    started = time.perf_counter()
+    if region is not None:
+        x1, y1, x2, y2 = region
+        ocr_results = ocr_reader.readtext(
+            prepare_plate(vehicle_crop[y1:y2, x1:x2]), allowlist=PLATE_ALLOWLIST
+        )
+    elif PLATE_FALLBACK_FULL_CROP:
+        timings['fallback'] = True
+        ocr_results = ocr_reader.readtext(cv2.cvtColor(vehicle_crop, cv2.COLOR_BGR2GRAY))
+    timings['ocr'] = time.perf_counter() - started
+
+    return ocr_results
+
+
+def read_plate(ocr_reader, vehicle_crop, timings=None):
+    """OCR the vehicle's plate and return (plate_text, confidence) of the best plausible plate"""
+    if vehicle_crop.size == 0:
+        return NOT_DETECTED, 0.0
+
+    best_plate_text = NOT_DETECTED
+    best_plate_prob = 0.0
+    for (bbox, text, prob) in ocr_plate(ocr_reader, vehicle_crop, timings):
+        if is_plausible_plate(text) and prob > best_plate_prob:
+            best_plate_text = normalize_plate(text)
+            best_plate_prob = float(prob)
+    return best_plate_text, best_plate_prob
+
+
+def detect_vehicles(vehicle_model, frames):
+    """Run the vehicle detector on a list of frames as one batch; one result per frame"""
+    return list(vehicle_model(frames, classes=TARGET_CLASSES, verbose=False))
+
+
+def describe_vehicle(ocr_reader, frame, vehicle_detections, timings=None, plate_reader=None):
+    """
+    Crop the largest vehicle of one frame's detections and read its plate.
+
+    Returns a list in the ``detection_results.json`` schema
+    (``[{"vehicle_type": ..., "license_plate": ...}]``), empty when no vehicle
+    was detected. ``plate_reader(vehicle_crop, timings)`` replaces the
+    in-process ``read_plate`` call, e.g. with ``OcrPool.read_plate``.
+    """
+    timings = timings if timings is not None else {}
+
+    box, xyxy = largest_vehicle(vehicle_detections)
+    if box is None:
+        return []
+
+    x1_v, y1_v, x2_v, y2_v = xyxy
+    coco_class_id = int(box.cls[0].cpu().numpy())
+
+    vehicle_crop = frame[y1_v:y2_v, x1_v:x2_v]
+    if plate_reader is not None:
+        plate_text, _ = plate_reader(vehicle_crop, timings)
+    else:
+        plate_text, _ = read_plate(ocr_reader, vehicle_crop, timings)
+
+    return [{
+        "vehicle_type": CUSTOM_CLASSIFICATION.get(coco_class_id, "Unknown"),
+        "license_plate": plate_text
+    }]
+
+
+def process_frame(vehicle_model, ocr_reader, frame, timings=None):
+    """
+    Detect the largest vehicle in ``frame`` and read its plate.
+
+    When ``timings`` is a dict, per-stage seconds are added to it.
+    """
+    timings = timings if timings is not None else {}
+
+    started = time.perf_counter()
+    vehicle_detections = detect_vehicles(vehicle_model, [frame])[0]
+    timings['detect'] = time.perf_counter() - started
+
+    return describe_vehicle(ocr_reader, frame, vehicle_detections, timings)
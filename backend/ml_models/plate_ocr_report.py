@@ -0,0 +1,110 @@
+"""
+Per-stage timing report: OCR on the full vehicle crop vs. on the localized plate.
+
+Runs both paths over every image in IMAGE_FOLDER (largest vehicle only) and
+prints detect / localize / OCR times and the plate each path read.
+
+Usage (from ml_models/):
+    python plate_ocr_report.py
+    python plate_ocr_report.py --folder test_picture --repeat 3
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import cv2
+
+import pipeline
+
+# --- ================= CONFIGURATION ================= ---
+IMAGE_FOLDER = 'test_picture'
+IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.bmp', '.webp']
+# --- =============================================== ---
+
+
+def best_plate(ocr_results):
+    best_text, best_prob = pipeline.NOT_DETECTED, 0.0
+    for (_, text, prob) in ocr_results:
+        if pipeline.is_plausible_plate(text) and prob > best_prob:
+            best_text, best_prob = pipeline.normalize_plate(text), prob
+    return best_text
+
+
+def time_ms(fn, repeat):
+    """Median wall time of ``fn`` in ms over ``repeat`` runs, plus its last result"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def plate_path_ms(ocr_reader, vehicle_crop, repeat):
+    """Median localize and plate OCR times in ms, each timed separately per run, plus the last run's results"""
+    localize_samples, ocr_samples = [], []
+    results, timings = [], {}
+    for _ in range(repeat):
+        timings = {}
+        results = pipeline.ocr_plate(ocr_reader, vehicle_crop, timings)
+        localize_samples.append(timings['localize'] * 1000)
+        ocr_samples.append(timings['ocr'] * 1000)
+    return statistics.median(localize_samples), statistics.median(ocr_samples), results, timings
+
+
+def main(folder, repeat):
+    print("Loading models...")
+    vehicle_model, ocr_reader = pipeline.load_models()
+    pipeline.warm_up(vehicle_model, ocr_reader)
+
+    image_names = sorted(
+        f for f in os.listdir(folder) if os.path.splitext(f)[1].lower() in IMAGE_EXTENSIONS
+    )
+
+    rows = []
+    for name in image_names:
+        img = cv2.imread(os.path.join(folder, name))
+        if img is None:
+            continue
+
+        detect_ms, detections = time_ms(lambda: pipeline.detect_vehicles(vehicle_model, [img])[0], repeat)
+        _, xyxy = pipeline.largest_vehicle(detections)
+        if xyxy is None:
+            rows.append((name, detect_ms, None, None, None, '-', '-'))
+            continue
+        x1, y1, x2, y2 = xyxy
+        vehicle_crop = img[y1:y2, x1:x2]
+
+        full_ms, full_results = time_ms(
+            lambda: ocr_reader.readtext(cv2.cvtColor(vehicle_crop, cv2.COLOR_BGR2GRAY)), repeat
+        )
+        localize_ms, plate_ms, plate_results, timings = plate_path_ms(ocr_reader, vehicle_crop, repeat)
+        plate_label = best_plate(plate_results) + (' (fallback)' if timings.get('fallback') else '')
+
+        rows.append((name, detect_ms, localize_ms, full_ms, plate_ms, best_plate(full_results), plate_label))
+
+    header = f"{'image':<26}{'detect':>9}{'localize':>10}{'ocr full':>10}{'ocr plate':>11}{'speedup':>9}  plate (full / localized)"
+    print(header)
+    print('-' * len(header))
+    for name, detect_ms, localize_ms, full_ms, plate_ms, full_plate, plate_label in rows:
+        if full_ms is None:
+            print(f"{name:<26}{detect_ms:>9.1f}{'no vehicle':>20}")
+            continue
+        speedup = full_ms / (localize_ms + plate_ms) if (localize_ms + plate_ms) else 0.0
+        print(
+            f"{name:<26}{detect_ms:>9.1f}{localize_ms:>10.1f}{full_ms:>10.1f}{plate_ms:>11.1f}"
+            f"{speedup:>8.1f}x  {full_plate} / {plate_label}"
+        )
+    print("(times in ms, median per image)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare full-crop OCR with plate-localized OCR')
+    parser.add_argument('--folder', default=IMAGE_FOLDER, help='Folder with test images')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per stage and image')
+    args = parser.parse_args()
+
+    main(args.folder, args.repeat)
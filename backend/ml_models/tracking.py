@@ -0,0 +1,252 @@
+"""
+Multi-frame vehicle tracking with temporal plate voting.
+
+In a video feed the same vehicle shows up in many consecutive frames. The
+tracker links YOLO boxes across frames (greedy IoU matching with a centroid
+distance fallback), runs OCR only a bounded number of times per track on
+its best-quality frames (large, sharp, preferably not cut off by the
+frame border),
+and combines the readings with confidence-weighted per-character voting.
+Each vehicle produces exactly one plate event: once it has a plausible
+reading and stands still (e.g. at the barrier), once its frames stop
+getting better after it was read, when its OCR budget is used up, or
+when it leaves.
+"""
+
+import math
+import time
+from collections import defaultdict
+from itertools import count
+
+import cv2
+
+from pipeline import CUSTOM_CLASSIFICATION, NOT_DETECTED, is_plausible_plate
+
+# --- ================= CONFIGURATION ================= ---
+IOU_MATCH_THRESHOLD = 0.3
+CENTROID_MATCH_RATIO = 0.5     # fallback: centroid within this share of the box diagonal
+MAX_TRACK_AGE = 8              # frames a track survives without a matching box
+MIN_TRACK_HITS = 2             # frames before a track is trusted for OCR
+MAX_OCR_PER_TRACK = 3          # OCR budget per vehicle
+OCR_QUALITY_GAIN = 0.15        # re-OCR only on frames this much better than the best so far
+BORDER_MARGIN = 4              # boxes touching the frame border may be partial vehicles
+BORDER_PENALTY = 0.5           # quality factor per touched border (close-range cameras always touch one)
+STATIONARY_IOU = 0.9           # box overlap with the previous frame that counts as standing still
+STATIONARY_FRAMES = 3          # still frames before a track with a plausible reading emits
+STALE_FRAMES = 10              # frames without an OCR-worthy gain before a track emits anyway
+# --- =============================================== ---
+
+
+def iou(box_a, box_b):
+    x1 = max(box_a[0], box_b[0])
+    y1 = max(box_a[1], box_b[1])
+    x2 = min(box_a[2], box_b[2])
+    y2 = min(box_a[3], box_b[3])
+    intersection = max(0, x2 - x1) * max(0, y2 - y1)
+    if intersection == 0:
+        return 0.0
+    area_a = (box_a[2] - box_a[0]) * (box_a[3] - box_a[1])
+    area_b = (box_b[2] - box_b[0]) * (box_b[3] - box_b[1])
+    return intersection / float(area_a + area_b - intersection)
+
+
+def centroid_close(box_a, box_b):
+    ax, ay = (box_a[0] + box_a[2]) / 2.0, (box_a[1] + box_a[3]) / 2.0
+    bx, by = (box_b[0] + box_b[2]) / 2.0, (box_b[1] + box_b[3]) / 2.0
+    diagonal = math.hypot(box_a[2] - box_a[0], box_a[3] - box_a[1])
+    return math.hypot(ax - bx, ay - by) <= CENTROID_MATCH_RATIO * diagonal
+
+
+def frame_quality(frame, box):
+    """Box area times Laplacian variance (sharpness), scaled down for every frame border the box touches"""
+    height, width = frame.shape[:2]
+    x1, y1, x2, y2 = box
+    borders = (x1 <= BORDER_MARGIN) + (y1 <= BORDER_MARGIN) + (x2 >= width - BORDER_MARGIN) + (y2 >= height - BORDER_MARGIN)
+    crop = frame[y1:y2, x1:x2]
+    if crop.size == 0:
+        return 0.0
+    gray = cv2.cvtColor(cv2.resize(crop, (128, 128), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+    return (x2 - x1) * (y2 - y1) * cv2.Laplacian(gray, cv2.CV_64F).var() * BORDER_PENALTY ** borders
+
+
+def vote_plate(readings):
+    """
+    Combine OCR readings [(text, prob), ...] of one vehicle into (plate, confidence).
+
+    The plate length is the one with the most summed confidence; then each
+    position takes the character with the most summed confidence among
+    readings of that length. Confidence is the mean per-position agreement
+    times the mean OCR probability of those readings.
+    """
+    valid = [(text, prob) for text, prob in readings if text and text != NOT_DETECTED]
+    if not valid:
+        return NOT_DETECTED, 0.0
+
+    length_weight = defaultdict(float)
+    for text, prob in valid:
+        length_weight[len(text)] += prob
+    length = max(length_weight, key=length_weight.get)
+
+    same_length = [(text, prob) for text, prob in valid if len(text) == length]
+    total_weight = sum(prob for _, prob in same_length) or 1.0
+
+    characters = []
+    agreement = 0.0
+    for position in range(length):
+        weights = defaultdict(float)
+        for text, prob in same_length:
+            weights[text[position]] += prob
+        character = max(weights, key=weights.get)
+        characters.append(character)
+        agreement += weights[character] / total_weight
+
+    mean_prob = total_weight / len(same_length)
+    return ''.join(characters), (agreement / length) * mean_prob
+
+
+class Track:
+    def __init__(self, track_id, box, class_id, frame_index):
+        self.track_id = track_id
+        self.box = box
+        self.class_votes = defaultdict(float)
+        self.hits = 0
+        self.first_seen = frame_index
+        self.last_seen = frame_index
+        self.readings = []
+        self.best_quality = 0.0
+        self.still_frames = 0
+        self.stale_frames = 0
+        self.emitted = False
+        self.started_at = time.time()
+
+    def observe(self, box, class_id, confidence, frame_index):
+        self.still_frames = self.still_frames + 1 if iou(self.box, box) >= STATIONARY_IOU else 0
+        self.box = box
+        self.class_votes[class_id] += confidence
+        self.hits += 1
+        self.last_seen = frame_index
+
+    def vehicle_class(self):
+        return max(self.class_votes, key=self.class_votes.get) if self.class_votes else None
+
+    def wants_ocr(self, quality):
+        return (
+            not self.emitted
+            and self.hits >= MIN_TRACK_HITS
+            and len(self.readings) < MAX_OCR_PER_TRACK
+            and quality > 0
+            and quality > self.best_quality * (1 + OCR_QUALITY_GAIN)
+        )
+
+    def settled(self):
+        """Nothing more to gain from this track: it should emit now"""
+        if self.hits < MIN_TRACK_HITS:
+            return False
+        if len(self.readings) >= MAX_OCR_PER_TRACK:
+            return True
+        if self.stale_frames >= STALE_FRAMES:
+            # Without any reading, wait for a better frame or for the track to be lost
+            return bool(self.readings)
+        plausible = any(is_plausible_plate(text) for text, _ in self.readings)
+        return plausible and self.still_frames >= STATIONARY_FRAMES
+
+    def event(self):
+        plate, confidence = vote_plate(self.readings)
+        return {
+            "vehicle_type": CUSTOM_CLASSIFICATION.get(self.vehicle_class(), "Unknown"),
+            "license_plate": plate,
+            "plate_confidence": round(confidence, 3),
+            "track_id": self.track_id,
+            "frames": self.hits,
+            "ocr_calls": len(self.readings),
+            "timestamp": time.time()
+        }
+
+
+class VehicleTracker:
+    """
+    Link detections across frames and decide when to OCR.
+
+    ``update(frame, boxes, read_plate)`` takes the frame's vehicle boxes from
+    ``pipeline.vehicle_boxes`` and a ``read_plate(crop) -> (text, prob)``
+    callable, and returns the plate events that became final on this frame
+    (see ``Track.settled``), or of tracks that were lost.
+    """
+
+    def __init__(self, max_age=MAX_TRACK_AGE):
+        self.max_age = max_age
+        self.tracks = []
+        self.frame_index = 0
+        self.ocr_calls = 0
+        self._ids = count(1)
+
+    def _match(self, boxes):
+        """Greedy IoU matching, then centroid fallback; returns {box index: track}"""
+        pairs = sorted(
+            ((iou(track.box, box[0]), track_index, box_index)
+             for track_index, track in enumerate(self.tracks)
+             for box_index, box in enumerate(boxes)),
+            reverse=True
+        )
+        matches = {}
+        used_tracks = set()
+        for score, track_index, box_index in pairs:
+            if score < IOU_MATCH_THRESHOLD:
+                break
+            if track_index in used_tracks or box_index in matches:
+                continue
+            matches[box_index] = self.tracks[track_index]
+            used_tracks.add(track_index)
+
+        for box_index, box in enumerate(boxes):
+            if box_index in matches:
+                continue
+            for track_index, track in enumerate(self.tracks):
+                if track_index not in used_tracks and centroid_close(track.box, box[0]):
+                    matches[box_index] = track
+                    used_tracks.add(track_index)
+                    break
+        return matches
+
+    def update(self, frame, boxes, read_plate):
+        self.frame_index += 1
+        matches = self._match(boxes)
+
+        for box_index, (box, class_id, confidence) in enumerate(boxes):
+            track = matches.get(box_index)
+            if track is None:
+                track = Track(next(self._ids), box, class_id, self.frame_index)
+                self.tracks.append(track)
+            track.observe(box, class_id, confidence, self.frame_index)
+
+            quality = frame_quality(frame, box)
+            if track.wants_ocr(quality):
+                x1, y1, x2, y2 = box
+                track.readings.append(read_plate(frame[y1:y2, x1:x2]))
+                track.best_quality = quality
+                track.stale_frames = 0
+                self.ocr_calls += 1
+            else:
+                track.stale_frames += 1
+
+        events = []
+        alive = []
+        for track in self.tracks:
+            lost = self.frame_index - track.last_seen > self.max_age
+            if not track.emitted and (track.settled() or (lost and track.hits >= MIN_TRACK_HITS)):
+                events.append(track.event())
+                track.emitted = True
+            if not lost:
+                alive.append(track)
+        self.tracks = alive
+        return events
+
+    def flush(self):
+        """Events for every remaining track (e.g. when the stream ends)"""
+        events = [track.event() for track in self.tracks if not track.emitted and track.hits >= MIN_TRACK_HITS]
+        self.tracks = []
+        return events
+
+    def pending(self):
+        """True while some tracked vehicle has not produced its event yet"""
+        return any(not track.emitted for track in self.tracks)
@@ -0,0 +1,263 @@
+"""
+Continuous video mode for a gate camera.
+
+Instead of opening the webcam, sleeping and grabbing one frame per vehicle
+(``with_edge_devices.capture_and_detect``), the camera stays open and frames
+are read continuously. A cheap motion gate on a downscaled grayscale copy
+decides when a vehicle is present; only then does the YOLO + OCR pipeline
+run, followed by a cooldown. Skipped frames are only ``grab()``-ed (no
+decode), so an idle lane costs almost no CPU.
+
+With ``--track`` the detector runs on every checked frame while something
+moves (or a vehicle has no plate event yet) and ``tracking.VehicleTracker``
+spends a bounded OCR budget per vehicle, emitting one voted plate event
+per vehicle instead of one reading per trigger.
+
+Usage (from ml_models/):
+    python video_stream.py
+    python video_stream.py --source rtsp://camera/stream --frame-skip 3 --cooldown 5
+    python video_stream.py --track
+"""
+
+import argparse
+import json
+import time
+
+import cv2
+
+import pipeline
+from tracking import VehicleTracker
+
+# --- ================= CONFIGURATION ================= ---
+# Webcam index or video/RTSP URL
+CAMERA_SOURCE = 0
+
+# JSON Output Path
+OUTPUT_JSON_PATH = 'detection_results.json'
+
+# Only every N-th frame is decoded and checked for motion
+FRAME_SKIP = 3
+
+# Seconds without detections after a trigger
+COOLDOWN_SECONDS = 5.0
+
+# Motion gate
+MOTION_METHOD = 'mog2'          # 'mog2' (background subtraction) or 'diff' (frame differencing)
+MOTION_DOWNSCALE_WIDTH = 160
+MOTION_PIXEL_THRESHOLD = 25     # 'diff' only: grey level change counted as motion
+MOTION_MIN_AREA_RATIO = 0.02    # share of changed pixels that counts as motion
+MOTION_TRIGGER_CHECKS = 2       # consecutive motion checks before triggering
+# --- =============================================== ---
+
+
+class MotionGate:
+    """Decide from a tiny grayscale copy of the frame whether something is moving"""
+
+    def __init__(self, method=MOTION_METHOD, downscale_width=MOTION_DOWNSCALE_WIDTH,
+                 min_area_ratio=MOTION_MIN_AREA_RATIO):
+        self.method = method
+        self.downscale_width = downscale_width
+        self.min_area_ratio = min_area_ratio
+        self._previous = None
+        self._subtractor = None
+        if method == 'mog2':
+            self._subtractor = cv2.createBackgroundSubtractorMOG2(
+                history=300, varThreshold=32, detectShadows=False
+            )
+
+    def _small_gray(self, frame):
+        height, width = frame.shape[:2]
+        scale = self.downscale_width / float(width)
+        small = cv2.resize(frame, (self.downscale_width, max(1, int(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def update(self, frame):
+        """Feed one frame; returns True when the changed area exceeds the threshold"""
+        gray = self._small_gray(frame)
+
+        if self._subtractor is not None:
+            mask = self._subtractor.apply(gray)
+        else:
+            if self._previous is None:
+                self._previous = gray
+                return False
+            delta = cv2.absdiff(self._previous, gray)
+            self._previous = gray
+            _, mask = cv2.threshold(delta, MOTION_PIXEL_THRESHOLD, 255, cv2.THRESH_BINARY)
+
+        return cv2.countNonZero(mask) / float(mask.size) >= self.min_area_ratio
+
+
+class StreamStats:
+    def __init__(self):
+        self.grabbed = 0
+        self.checked = 0
+        self.triggers = 0
+        self.started = time.monotonic()
+
+    def summary(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return (
+            f"{self.grabbed} frames grabbed ({self.grabbed / elapsed:.1f} fps), "
+            f"{self.checked} motion checks, {self.triggers} pipeline runs"
+        )
+
+
+def triggered_frames(cap, gate, frame_skip=FRAME_SKIP, cooldown=COOLDOWN_SECONDS,
+                     trigger_checks=MOTION_TRIGGER_CHECKS, stats=None, next_buffer=None):
+    """
+    Yield the frames on which the expensive pipeline should run.
+
+    Every frame is grabbed to keep the camera buffer fresh, but only every
+    ``frame_skip``-th one is decoded for the motion gate. After a trigger,
+    no frame is yielded for ``cooldown`` seconds (the gate still learns the
+    background meanwhile).
+
+    ``next_buffer`` may return a preallocated array to decode into (e.g. a
+    shared-memory ring slot, see ``frame_ring``); OpenCV reuses it when the
+    shape matches.
+    """
+    stats = stats or StreamStats()
+    frame_skip = max(1, frame_skip)  # 0 or less: check every frame
+    cooldown_until = 0.0
+    motion_streak = 0
+
+    while True:
+        if not cap.grab():
+            return
+        stats.grabbed += 1
+        if stats.grabbed % frame_skip:
+            continue
+
+        buffer = next_buffer() if next_buffer else None
+        ok, frame = cap.retrieve(buffer) if buffer is not None else cap.retrieve()
+        if not ok:
+            continue
+        stats.checked += 1
+
+        moving = gate.update(frame)
+        if time.monotonic() < cooldown_until:
+            continue
+
+        motion_streak = motion_streak + 1 if moving else 0
+        if motion_streak < trigger_checks:
+            continue
+
+        motion_streak = 0
+        cooldown_until = time.monotonic() + cooldown
+        stats.triggers += 1
+        yield frame
+
+
+def tracked_events(cap, gate, vehicle_model, ocr_reader, frame_skip=FRAME_SKIP, stats=None, tracker=None):
+    """
+    Yield one plate event per vehicle from a continuous feed.
+
+    The detector runs on checked frames while the gate sees motion or a
+    tracked vehicle is still waiting for its event; a vehicle standing
+    still at the barrier after its event costs no inference.
+    """
+    stats = stats or StreamStats()
+    tracker = tracker or VehicleTracker()
+    frame_skip = max(1, frame_skip)  # 0 or less: check every frame
+
+    def read_plate(crop):
+        return pipeline.read_plate(ocr_reader, crop)
+
+    while True:
+        if not cap.grab():
+            break
+        stats.grabbed += 1
+        if stats.grabbed % frame_skip:
+            continue
+
+        ok, frame = cap.retrieve()
+        if not ok:
+            continue
+        stats.checked += 1
+
+        moving = gate.update(frame)
+        if not moving and not tracker.pending():
+            continue
+
+        stats.triggers += 1
+        vehicle_detections = pipeline.detect_vehicles(vehicle_model, [frame])[0]
+        for event in tracker.update(frame, pipeline.vehicle_boxes(vehicle_detections), read_plate):
+            yield event
+
+    yield from tracker.flush()
+
+
+def stream_and_detect(source=CAMERA_SOURCE, frame_skip=FRAME_SKIP, cooldown=COOLDOWN_SECONDS,
+                      method=MOTION_METHOD, on_detection=None, track=False):
+    """Keep the camera open and run the pipeline on motion-triggered frames"""
+    print("Loading models...")
+    vehicle_model, ocr_reader = pipeline.load_models()
+    pipeline.warm_up(vehicle_model, ocr_reader)
+    print("Models loaded successfully.")
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        print(f"Error: Could not open video source {source!r}.")
+        return
+
+    gate = MotionGate(method=method)
+    stats = StreamStats()
+    print("Streaming... press Ctrl+C to stop.")
+    try:
+        if track:
+            tracker = VehicleTracker()
+            for event in tracked_events(cap, gate, vehicle_model, ocr_reader, frame_skip, stats, tracker):
+                if on_detection:
+                    on_detection([event])
+                else:
+                    with open(OUTPUT_JSON_PATH, 'w') as f:
+                        json.dump([event], f, indent=4)
+                print(json.dumps(event))
+            print(f"OCR calls: {tracker.ocr_calls}")
+            return
+
+        for frame in triggered_frames(cap, gate, frame_skip, cooldown, stats=stats):
+            timings = {}
+            results = pipeline.process_frame(vehicle_model, ocr_reader, frame, timings)
+            if not results:
+                continue
+
+            for result in results:
+                result["timestamp"] = time.time()
+            if on_detection:
+                on_detection(results)
+            else:
+                with open(OUTPUT_JSON_PATH, 'w') as f:
+                    json.dump(results, f, indent=4)
+            print(json.dumps(results), {stage: round(v * 1000, 1) for stage, v in timings.items()
+                                        if isinstance(v, float)})
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cap.release()
+        print(f"Stream stopped: {stats.summary()}")
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'must be at least 1, got {value}')
+    return number
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Continuous gate camera detection')
+    parser.add_argument('--source', default=str(CAMERA_SOURCE), help='Webcam index or video/RTSP URL')
+    parser.add_argument('--frame-skip', type=positive_int, default=FRAME_SKIP, help='Check every N-th frame for motion')
+    parser.add_argument('--cooldown', type=float, default=COOLDOWN_SECONDS,
+                        help='Seconds without detections after a trigger')
+    parser.add_argument('--motion', choices=['mog2', 'diff'], default=MOTION_METHOD, help='Motion gate method')
+    parser.add_argument('--track', action='store_true',
+                        help='Track vehicles across frames and emit one voted plate event per vehicle')
+    args = parser.parse_args()
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    stream_and_detect(source, args.frame_skip, args.cooldown, args.motion, track=args.track)
@@ -4,6 +4,7 @@ import time
 import easyocr
 import numpy as np
 from ultralytics import YOLO
+from pipeline import ocr_plate
 
 # --- ================= CONFIGURATION ================= ---
 # YOLO Model Path
@@ -95,8 +96,8 @@ def capture_and_detect():
 
         vehicle_crop = frame[y1_v:y2_v, x1_v:x2_v]
         if vehicle_crop.size > 0:
-            gray_crop = cv2.cvtColor(vehicle_crop, cv2.COLOR_BGR2GRAY)
-            ocr_results = ocr_reader.readtext(gray_crop)
+            # Localize the plate first so OCR only reads a small plate crop
+            ocr_results = ocr_plate(ocr_reader, vehicle_crop)
             
             best_plate_text = "Not Detected"
             best_plate_prob = 0.0
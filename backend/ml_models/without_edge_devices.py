@@ -6,6 +6,7 @@ import re
 import easyocr
 import numpy as np
 from ultralytics import YOLO
+from pipeline import ocr_plate
 
 # Random Picture Function
 
@@ -121,14 +122,12 @@ else:
             # "plate_confidence": 0.0
         }
 
-        # STAGE 2: DIRECT OCR ON THE VEHICLE AREA
+        # STAGE 2: PLATE LOCALIZATION + OCR ON THE VEHICLE AREA
         vehicle_crop = img[y1_v:y2_v, x1_v:x2_v]
         if vehicle_crop.size > 0:
-            # Pre-processing to improve OCR accuracy
-            gray_crop = cv2.cvtColor(vehicle_crop, cv2.COLOR_BGR2GRAY)
-
-            # Run OCR on the entire cropped vehicle area
-            ocr_results = ocr_reader.readtext(gray_crop)
+            # Localize the plate first so OCR only reads a small plate crop
+            # (falls back to the entire cropped vehicle area)
+            ocr_results = ocr_plate(ocr_reader, vehicle_crop)
 
             for (bbox, text, prob) in ocr_results:
                 if is_plausible_plate(text):
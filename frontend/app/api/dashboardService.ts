@@ -0,0 +1,51 @@
+// PARK-IQ-CENTRAL-FE/app/api/dashboardService.ts
+import axiosInstance from './axiosInstance';
+import type { ParkingSlot, ParkingStatistics } from './parkingService';
+
+export interface ZoneOccupancy {
+  level: string;
+  zone: 'A' | 'B' | 'C';
+  total: number;
+  occupied: number;
+  available: number;
+}
+
+/**
+ * Everything the admin dashboard pages show on load, in one response.
+ * The backend rebuilds it at most every `refresh_interval` seconds.
+ */
+export interface DashboardSnapshot {
+  generated_at: string; // ISO 8601 (UTC)
+  refresh_interval: number; // seconds
+  statistics: ParkingStatistics;
+  occupancy_by_zone: ZoneOccupancy[];
+  active_sessions: {
+    active: number;
+    pending_payment: number;
+    total: number;
+  };
+  today: {
+    transactions: number;
+    paid_transactions: number;
+    revenue: number;
+  };
+  recent_payments: any[];
+  slots: ParkingSlot[];
+}
+
+export const dashboardService = {
+  /**
+   * GET Dashboard Snapshot (Admin & Operator)
+   * Endpoint: /api/dashboard/snapshot
+   * @returns Promise<DashboardSnapshot> Occupancy, sessions, today's revenue and recent payments.
+   */
+  getDashboardSnapshot: async (): Promise<DashboardSnapshot> => {
+    try {
+      const response = await axiosInstance.get<DashboardSnapshot>('/dashboard/snapshot');
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching dashboard snapshot:', error);
+      throw error;
+    }
+  },
+};
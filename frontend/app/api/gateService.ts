@@ -0,0 +1,61 @@
+// PARK-IQ-CENTRAL-FE/app/api/gateService.ts
+import type { SlotRecommendation } from './parkingService';
+
+type RecommendedSlot = SlotRecommendation['recommended_slot'];
+
+/** Slot as serialized by the backend (Slot.to_dict) */
+export interface GateSlot extends RecommendedSlot {
+  vehicle_plate: string | null;
+  entry_time: string | null; // ISO 8601 (UTC)
+  updated_at: string;
+}
+
+/**
+ * Event pushed by the backend when a gate camera reports a vehicle
+ * (POST /api/detection/entry). `entry` events carry the slot that was
+ * already allocated server-side.
+ */
+export interface GateEvent {
+  type: 'entry' | 'unreadable_plate' | 'no_vehicle';
+  status?: 'admitted' | 'already_parked' | 'full';
+  lane: string | null;
+  zone?: 'A' | 'B' | 'C';
+  vehicle_plate?: string;
+  slot?: GateSlot | null;
+  payment?: any;
+  navigation_info?: {
+    level: string;
+    zone: 'A' | 'B' | 'C';
+    slot_id: string;
+  };
+  timestamp: number; // seconds since epoch
+}
+
+const GATE_EVENT_TYPES: GateEvent['type'][] = ['entry', 'unreadable_plate', 'no_vehicle'];
+
+export const gateService = {
+  /**
+   * Subscribe to gate events (Server-Sent Events)
+   * Endpoint: /api/detection/events
+   * The browser reconnects on its own if the stream drops.
+   * @param onEvent Called for every gate event.
+   * @param lane Only events for this lane (and lane-less events).
+   * @returns Function that closes the stream.
+   */
+  subscribeGateEvents: (onEvent: (event: GateEvent) => void, lane?: string | null): (() => void) => {
+    const url = lane ? `/api/detection/events?lane=${encodeURIComponent(lane)}` : '/api/detection/events';
+    const source = new EventSource(url);
+
+    const handler = (message: MessageEvent) => {
+      try {
+        onEvent(JSON.parse(message.data) as GateEvent);
+      } catch (error) {
+        console.error('Error parsing gate event:', error);
+      }
+    };
+    GATE_EVENT_TYPES.forEach(type => source.addEventListener(type, handler as EventListener));
+    source.onerror = () => console.warn('Gate event stream interrupted, reconnecting...');
+
+    return () => source.close();
+  },
+};
@@ -2,7 +2,8 @@
 import React, { useEffect, useState } from 'react';
 import { Typography, Card, Col, Row, Tag, Statistic, Space, Spin, Alert } from 'antd';
 import { CarOutlined } from '@ant-design/icons';
-import { parkingService, type ParkingSlot, type GetAllParkingSlotsAdminResponse } from '../../api/parkingService';
+import { type ParkingSlot } from '../../api/parkingService';
+import { dashboardService, type DashboardSnapshot } from '../../api/dashboardService';
 
 const { Title, Paragraph } = Typography;
 
@@ -13,6 +14,8 @@ export function meta() {
 export default function MonitoringPage() {
   const [parkingSlots, setParkingSlots] = useState<ParkingSlot[]>([]);
   const [statistics, setStatistics] = useState({ total: 0, available: 0, occupied: 0 });
+  const [activeSessions, setActiveSessions] = useState({ active: 0, pending_payment: 0, total: 0 });
+  const [todayRevenue, setTodayRevenue] = useState(0);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -49,9 +52,12 @@ export default function MonitoringPage() {
       setLoading(true);
       setError(null); // Clear errors before new fetch
       try {
-        const response: GetAllParkingSlotsAdminResponse = await parkingService.getAllParkingSlotsAdmin();
+        // One snapshot request instead of separate slot / payment calls
+        const response: DashboardSnapshot = await dashboardService.getDashboardSnapshot();
         setParkingSlots(response.slots);
         setStatistics(response.statistics);
+        setActiveSessions(response.active_sessions);
+        setTodayRevenue(response.today.revenue);
       } catch (err: any) {
         console.error('Error fetching parking slots:', err);
         const errorMessage = err.response?.data?.error || err.message || "Failed to fetch parking slots.";
@@ -105,6 +111,19 @@ export default function MonitoringPage() {
           </Card>
         </Col>
       </Row>
+      <Row gutter={16}>
+        <Col span={12}>
+          <Card>
+            <Statistic title="Active Sessions" value={activeSessions.total}
+              suffix={activeSessions.pending_payment ? `(${activeSessions.pending_payment} awaiting payment)` : undefined} />
+          </Card>
+        </Col>
+        <Col span={12}>
+          <Card>
+            <Statistic title="Today's Revenue" value={todayRevenue} prefix="Rp" precision={0} />
+          </Card>
+        </Col>
+      </Row>
 
       <Title level={4}>Live Slot View</Title>
     {[...new Set(parkingSlots.map(s => s.level))].sort((a, b) => {
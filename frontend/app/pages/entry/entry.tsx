@@ -2,6 +2,7 @@ import React, { useEffect, useState, useRef } from 'react';
 import { Typography, Button, Card, Spin, Modal, Space, message } from 'antd';
 import { CameraOutlined, CarOutlined, ScanOutlined, CheckCircleFilled, VideoCameraOutlined, StopOutlined } from '@ant-design/icons';
 import { useNavigate } from 'react-router-dom';
+import { gateService, type GateEvent, type GateSlot } from '../../api/gateService';
 
 const { Title, Text, Paragraph } = Typography;
 
@@ -9,6 +10,13 @@ export function meta() {
   return [{ title: "CarCheese - Vehicle Entry" }];
 }
 
+// Detector zones map back to the vehicle types used by the entry flow
+const zoneToVehicleTypeMap: { [zone: string]: 'Bike' | 'Car' | 'Heavy' } = {
+  'A': 'Bike',
+  'B': 'Car',
+  'C': 'Heavy',
+};
+
 export default function EntryPage() {
   const navigate = useNavigate();
   const [isDetecting, setIsDetecting] = useState(false);
@@ -16,6 +24,8 @@ export default function EntryPage() {
   const [detectedVehicle, setDetectedVehicle] = useState<{ type: 'Bike' | 'Car' | 'Heavy'; plate: string } | null>(null);
   const [plateReveal, setPlateReveal] = useState(false);
   const [countdown, setCountdown] = useState(5); // New state for countdown
+  // Slot already allocated by the backend when the vehicle came from a gate camera event
+  const [gateSlot, setGateSlot] = useState<GateSlot | null>(null);
 
   // SPLASH STATE
   const [showSplash, setShowSplash] = useState(true);
@@ -63,8 +73,9 @@ export default function EntryPage() {
       stopCamera(); // Stop camera before navigating away
       navigate('/slot', {
         state: {
-          entryTime: new Date().toISOString(),
+          entryTime: gateSlot?.entry_time || new Date().toISOString(),
           vehicle: detectedVehicle, // Pass the entire detectedVehicle object
+          slot: gateSlot, // Set when the gate camera already admitted the vehicle
         }
       });
     }
@@ -74,6 +85,27 @@ export default function EntryPage() {
     };
   }, [detectedVehicle, plateReveal, countdown, navigate]); // Dependencies for countdown logic
 
+  // Gate camera events pushed by the backend (/api/detection/events), optionally for one lane (?lane=)
+  useEffect(() => {
+    if (showSplash) return;
+
+    const lane = new URLSearchParams(window.location.search).get('lane');
+    const unsubscribe = gateService.subscribeGateEvents((event: GateEvent) => {
+      console.log('EntryPage: Gate event received:', event);
+      if (event.type === 'entry' && (event.status === 'admitted' || event.status === 'already_parked') && event.slot) {
+        setGateSlot(event.slot);
+        setDetectedVehicle({ type: zoneToVehicleTypeMap[event.zone || 'B'] || 'Car', plate: event.vehicle_plate || '' });
+        setIsDetecting(false);
+      } else if (event.type === 'entry' && event.status === 'full') {
+        message.warning(`No available slots in Zone ${event.zone}.`);
+      } else if (event.type === 'unreadable_plate') {
+        message.warning('License plate could not be read. Please move closer to the camera.');
+      }
+    }, lane);
+
+    return unsubscribe;
+  }, [showSplash]);
+
   // Camera functions
   const startCamera = async () => {
     console.log('Attempting to start camera...');
@@ -145,6 +177,7 @@ export default function EntryPage() {
   const simulateDetection = () => {
     setIsDetecting(true);
     setDetectedVehicle(null);
+    setGateSlot(null);
     setPlateReveal(false);
     
     // Define the possible vehicle types
@@ -3,6 +3,7 @@ import { Typography, Button, Spin, Alert } from 'antd'; // Import Spin and Alert
 import { CarOutlined, ClockCircleOutlined, EnvironmentOutlined } from '@ant-design/icons';
 import { useLocation, useNavigate } from 'react-router-dom';
 import { parkingService, type SlotRecommendation, type OccupyReleasePayload } from '../../api/parkingService'; // Import parkingService and types
+import type { GateSlot } from '../../api/gateService';
 
 const { Title, Paragraph, Text } = Typography;
 
@@ -21,7 +22,8 @@ export default function SlotPage() {
   const location = useLocation();
   const navigate = useNavigate();
   // Ensure vehicle type is correctly typed as it comes from EntryPage
-  const { entryTime, vehicle } = location.state as { entryTime: string; vehicle: { type: 'Bike' | 'Car' | 'Heavy'; plate: string } } || {};
+  // `slot` is set when the gate camera already admitted the vehicle (no recommend/occupy needed)
+  const { entryTime, vehicle, slot } = location.state as { entryTime: string; vehicle: { type: 'Bike' | 'Car' | 'Heavy'; plate: string }; slot?: GateSlot | null } || {};
 
   const [showSplash, setShowSplash] = useState(true);
   const [splashOut, setSplashOut] = useState(false);
@@ -63,6 +65,13 @@ export default function SlotPage() {
           return;
         }
 
+        if (slot) {
+          // Allocated server-side by the gate camera; just show it
+          setRecommendedSlot(slot);
+          setApiLoading(false);
+          return;
+        }
+
         const targetZone = vehicleTypeToZoneMap[vehicle.type];
         // 🔥 NEW LOG: Confirming target zone
         console.log('SlotPage: Determined targetZone:', targetZone);
@@ -111,7 +120,7 @@ export default function SlotPage() {
 
       assignSlot();
     }
-  }, [showSplash, vehicle, entryTime]); // Dependencies: run when splash is hidden or vehicle/entryTime changes
+  }, [showSplash, vehicle, entryTime, slot]); // Dependencies: run when splash is hidden or vehicle/entryTime changes
 
   // Countdown and auto-redirect effect
   useEffect(() => {